@@ -0,0 +1,53 @@
+"""
+Benchmark command_output() against the persistent shells of
+py3status.coprocess with 10 modules each running a command every second.
+
+python bench/coprocess.py [duration in seconds] [command]
+"""
+
+import os
+
+from sys import argv
+from threading import Thread
+from time import sleep, time
+
+from py3status.py3 import Py3
+
+duration = int(argv[1]) if len(argv) > 1 else 10
+command = argv[2] if len(argv) > 2 else "uname -r"
+modules = 10
+
+
+def module(py3, persistent, times):
+    start = time()
+    for tick in range(duration):
+        before = time()
+        py3.command_output(command, persistent=persistent)
+        times.append(time() - before)
+        sleep(max(start + tick + 1 - time(), 0))
+
+
+for persistent in [False, True]:
+    times = []
+    cpu = os.times()
+    threads = [
+        Thread(target=module, args=(Py3(), persistent, times)) for x in range(modules)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # reap the shells so that the commands they ran are accounted for
+    Py3._coprocess_pool.kill()
+    cpu = [end - begin for begin, end in zip(cpu, os.times())]
+    print(
+        "{:<16} calls {} cpu {:.3f}s (children {:.3f}s) "
+        "latency mean {:.2f}ms max {:.2f}ms".format(
+            "persistent" if persistent else "command_output",
+            len(times),
+            cpu[0] + cpu[1],
+            cpu[2] + cpu[3],
+            sum(times) / len(times) * 1000,
+            max(times) * 1000,
+        )
+    )
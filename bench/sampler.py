@@ -0,0 +1,87 @@
+"""
+Benchmark reading a /proc/stat of 128 cpus and a /proc/net/dev of 500
+interfaces as the modules used to, opening and splitting the files, against
+the shared samples of py3status.sampler for all the cpus or interfaces and
+for only one of them.
+
+python bench/sampler.py [number of reads]
+"""
+
+from sys import argv
+from tempfile import NamedTemporaryFile
+from time import time
+
+from py3status.sampler import ProcFile, parse_net_dev, parse_stat
+
+reads = int(argv[1]) if len(argv) > 1 else 2000
+cpus = 128
+interfaces = 500
+
+stat = ["cpu  {}".format(" ".join(["123456789"] * 10))]
+stat += ["cpu{} {}".format(x, " ".join(["1234567"] * 10)) for x in range(cpus)]
+stat += ["intr 123456789 0 0", "ctxt 123456789"]
+net_dev = [
+    "Inter-|   Receive |  Transmit",
+    " face |bytes packets | bytes packets",
+]
+net_dev += [
+    "veth{}: {}".format(x, " ".join(["123456789"] * 16)) for x in range(interfaces)
+]
+
+
+# cpu name, idle and total times as sysdata computed them
+def stat_split(path):
+    with open(path) as f:
+        lines = [line.split() for line in f if line.startswith("cpu")]
+    return [(x[0], int(x[4]), sum(map(int, x[1:]))) for x in lines]
+
+
+def stat_shared(table, names):
+    return [(name, table[name][3], sum(table[name])) for name in names]
+
+
+# interface name, received and transmitted bytes as net_rate did
+def net_dev_split(path):
+    with open(path) as f:
+        lines = [line.split() for line in f.readlines()[2:]]
+    return [(x[0][:-1], int(x[1]), int(x[9])) for x in lines]
+
+
+def net_dev_shared(table, names):
+    return [(name, table[name][0], table[name][8]) for name in names]
+
+
+def benchmark(name, function):
+    start = time()
+    for x in range(reads):
+        function()
+    print("{:<32} {:.1f}us per read".format(name, (time() - start) / reads * 1e6))
+
+
+for name, content, parse, split, shared, lookup in [
+    ("/proc/stat", stat, parse_stat, stat_split, stat_shared, "cpu"),
+    (
+        "/proc/net/dev",
+        net_dev,
+        parse_net_dev,
+        net_dev_split,
+        net_dev_shared,
+        "veth0",
+    ),
+]:
+    with NamedTemporaryFile("w") as f:
+        f.write("\n".join(content) + "\n")
+        f.flush()
+        proc_file = ProcFile(f.name)
+        table = parse(proc_file.read())
+        names = list(table)
+        assert split(f.name) == shared(table, names)
+        benchmark("{} split".format(name), lambda: split(f.name))
+        benchmark(
+            "{} shared, all".format(name),
+            lambda: shared(parse(proc_file.read()), names),
+        )
+        benchmark(
+            "{} shared, {}".format(name, lookup),
+            lambda: shared(parse(proc_file.read()), [lookup]),
+        )
@@ -0,0 +1,166 @@
+"""
+Support for modules using coroutine (``async def``) methods.
+
+All the coroutine methods of all the modules are run on one shared asyncio
+event loop living in its own thread, so that modules waiting on I/O do not
+need a thread each.
+
+This file requires python 3.5+ and is only imported when such a module is
+loaded.
+"""
+
+import asyncio
+
+from subprocess import PIPE, STDOUT
+from threading import Thread
+from time import time
+
+from py3status import exceptions
+from py3status.profiling import profile
+from py3status.util import new_session
+
+
+def run_coroutine(coroutine):
+    """
+    Run a coroutine to completion outside of the shared event loop, eg when a
+    module is being tested.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def request(py3, url, get_http_response, retry_times, retry_wait):
+    """
+    Make a http request in a worker thread, waiting between retries without
+    blocking the event loop.  See Py3.request_async()
+    """
+    loop = asyncio.get_event_loop()
+    circuit_breaker = py3._circuit_breaker
+    for attempt in range(1, retry_times):
+        try:
+            return await loop.run_in_executor(None, get_http_response)
+        except (py3.RequestTimeout, py3.RequestURLError):
+            # no point waiting on a host we know is unreachable
+            if circuit_breaker.open_for(url):
+                raise
+            py3.log("HTTP request retry {}/{}".format(attempt, retry_times))
+            await asyncio.sleep(py3._request_retry_wait(retry_wait, attempt))
+    return await loop.run_in_executor(None, get_http_response)
+
+
+async def command_output(py3, command, pretty_cmd, env, shell, capture_stderr, timeout):
+    """
+    Run a command as an asyncio subprocess and return its output.
+    See Py3.command_output_async()
+    """
+    loop = asyncio.get_event_loop()
+    stderr = STDOUT if capture_stderr else PIPE
+    # wait for our turn without blocking the event loop
+    await loop.run_in_executor(None, py3._command_semaphore.acquire)
+    try:
+        try:
+            if shell:
+                process = await asyncio.create_subprocess_shell(
+                    command, stdout=PIPE, stderr=stderr, env=env, **new_session()
+                )
+            else:
+                process = await asyncio.create_subprocess_exec(
+                    *command, stdout=PIPE, stderr=stderr, env=env, **new_session()
+                )
+        except Exception as e:
+            msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e)
+            py3.log(msg)
+            raise exceptions.CommandError(msg, error_code=getattr(e, "errno", None))
+
+        try:
+            output, error = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            py3._command_kill(process.pid)
+            await process.wait()
+            py3._command_timed_out(pretty_cmd, timeout)
+    finally:
+        py3._command_semaphore.release()
+
+    output = output.decode("utf-8", "replace")
+    error = error.decode("utf-8", "replace") if error else ""
+    return py3._command_result(pretty_cmd, process.returncode, output, error)
+
+
+class AsyncLoop(Thread):
+    """
+    Thread running the event loop shared by all the modules having
+    coroutine methods.
+    """
+
+    def __init__(self, py3_wrapper):
+        Thread.__init__(self)
+        self.daemon = True
+        self.loop = asyncio.new_event_loop()
+        self.py3_wrapper = py3_wrapper
+        self.start()
+        if py3_wrapper.config["debug"]:
+            py3_wrapper.log("asyncio event loop started")
+
+    @profile
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run_coroutine(self, coroutine):
+        """
+        Run the coroutine on the event loop from another thread and wait for
+        its result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def run_module(self, module):
+        """
+        Schedule an update of the module on the event loop.  This is the
+        counterpart of running the module in a core.Runner thread.
+        """
+        asyncio.run_coroutine_threadsafe(self._run_module(module), self.loop)
+
+    async def _run_module(self, module):
+        try:
+            await self._run_methods(module)
+        except:  # noqa e722
+            self.py3_wrapper.report_exception("AsyncLoop")
+        # the module is no longer running so notify the timeout logic
+        self.py3_wrapper.timeout_finished.append(module.module_full_name)
+
+    async def _run_methods(self, module):
+        """
+        Asynchronous version of Module.run(), the cache and error handling
+        of each method is the same.  Any methods that are not coroutines are
+        run in a worker thread.
+        """
+        if not self.py3_wrapper.running:
+            return
+        cache_time = None
+        for meth, obj in module.methods.items():
+            # always check py3status is running
+            if not self.py3_wrapper.running:
+                break
+
+            # respect the cache set for this method
+            if time() < obj["cached_until"]:
+                if not cache_time or obj["cached_until"] < cache_time:
+                    cache_time = obj["cached_until"]
+                continue
+
+            try:
+                # execute method and get its output
+                if obj["coroutine"]:
+                    response = await module.call_method(meth)
+                else:
+                    response = await self.loop.run_in_executor(
+                        None, module.call_method, meth
+                    )
+                cache_time = module.process_response(meth, response, cache_time)
+            except Exception as e:
+                cache_time = module.process_exception(meth, e, cache_time)
+
+        module.schedule(cache_time)
@@ -1,12 +1,21 @@
 import argparse
+import errno
 import glob
 import json
 import os
+import select
 import socket
+import sys
 import threading
 
+from fnmatch import fnmatchcase
+
 SERVER_ADDRESS = "/tmp/py3status_uds"
-MAX_SIZE = 1024
+# maximum size of a single command message
+MAX_SIZE = 64 * 1024
+# maximum size of the replies and updates waiting for a client to read them
+MAX_OUT_SIZE = 1024 * 1024
+READ_SIZE = 4096
 
 CLICK_EPILOG = """
 examples:
@@ -83,14 +92,27 @@ examples:
         # refresh a module with instance name
         py3-cmd refresh "weather_yahoo chicago"
 
+        # refresh modules matching a pattern
+        py3-cmd refresh "net_*" "weather_yahoo [a-m]*"
+
         # refresh all modules
         py3-cmd refresh --all
 """
+WATCH_EPILOG = """
+examples:
+    watch:
+        # print the output of all modules as they update
+        py3-cmd watch
+
+        # print the output of some modules as they update
+        py3-cmd watch battery_level "net_rate eth0" "weather_*"
+"""
 EPILOGS = {
     "refresh": REFRESH_EPILOG,
     "list": LIST_EPILOG,
     "docstring": DOCSTRING_EPILOG,
     "click": CLICK_EPILOG,
+    "watch": WATCH_EPILOG,
 }
 INFORMATION = [
     ("V", "version", "show version number and exit"),
@@ -101,6 +123,7 @@ SUBPARSERS = [
     ("docstring", "docstring utility", "*"),
     ("list", "list modules", "*"),
     ("refresh", "refresh modules", "*"),
+    ("watch", "watch modules output", "*"),
     # ('exec', 'execute methods', '+'),
 ]
 CLICK_OPTIONS = [
@@ -128,6 +151,61 @@ DOCSTRING_OPTIONS = [
 REFRESH_OPTIONS = [("all", "refresh all modules")]
 
 
+class ModuleIndex:
+    """
+    Find output modules from the names users know them by.
+
+    A name without an instance eg `net_rate` matches all of its instances
+    while one with an instance eg `net_rate eth0` only matches that one.
+    Names can also be glob patterns eg `net_*`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # module name -> output module names of its instances
+        self.names = {}
+        # nice name (as in the config) -> output module names
+        self.nice_names = {}
+        # glob pattern -> output module names, reset when modules change
+        self.patterns = {}
+
+    def add(self, module_name, nice_name):
+        with self.lock:
+            self.nice_names.setdefault(nice_name, set()).add(module_name)
+            name = nice_name.split(" ")[0]
+            self.names.setdefault(name, set()).add(module_name)
+            self.patterns = {}
+
+    def remove(self, module_name):
+        with self.lock:
+            for index in [self.names, self.nice_names]:
+                for name, module_names in list(index.items()):
+                    module_names.discard(module_name)
+                    if not module_names:
+                        del index[name]
+            self.patterns = {}
+
+    def find(self, requested_name):
+        """
+        Return the output module names matching the requested name.
+        """
+        is_instance = " " in requested_name
+        index = self.nice_names if is_instance else self.names
+        with self.lock:
+            if not any(x in requested_name for x in "*?["):
+                return set(index.get(requested_name, []))
+            try:
+                return set(self.patterns[requested_name])
+            except KeyError:
+                pass
+            found = set()
+            for name, module_names in index.items():
+                if fnmatchcase(name, requested_name):
+                    found.update(module_names)
+            self.patterns[requested_name] = found
+            return set(found)
+
+
 class CommandRunner:
     """
     Encapsulates the remote commands that are available to run.
@@ -143,19 +221,7 @@ class CommandRunner:
         """
         found_modules = set()
         for requested_name in requested_names:
-            is_instance = " " in requested_name
-
-            for module_name, module in self.py3_wrapper.output_modules.items():
-                if module["type"] == "py3status":
-                    name = module["module"].module_nice_name
-                else:
-                    name = module["module"].module_name
-                if is_instance:
-                    if requested_name == name:
-                        found_modules.add(module_name)
-                else:
-                    if requested_name == name.split(" ")[0]:
-                        found_modules.add(module_name)
+            found_modules.update(self.py3_wrapper.module_index.find(requested_name))
 
         if self.debug:
             self.py3_wrapper.log("found %s" % found_modules)
@@ -165,10 +231,10 @@ class CommandRunner:
         """
         refresh the module(s)
         """
-        modules = data.get("module")
+        modules = self.find_modules(data.get("module"))
         # for i3status modules we have to refresh the whole i3status output.
         update_i3status = False
-        for module_name in self.find_modules(modules):
+        for module_name in modules:
             module = self.py3_wrapper.output_modules[module_name]
             if self.debug:
                 self.py3_wrapper.log("refresh %s" % module)
@@ -178,13 +244,14 @@ class CommandRunner:
                 update_i3status = True
         if update_i3status:
             self.py3_wrapper.i3status_thread.refresh_i3status()
+        return sorted(modules)
 
     def click(self, data):
         """
         send a click event to the module(s)
         """
-        modules = data.get("module")
-        for module_name in self.find_modules(modules):
+        modules = self.find_modules(data.get("module"))
+        for module_name in modules:
             module = self.py3_wrapper.output_modules[module_name]
             if module["type"] == "py3status":
                 name = module["module"].module_name
@@ -201,26 +268,100 @@ class CommandRunner:
                 self.py3_wrapper.log(event)
             # trigger the event
             self.py3_wrapper.events_thread.dispatch_event(event)
+        return sorted(modules)
 
     def run_command(self, data):
         """
         check the given command and send to the correct dispatcher
+        returns the names of the modules affected
         """
         command = data.get("command")
         if self.debug:
             self.py3_wrapper.log("Running remote command %s" % command)
         if command == "refresh":
-            self.refresh(data)
+            return self.refresh(data)
         elif command == "refresh_all":
             self.py3_wrapper.refresh_modules()
+            return sorted(self.py3_wrapper.output_modules)
         elif command == "click":
-            self.click(data)
+            return self.click(data)
+        raise ValueError("unknown command `{}`".format(command))
+
+
+class CommandConnection:
+    """
+    A client connected to the command server.
+
+    Clients send one or more commands as JSON messages each terminated by a
+    newline.  A message with a true ``reply`` key gets a JSON line back with
+    the ``result`` or ``error`` of the command.  For compatibility a message
+    that is not terminated is run when the client closes the connection.
+
+    After a ``watch`` command the client is sent a JSON line with the output
+    of the watched modules whenever they update.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.in_buffer = b""
+        self.out_buffer = b""
+        self.closing = False
+        # set by the watch command, the modules watched (None for all) and
+        # those updated since the client was last sent their output
+        self.watching = False
+        self.watched = None
+        self.pending = set()
+
+    def read(self):
+        """
+        Read what the client sent and return any complete messages.
+        """
+        try:
+            data = self.connection.recv(READ_SIZE)
+        except socket.error as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR):
+                return []
+            data = b""
+        if not data:
+            # client closed its end, any remaining data is a last message
+            self.closing = True
+            data, self.in_buffer = self.in_buffer, b""
+            return [data] if data.strip() else []
+        self.in_buffer += data
+        messages = self.in_buffer.split(b"\n")
+        self.in_buffer = messages.pop()
+        if len(self.in_buffer) > MAX_SIZE:
+            raise ValueError("command message too long")
+        return [x for x in messages if x.strip()]
+
+    def reply(self, data):
+        self.out_buffer += json.dumps(data).encode("utf-8") + b"\n"
+
+    def write(self):
+        """
+        Send as much of the pending replies as the client will take.
+        """
+        try:
+            sent = self.connection.send(self.out_buffer)
+        except socket.error as e:
+            if e.errno in (errno.EAGAIN, errno.EINTR):
+                return
+            # client has gone away so drop its replies
+            self.out_buffer = b""
+            self.closing = True
+            return
+        self.out_buffer = self.out_buffer[sent:]
 
 
 class CommandServer(threading.Thread):
     """
     Set up a Unix domain socket to allow commands to be sent to py3status
     instance.
+
+    Connections are handled concurrently by polling the sockets so that a slow
+    client does not hold up the others.  Updates for watching clients are only
+    sent once the previous one has been taken so that slow clients get the
+    updates coalesced rather than queued.
     """
 
     def __init__(self, py3_wrapper):
@@ -248,8 +389,20 @@ class CommandServer(threading.Thread):
             self.py3_wrapper.log("Unix domain socket at %s" % server_address)
 
         # Listen for incoming connections
-        sock.listen(1)
+        sock.listen(socket.SOMAXCONN)
+        sock.setblocking(False)
         self.sock = sock
+        self.connections = {}
+        self.poller = select.poll()
+        self.poller.register(sock, select.POLLIN)
+
+        # clients using the watch command, modules update in other threads so
+        # they wake us via a pipe
+        self.watchers = {}
+        self.watch_lock = threading.Lock()
+        self.wake_read, self.wake_write = os.pipe()
+        self.wake_pending = False
+        self.poller.register(self.wake_read, select.POLLIN)
 
     def kill(self):
         """
@@ -261,6 +414,154 @@ class CommandServer(threading.Thread):
             if os.path.exists(self.server_address):
                 raise
 
+    def accept(self):
+        """
+        Accept all the pending connections.
+        """
+        while True:
+            try:
+                connection, client_address = self.sock.accept()
+            except socket.error:
+                return
+            if self.debug:
+                self.py3_wrapper.log("connection from")
+            connection.setblocking(False)
+            self.connections[connection.fileno()] = CommandConnection(connection)
+            self.poller.register(connection, select.POLLIN)
+
+    def close(self, fd):
+        """
+        Clean up the connection
+        """
+        connection = self.connections.pop(fd)
+        self.poller.unregister(fd)
+        with self.watch_lock:
+            self.watchers.pop(fd, None)
+        connection.connection.close()
+
+    def watch(self, client, data):
+        """
+        Make the client a watcher of the requested modules, all of them if
+        none are given.  Their current output is sent straight away.
+        """
+        modules = data.get("module")
+        watched = None
+        if modules:
+            watched = self.command_runner.find_modules(modules)
+            if not watched:
+                raise ValueError("no module matching `{}`".format("`, `".join(modules)))
+        client.watched = watched
+        client.watching = True
+        with self.watch_lock:
+            if client.watched is None:
+                client.pending = set(self.py3_wrapper.output_modules)
+            else:
+                client.pending = set(client.watched)
+            self.watchers[client.connection.fileno()] = client
+        return sorted(client.pending)
+
+    def notify_update(self, update):
+        """
+        Called from any thread with the names of the modules that have
+        updated, see Py3statusWrapper.notify_update()
+        """
+        with self.watch_lock:
+            wake = False
+            for client in self.watchers.values():
+                if client.watched is None:
+                    client.pending.update(update)
+                else:
+                    client.pending.update(client.watched.intersection(update))
+                wake = wake or bool(client.pending)
+            if wake and not self.wake_pending:
+                self.wake_pending = True
+                os.write(self.wake_write, b"x")
+
+    def wake(self):
+        """
+        Send the pending updates to the watching clients.
+        """
+        os.read(self.wake_read, READ_SIZE)
+        with self.watch_lock:
+            self.wake_pending = False
+            watchers = list(self.watchers)
+        for fd in watchers:
+            if fd in self.connections:
+                self.handle(fd, 0)
+
+    def send_update(self, client):
+        """
+        Queue a message with the output of the modules updated since the
+        client was last sent one.
+        """
+        with self.watch_lock:
+            modules, client.pending = client.pending, set()
+        if not modules:
+            return
+        output_modules = self.py3_wrapper.output_modules
+        update = {
+            name: output_modules[name]["module"].get_latest()
+            for name in modules
+            if name in output_modules
+        }
+        client.reply({"update": update})
+        client.write()
+
+    def run_message(self, client, message):
+        """
+        Run a command received from a client and reply if asked to.
+        """
+        data = None
+        try:
+            data = json.loads(message.decode("utf-8"))
+            if self.debug:
+                self.py3_wrapper.log(u"received %s" % data)
+            if data.get("command") == "watch":
+                result = self.watch(client, data)
+            else:
+                result = self.command_runner.run_command(data)
+            reply = {"result": result}
+        except Exception as e:
+            if data:
+                self.py3_wrapper.log("Command error")
+                self.py3_wrapper.log(data)
+            self.py3_wrapper.report_exception("command failed")
+            reply = {"error": str(e) or e.__class__.__name__}
+        if isinstance(data, dict) and data.get("reply"):
+            client.reply(reply)
+
+    def handle(self, fd, event):
+        """
+        Process an event on a client connection.
+        """
+        client = self.connections[fd]
+        if event & (select.POLLIN | select.POLLHUP | select.POLLERR):
+            try:
+                messages = client.read()
+            except ValueError:
+                self.py3_wrapper.report_exception("command failed")
+                self.close(fd)
+                return
+            for message in messages:
+                self.run_message(client, message)
+        if event & select.POLLOUT or client.out_buffer:
+            client.write()
+        if len(client.out_buffer) > MAX_OUT_SIZE:
+            # the client is not reading what it is sent, drop it
+            self.py3_wrapper.log("command client not reading its replies, closed")
+            self.close(fd)
+            return
+        # only once the last update has been taken to apply backpressure
+        if client.watching and not client.out_buffer and not client.closing:
+            self.send_update(client)
+
+        if client.out_buffer:
+            self.poller.modify(fd, select.POLLIN | select.POLLOUT)
+        elif client.closing:
+            self.close(fd)
+        else:
+            self.poller.modify(fd, select.POLLIN)
+
     def run(self):
         """
         Main thread listen to socket and send any commands to the
@@ -268,30 +569,15 @@ class CommandServer(threading.Thread):
         """
         while True:
             try:
-                data = None
-                # Wait for a connection
-                if self.debug:
-                    self.py3_wrapper.log("waiting for a connection")
-
-                connection, client_address = self.sock.accept()
-                try:
-                    if self.debug:
-                        self.py3_wrapper.log("connection from")
-
-                    data = connection.recv(MAX_SIZE)
-                    if data:
-                        data = json.loads(data.decode("utf-8"))
-                        if self.debug:
-                            self.py3_wrapper.log(u"received %s" % data)
-                        self.command_runner.run_command(data)
-                finally:
-                    # Clean up the connection
-                    connection.close()
+                for fd, event in self.poller.poll():
+                    if fd == self.sock.fileno():
+                        self.accept()
+                    elif fd == self.wake_read:
+                        self.wake()
+                    elif fd in self.connections:
+                        self.handle(fd, event)
             except Exception:
-                if data:
-                    self.py3_wrapper.log("Command error")
-                    self.py3_wrapper.log(data)
-                self.py3_wrapper.report_exception("command failed")
+                self.py3_wrapper.report_exception("command server failed")
 
 
 def command_parser():
@@ -525,7 +811,7 @@ def send_command():
             print(msg)
 
     options = command_parser()
-    msg = json.dumps(vars(options)).encode("utf-8")
+    msg = json.dumps(vars(options)).encode("utf-8") + b"\n"
     if len(msg) > MAX_SIZE:
         verbose("Message length too long, max length (%s)" % MAX_SIZE)
 
@@ -549,6 +835,26 @@ def send_command():
             except OSError:
                 pass
             continue
+        if options.command == "watch":
+            # keep the connection open and print the updates as they come,
+            # the reply tells whether any module was found
+            verbose("watching")
+            data = dict(vars(options), reply=True)
+            try:
+                sock.sendall(json.dumps(data).encode("utf-8") + b"\n")
+                lines = sock.makefile("rb")
+                reply = json.loads(lines.readline().decode("utf-8") or "{}")
+                if "error" in reply:
+                    sys.stderr.write("py3-cmd: {}\n".format(reply["error"]))
+                    sys.exit(1)
+                for line in lines:
+                    sys.stdout.write(line.decode("utf-8"))
+                    sys.stdout.flush()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                sock.close()
+            return
         try:
             # Send data
             verbose("sending")
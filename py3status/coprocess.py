@@ -0,0 +1,169 @@
+"""
+Persistent helper shells used to run frequently polled commands.
+
+Rather than having py3status fork itself for every command a module runs, the
+commands are written to the stdin of long running shells which run them and
+report back their output and exit status.  The shells are shared by all the
+modules and kept alive between calls.
+"""
+
+import os
+import select
+
+from signal import SIGKILL
+from subprocess import Popen, PIPE
+from threading import Lock
+from time import time
+from uuid import uuid4
+
+try:
+    # Python 3
+    from shlex import quote as shell_quote
+except ImportError:
+    # Python 2
+    from pipes import quote as shell_quote
+
+from py3status.util import new_session
+
+READ_SIZE = 4096
+
+
+class CoprocessDied(Exception):
+    """
+    The helper shell stopped unexpectedly or had to be killed, returncode is
+    None when it was killed because the command did not complete in time.
+    """
+
+    def __init__(self, msg, returncode=None):
+        Exception.__init__(self, msg)
+        self.returncode = returncode
+
+
+class Coprocess:
+    """
+    A shell running the commands written to it one at a time.
+    """
+
+    def __init__(self, env):
+        self.marker = uuid4().hex.encode()
+        # the shell gets its own session so that it can be killed along with
+        # any command it is running
+        self.process = Popen(
+            ["/bin/sh"],
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=PIPE,
+            close_fds=True,
+            env=env,
+            **new_session()
+        )
+        self.alive = True
+
+    def kill(self):
+        self.alive = False
+        try:
+            os.killpg(self.process.pid, SIGKILL)
+        except OSError:
+            pass
+        return self.process.wait()
+
+    def run(self, command, capture_stderr, timeout):
+        """
+        Run the command and return its exit status, output and error output
+        as bytes.
+        """
+        redirect = "2>&1" if capture_stderr else ""
+        # the command is run in a subshell so that it cannot alter the state
+        # of our shell, its exit status is written after its output
+        script = "( {} ) {} </dev/null; printf '\\n{} %d\\n' \"$?\"\n".format(
+            command, redirect, self.marker.decode()
+        )
+        stdout = self.process.stdout.fileno()
+        stderr = self.process.stderr.fileno()
+        output = []
+        error = []
+        end = b"\n" + self.marker + b" "
+        # the end of the output, enough to hold the marker and exit status
+        tail = b""
+        deadline = time() + timeout
+        try:
+            self.process.stdin.write(script.encode("utf-8"))
+            self.process.stdin.flush()
+            while not (tail.endswith(b"\n") and end in tail):
+                remaining = deadline - time()
+                if remaining <= 0:
+                    self.kill()
+                    raise CoprocessDied("timeout")
+                ready = select.select([stdout, stderr], [], [], remaining)[0]
+                for fd in ready:
+                    chunk = os.read(fd, READ_SIZE)
+                    if not chunk:
+                        raise IOError("shell exited")
+                    if fd == stdout:
+                        output.append(chunk)
+                        tail = (tail + chunk)[-len(end) - 16 :]
+                    else:
+                        error.append(chunk)
+        except (IOError, OSError) as e:
+            returncode = self.kill()
+            raise CoprocessDied(
+                "shell exited with status {}: {}".format(returncode, e), returncode
+            )
+        # the command has exited so anything it wrote to stderr is available
+        while select.select([stderr], [], [], 0)[0]:
+            chunk = os.read(stderr, READ_SIZE)
+            if not chunk:
+                break
+            error.append(chunk)
+        output, status = b"".join(output).rsplit(end, 1)
+        return int(status), output, b"".join(error)
+
+
+class CoprocessPool:
+    """
+    The shells shared by all the modules.  A shell is only used by one
+    command at a time, the semaphore limiting the commands run at the same
+    time is shared with Py3.command_output() so that shells and commands
+    run without them together stay under the limit.
+    """
+
+    def __init__(self, semaphore):
+        self.idle = {}
+        self.lock = Lock()
+        self.semaphore = semaphore
+
+    def run(self, command, env, capture_stderr, timeout):
+        """
+        Run the command, a string interpreted by the shell.  The environment
+        is one of a few fixed ones (eg localized or not) as shells are kept
+        for each.
+        """
+        key = None if env is None else frozenset(env.items())
+        with self.semaphore:
+            with self.lock:
+                try:
+                    coprocess = self.idle.setdefault(key, []).pop()
+                except IndexError:
+                    coprocess = None
+            if coprocess is None:
+                coprocess = Coprocess(env)
+            try:
+                return coprocess.run(command, capture_stderr, timeout)
+            finally:
+                if coprocess.alive:
+                    with self.lock:
+                        self.idle[key].append(coprocess)
+
+    def kill(self):
+        with self.lock:
+            for coprocesses in self.idle.values():
+                for coprocess in coprocesses:
+                    coprocess.kill()
+            self.idle = {}
+
+
+def shell_command(command):
+    """
+    Return a command given as a sequence as a string to be run by a shell.
+    """
+    return " ".join(shell_quote(part) for part in command)
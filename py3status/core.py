@@ -15,15 +15,18 @@ from threading import Event, Thread
 from syslog import syslog, LOG_ERR, LOG_INFO, LOG_WARNING
 from traceback import extract_tb, format_tb, format_stack
 
-from py3status.command import CommandServer
+from py3status.command import CommandServer, ModuleIndex
 from py3status.events import Events
 from py3status.formatter import expand_color
 from py3status.helpers import print_stderr
 from py3status.i3status import I3status
+from py3status.inotify import Inotify
 from py3status.parse_config import process_config
 from py3status.module import Module
 from py3status.profiling import profile
+from py3status.rtnetlink import Rtnetlink
 from py3status.udev_monitor import UdevMonitor
+from py3status.wm_ipc import WmEvents
 
 LOG_LEVELS = {"error": LOG_ERR, "warning": LOG_WARNING, "info": LOG_INFO}
 
@@ -252,10 +255,13 @@ class Py3statusWrapper:
         """
         Useful variables we'll need.
         """
+        self.async_loop = None
+        self.commands_thread = None
         self.config = vars(options)
         self.i3bar_running = True
         self.last_refresh_ts = time.time()
         self.lock = Event()
+        self.module_index = ModuleIndex()
         self.modules = {}
         self.notified_messages = set()
         self.options = options
@@ -388,8 +394,8 @@ class Py3statusWrapper:
             module_name = self.timeout_finished.popleft()
             self.timeout_running.discard(module_name)
             if module_name in self.timeout_missed:
-                module = self.timeout_missed.pop(module_name)
-                self.timeout_update_due.append(module)
+                # run them in turn, the first one keeping the others waiting
+                self.timeout_update_due.extend(self.timeout_missed.pop(module_name))
 
         # run any modules that are due
         while self.timeout_update_due:
@@ -398,10 +404,15 @@ class Py3statusWrapper:
             # if the module is running then we do not want to trigger it but
             # instead wait till it has finished running and then trigger
             if module_name and module_name in self.timeout_running:
-                self.timeout_missed[module_name] = module
+                missed = self.timeout_missed.setdefault(module_name, [])
+                if module not in missed:
+                    missed.append(module)
             else:
                 self.timeout_running.add(module_name)
-                Runner(module, self, module_name)
+                if getattr(module, "is_async", False):
+                    self.async_loop.run_module(module)
+                else:
+                    Runner(module, self, module_name)
 
         # we return how long till we next need to process the timeout_queue
         if self.timeout_due is not None:
@@ -521,6 +532,11 @@ class Py3statusWrapper:
                 # only handle modules with available methods
                 if my_m.methods:
                     self.modules[module] = my_m
+                    # modules with coroutine methods share an event loop
+                    if my_m.is_async and self.async_loop is None:
+                        from py3status.async_loop import AsyncLoop
+
+                        self.async_loop = AsyncLoop(self)
                 elif self.config["debug"]:
                     self.log('ignoring module "{}" (no methods found)'.format(module))
             except Exception:
@@ -642,6 +658,15 @@ class Py3statusWrapper:
         # initialize the udev monitor (lazy)
         self.udev_monitor = UdevMonitor(self)
 
+        # initialize the window manager events monitor (lazy)
+        self.wm_events = WmEvents(self)
+
+        # initialize the inotify monitor (lazy)
+        self.inotify = Inotify(self)
+
+        # initialize the network interfaces monitor (lazy)
+        self.rtnetlink = Rtnetlink(self)
+
         # suppress modules' output wrt issue #20
         if not self.config["debug"]:
             sys.stdout = open("/dev/null", "w")
@@ -820,6 +845,8 @@ class Py3statusWrapper:
                 self.modules[container].module_class.items.remove(module_name)
             except ValueError:
                 pass
+        # the module can no longer be refreshed or clicked by name
+        self.module_index.remove(module_name)
 
     def notify_update(self, update, urgent=False):
         """
@@ -829,6 +856,10 @@ class Py3statusWrapper:
             update = [update]
         self.update_queue.extend(update)
 
+        # let py3-cmd watch clients know
+        if self.commands_thread:
+            self.commands_thread.notify_update(update)
+
         # find containers that use the modules that updated
         containers = self.config["py3_config"][".module_groups"]
         containers_to_update = set()
@@ -908,6 +939,7 @@ class Py3statusWrapper:
                 output_modules[name]["module"] = self.modules[name]
                 output_modules[name]["type"] = "py3status"
                 output_modules[name]["color"] = self.mappings_color.get(name)
+                self.module_index.add(name, self.modules[name].module_nice_name)
         # i3status modules
         for name in i3modules:
             if name not in output_modules:
@@ -916,6 +948,7 @@ class Py3statusWrapper:
                 output_modules[name]["module"] = i3modules[name]
                 output_modules[name]["type"] = "i3status"
                 output_modules[name]["color"] = self.mappings_color.get(name)
+                self.module_index.add(name, i3modules[name].module_name)
 
         self.output_modules = output_modules
 
@@ -0,0 +1,68 @@
+from threading import Lock, Thread
+
+PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+
+
+class DbusMonitor:
+    """
+    This class allows modules to share D-Bus connections.
+
+    There is one connection per bus and the signals of all the modules are
+    dispatched by a single GLib main loop thread.  Both are only set up when
+    a module first uses them.  pydbus is only imported at that time.
+    """
+
+    def __init__(self):
+        self.buses = {}
+        self.lock = Lock()
+        self.loop = None
+
+    def _start_loop(self):
+        """
+        Run the GLib main loop dispatching the signals of all the buses.
+        """
+        from gi.repository import GLib
+
+        self.loop = GLib.MainLoop()
+        thread = Thread(target=self.loop.run)
+        thread.daemon = True
+        thread.start()
+
+    def get_bus(self, bus="session"):
+        """
+        Return the pydbus connection to the session or system bus.
+        """
+        with self.lock:
+            if bus not in self.buses:
+                from pydbus import SessionBus, SystemBus
+
+                if bus == "session":
+                    self.buses[bus] = SessionBus()
+                elif bus == "system":
+                    self.buses[bus] = SystemBus()
+                else:
+                    raise ValueError("unknown bus `{}`".format(bus))
+            if self.loop is None:
+                self._start_loop()
+            return self.buses[bus]
+
+    def subscribe(
+        self, function, service, object_path=None, interface=None, bus="session"
+    ):
+        """
+        Call function(interface, changed, invalidated) from the loop thread
+        when the properties of the object change.  The function must not
+        block as it holds up the signals of all the modules.
+        """
+
+        def properties_changed(sender, object_path, iface, signal, params):
+            function(*params)
+
+        return self.get_bus(bus).subscribe(
+            sender=service,
+            iface=PROPERTIES_INTERFACE,
+            signal="PropertiesChanged",
+            object=object_path,
+            arg0=interface,
+            signal_fired=properties_changed,
+        )
@@ -1,11 +1,13 @@
 import select
 import sys
 
-from threading import Thread
+from collections import deque
+from threading import Lock, Thread
 from subprocess import Popen, PIPE
 from json import loads
 
 from py3status.profiling import profile
+from py3status.wm_ipc import WmIpc
 
 try:
     # Python 3
@@ -52,19 +54,78 @@ class IOPoller:
 
 class EventTask:
     """
-    A simple task that can be run by the scheduler.
+    A task running the click events queued for a module.  It is scheduled
+    under the name of the module so that the events are never processed
+    while the module is updating.
     """
 
-    def __init__(self, module_name, event, default_event, events_thread):
-        self.events_thread = events_thread
+    def __init__(self, module_name, dispatcher):
+        self.dispatcher = dispatcher
         self.module_full_name = module_name
-        self.default_event = default_event
-        self.event = event
 
     def run(self):
-        self.events_thread.process_event(
-            self.module_full_name, self.event, self.default_event
-        )
+        self.dispatcher.run_events(self.module_full_name)
+
+
+class EventDispatcher:
+    """
+    Queues the click events of each module, a single EventTask processing
+    them in turn being scheduled per module.
+
+    Scroll wheel events can arrive faster than modules deal with them.  For
+    the modules reading the ``repeat`` count of their events, those for the
+    same button that arrive while a previous event is being processed are
+    coalesced into one event with that count.
+    """
+
+    # buttons of the scroll wheel
+    REPEAT_BUTTONS = (4, 5, 6, 7)
+
+    def __init__(self, events_thread):
+        self.events_thread = events_thread
+        self.lock = Lock()
+        # the events waiting for each module with a task scheduled or running
+        self.queues = {}
+
+    def add(self, module_name, event, default_event, repeat=False):
+        """
+        Queue the event for the module, coalescing scroll events with the
+        last queued one if repeat is set.
+        """
+        key = (event.get("button"), event.get("index"), event.get("modifiers"))
+        with self.lock:
+            queue = self.queues.get(module_name)
+            schedule = queue is None
+            if schedule:
+                queue = self.queues[module_name] = deque()
+            elif queue and repeat and key[0] in self.REPEAT_BUTTONS:
+                # only coalesce with the last event queued for the module so
+                # that the order of the events is kept
+                last_key, last_event, last_default_event = queue[-1]
+                if last_key == key and last_default_event == default_event:
+                    last_event["repeat"] += 1
+                    return
+            event["repeat"] = 1
+            queue.append((key, event, default_event))
+        if schedule:
+            task = EventTask(module_name, self)
+            self.events_thread.py3_wrapper.timeout_queue_add(task)
+
+    def run_events(self, module_name):
+        """
+        Process the events queued for the module until there are none left.
+        """
+        while True:
+            with self.lock:
+                queue = self.queues[module_name]
+                if not queue:
+                    del self.queues[module_name]
+                    return
+                key, event, default_event = queue.popleft()
+            try:
+                self.events_thread.process_event(module_name, event, default_event)
+            except Exception:
+                self.events_thread.py3_wrapper.report_exception("Event failed")
 
 
 class EventClickTask:
@@ -102,6 +163,8 @@ class Events(Thread):
         self.output_modules = py3_wrapper.output_modules
         self.poller_inp = IOPoller(sys.stdin)
         self.py3_wrapper = py3_wrapper
+        self.dispatcher = EventDispatcher(self)
+        self.wm_ipc = WmIpc(py3_wrapper)
 
     def get_module_text(self, module_name, event):
         """
@@ -157,8 +220,12 @@ class Events(Thread):
 
     def wm_msg(self, module_name, command):
         """
-        Execute the message with i3-msg or swaymsg and log its output.
+        Send the message to the window manager over its IPC socket, the reply
+        is logged once received.  If the socket cannot be used fall back to
+        executing it with i3-msg or swaymsg and log its output.
         """
+        if self.wm_ipc.command(module_name, command):
+            return
         wm_msg = self.config["wm"]["msg"]
         pipe = Popen([wm_msg, command], stdout=PIPE)
         self.py3_wrapper.log(
@@ -254,9 +321,13 @@ class Events(Thread):
             elif button == 2:
                 default_event = True
 
+        # only the modules reading the repeat count get their scroll events
+        # merged, their containers getting the same events
+        containers = self.py3_config[".module_groups"].get(module_name)
+        repeat = module.repeat_events and not containers
+
         # do the work
-        task = EventTask(module_name, event, default_event, self)
-        self.py3_wrapper.timeout_queue_add(task)
+        self.dispatcher.add(module_name, event, default_event, repeat)
 
     @profile
     def run(self):
@@ -25,6 +25,12 @@ class CommandError(Py3Exception):
         self.error = error
 
 
+class CommandTimeout(CommandError):
+    """
+    The command given did not finish in time and has been killed.
+    """
+
+
 class RequestException(Py3Exception):
     """
     A Py3.request() base exception.  This will catch any of the more specific
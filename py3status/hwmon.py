@@ -0,0 +1,274 @@
+"""
+Reading of the hardware sensors exposed by Linux in /sys/class/hwmon.
+
+The chips and their sensors are found once and named as lm_sensors names
+them, eg coretemp-isa-0000 and Core 0, so that the modules can read the
+sensors directly rather than running and parsing `sensors` on every refresh.
+Only the files of the sensors used are opened, they are then kept open and
+read again as the /proc files are.
+
+The label, compute, ignore and set statements of the lm_sensors
+configuration are not applied, the modules run `sensors` for the chips
+that the configuration has such statements for.
+"""
+
+import os
+import re
+import shlex
+
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+
+from py3status.sampler import ProcFile
+
+HWMON_PATH = "/sys/class/hwmon"
+# the configuration of lm_sensors, sensors.conf when sensors3.conf is missing
+SENSORS_CONFIG = ["/etc/sensors3.conf", "/etc/sensors.conf"]
+SENSORS_CONFIG_DIR = "/etc/sensors.d"
+# the statements changing the sensors of a chip
+CONFIG_STATEMENTS = ["compute", "ignore", "label", "set"]
+
+# the types of sensors in the order lm_sensors lists them and the factor
+# their values are divided by, eg temperatures are in millidegrees Celsius
+SENSOR_TYPES = OrderedDict(
+    [
+        ("in", 1000.0),
+        ("fan", 1.0),
+        ("temp", 1000.0),
+        ("power", 1000000.0),
+        ("energy", 1000000.0),
+        ("curr", 1000.0),
+        ("humidity", 1000.0),
+        ("intrusion", 1.0),
+    ]
+)
+SENSOR_FILE = re.compile(r"^([a-z]+)(\d+)_(\w+)$")
+# the sysfs files hold a single number
+READ_SIZE = 64
+
+
+def read_file(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except (IOError, OSError):
+        return None
+
+
+def chip_bus(path):
+    """
+    Return the name of the bus of a chip and its address as lm_sensors
+    formats them, eg isa-0000 or pci-0500, and the name of its adapter.
+    None for the devices that lm_sensors does not know and does not list.
+    """
+    device = os.path.join(path, "device")
+    if not os.path.exists(device):
+        return "virtual-0", "Virtual device"
+    name = os.path.basename(os.path.realpath(device))
+    subsystem = os.path.join(device, "subsystem")
+    subsystem = os.path.basename(os.path.realpath(subsystem))
+    if subsystem == "pci":
+        match = re.match(r"^(\w+):(\w+):(\w+)\.(\w+)$", name)
+        if match:
+            domain, bus, slot, function = [int(x, 16) for x in match.groups()]
+            address = (domain << 16) + (bus << 8) + (slot << 3) + function
+            return "pci-{:04x}".format(address), "PCI adapter"
+    elif subsystem in ["platform", "of_platform"]:
+        match = re.match(r"^[a-z0-9_]+\.(\d+)$", name)
+        address = int(match.group(1)) if match else 0
+        return "isa-{:04x}".format(address), "ISA adapter"
+    elif subsystem == "acpi":
+        match = re.match(r"^\w+:(\d+)$", name)
+        address = int(match.group(1)) if match else 0
+        return "acpi-{:x}".format(address), "ACPI interface"
+    elif subsystem == "i2c":
+        match = re.match(r"^(\d+)-([0-9a-f]+)$", name)
+        if match:
+            bus, address = int(match.group(1)), int(match.group(2), 16)
+            adapter = (
+                read_file("/sys/class/i2c-adapter/i2c-{}/name".format(bus))
+                or "i2c adapter"
+            )
+            return "i2c-{}-{:02x}".format(bus, address), adapter
+    elif subsystem == "spi":
+        match = re.match(r"^spi(\d+)\.(\d+)$", name)
+        if match:
+            bus, address = [int(x) for x in match.groups()]
+            return "spi-{}-{:x}".format(bus, address), "SPI adapter"
+    elif subsystem == "hid":
+        match = re.match(r"^(\w+):\w+:\w+\.(\w+)$", name)
+        if match:
+            bus, address = [int(x, 16) for x in match.groups()]
+            return "hid-{}-{:x}".format(bus, address), "HID adapter"
+    elif subsystem == "mdio_bus":
+        match = re.match(r"^[^:]+:([0-9a-fA-F]+)", name)
+        address = int(match.group(1), 16) if match else 0
+        return "mdio-{:x}".format(address), "MDIO adapter"
+    elif subsystem == "scsi":
+        match = re.match(r"^(\d+):(\d+):(\d+):(\d+)$", name)
+        if match:
+            host, channel, target, lun = [int(x) for x in match.groups()]
+            address = (channel << 24) | (target << 16) | lun
+            return "scsi-{}-{:x}".format(host, address), "SCSI adapter"
+    return None
+
+
+class Sensor:
+    """
+    A sensor of a chip, eg a temperature, with its values by name, eg input,
+    max or crit_alarm.
+    """
+
+    def __init__(self, label, scale):
+        self.files = {}
+        self.label = label
+        self.paths = OrderedDict()
+        self.scale = scale
+
+    def open(self, names=None):
+        """
+        Open the files of the values given by name, all of them if None.
+        """
+        for name, path in self.paths.items():
+            if name in self.files or (names is not None and name not in names):
+                continue
+            try:
+                self.files[name] = ProcFile(path, size=READ_SIZE)
+            except (IOError, OSError):
+                pass
+
+    def read(self):
+        """
+        Return the values of the opened files, None for those that cannot be
+        read, eg when the device is asleep.
+        """
+        values = OrderedDict()
+        for name in self.paths:
+            proc_file = self.files.get(name)
+            if proc_file is None:
+                continue
+            try:
+                value = float(proc_file.read())
+            except (IOError, OSError, ValueError):
+                values[name] = None
+                continue
+            if "alarm" not in name and "beep" not in name:
+                value /= self.scale
+            values[name] = value
+        return values
+
+
+class Chip:
+    """
+    A hwmon chip, eg coretemp-isa-0000, with its sensors by label.
+    """
+
+    def __init__(self, name, adapter, sensors):
+        self.adapter = adapter
+        self.name = name
+        self.sensors = sensors
+
+
+def get_sensors(path):
+    """
+    Return the sensors found in the directory of a chip by label.
+    """
+    found = {}
+    try:
+        files = os.listdir(path)
+    except OSError:
+        return OrderedDict()
+    for filename in files:
+        match = SENSOR_FILE.match(filename)
+        if not match or match.group(1) not in SENSOR_TYPES:
+            continue
+        sensor_type, number, name = match.groups()
+        key = (list(SENSOR_TYPES).index(sensor_type), int(number))
+        found.setdefault(key, {})[name] = os.path.join(path, filename)
+    sensors = OrderedDict()
+    for key in sorted(found):
+        sensor_type = list(SENSOR_TYPES)[key[0]]
+        paths = found[key]
+        label = paths.pop("label", None)
+        if label is not None:
+            label = read_file(label)
+        label = label or "{}{}".format(sensor_type, key[1])
+        sensor = Sensor(label, SENSOR_TYPES[sensor_type])
+        sensor.paths.update(sorted(paths.items()))
+        sensors[sensor.label] = sensor
+    return sensors
+
+
+def get_chips(hwmon_path=None):
+    """
+    Return the chips found, in the order of their hwmon devices.
+    """
+    hwmon_path = hwmon_path or HWMON_PATH
+    try:
+        entries = os.listdir(hwmon_path)
+    except OSError:
+        return []
+    # hwmon10 after hwmon9
+    entries.sort(key=lambda x: (len(x), x))
+    chips = []
+    for entry in entries:
+        path = os.path.join(hwmon_path, entry)
+        name = read_file(os.path.join(path, "name"))
+        sensors = get_sensors(path)
+        # older drivers keep their files in the device directory
+        if not sensors:
+            device = os.path.join(path, "device")
+            name = name or read_file(os.path.join(device, "name"))
+            sensors = get_sensors(device)
+        if not name or not sensors:
+            continue
+        bus = chip_bus(path)
+        if bus is None:
+            continue
+        chips.append(Chip("{}-{}".format(name, bus[0]), bus[1], sensors))
+    return chips
+
+
+def get_config_files():
+    """
+    Return the configuration files of lm_sensors in the order it reads them.
+    """
+    config_files = [x for x in SENSORS_CONFIG if os.path.isfile(x)][:1]
+    try:
+        names = sorted(os.listdir(SENSORS_CONFIG_DIR))
+    except OSError:
+        names = []
+    for name in names:
+        path = os.path.join(SENSORS_CONFIG_DIR, name)
+        if not name.startswith(".") and os.path.isfile(path):
+            config_files.append(path)
+    return config_files
+
+
+def get_configured_chips(chips, config_files=None):
+    """
+    Return the chips that the lm_sensors configuration has label, compute,
+    ignore or set statements for, eg with a chip "coretemp-*" statement.
+    """
+    if config_files is None:
+        config_files = get_config_files()
+    patterns = []
+    for config_file in config_files:
+        try:
+            with open(config_file) as f:
+                lines = f.readlines()
+        except (IOError, OSError):
+            continue
+        chip_patterns = []
+        for line in lines:
+            try:
+                words = shlex.split(line, comments=True)
+            except ValueError:
+                continue
+            if not words:
+                continue
+            if words[0] == "chip":
+                chip_patterns = words[1:]
+            elif words[0] in CONFIG_STATEMENTS:
+                patterns.extend(x for x in chip_patterns if x not in patterns)
+    return [chip for chip in chips if any(fnmatchcase(chip.name, x) for x in patterns)]
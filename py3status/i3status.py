@@ -61,6 +61,8 @@ class I3statusModule:
 
         # i3status modules always allow user defined click events in the config
         self.allow_config_clicks = True
+        # nor do they know about merged events
+        self.repeat_events = False
 
         # i3status returns different name/instances than it is sent we want to
         # be able to restore the correct ones.
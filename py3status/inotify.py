@@ -0,0 +1,187 @@
+"""
+Refresh modules when the files they display change, using Linux inotify.
+
+A single inotify instance and thread are shared by all the modules, they are
+set up when a module first subscribes.  inotify is used through ctypes so
+nothing needs to be installed, on other systems modules keep polling.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+
+from collections import defaultdict
+from threading import Lock, Thread, Timer
+
+# seconds to wait after an event for the burst of events it is part of to
+# end, eg a mail client writing several messages, before refreshing modules
+INOTIFY_DEBOUNCE = 0.2
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_IGNORED = 0x00008000
+IN_CLOEXEC = 0o2000000
+
+# the directories are watched for changes to themselves and to their entries
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_ATTRIB
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT = struct.Struct("iIII")
+READ_SIZE = 65536
+
+
+def load_libc():
+    """
+    Return the C library if it provides inotify, None otherwise.
+    """
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (AttributeError, OSError):
+        return None
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def parse_events(data):
+    """
+    Yield the watch descriptor, mask and name of the events read.
+    """
+    offset = 0
+    while offset < len(data):
+        wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        name = data[offset : offset + length].rstrip(b"\0")
+        offset += length
+        yield wd, mask, name
+
+
+class Inotify:
+    """
+    Refresh the modules subscribed to files or directories when they change,
+    see Py3.inotify_subscribe()
+
+    Files are watched through their directory so that they can be replaced,
+    eg by editors or mail clients writing a new file then renaming it.
+    """
+
+    def __init__(self, py3_wrapper):
+        self.available = None
+        self.consumers = defaultdict(list)
+        self.fd = None
+        self.libc = None
+        self.lock = Lock()
+        self.pending = []
+        self.py3_wrapper = py3_wrapper
+        self.timer = None
+
+    def _start(self):
+        self.libc = load_libc()
+        if self.libc is None:
+            return False
+        fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return False
+        self.fd = fd
+        thread = Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        self.py3_wrapper.log("inotify monitoring enabled")
+        return True
+
+    def subscribe(self, py3_module, paths, callback=None):
+        """
+        Refresh the module when one of the paths changes.  If given, the
+        callback is called first and the module only refreshed if it returns
+        True.  Returns False if inotify is not available or a path cannot be
+        watched.
+        """
+        with self.lock:
+            if self.available is None:
+                self.available = self._start()
+            if not self.available:
+                return False
+            for path in paths:
+                path = os.path.abspath(path)
+                if os.path.isdir(path):
+                    directory, name = path, None
+                else:
+                    directory, name = os.path.split(path)
+                    name = name.encode("utf-8")
+                wd = self.libc.inotify_add_watch(
+                    self.fd, directory.encode("utf-8"), WATCH_MASK
+                )
+                if wd < 0:
+                    self.py3_wrapper.log(
+                        "module %s cannot watch %s: %s"
+                        % (
+                            py3_module.module_full_name,
+                            directory,
+                            os.strerror(ctypes.get_errno()),
+                        )
+                    )
+                    return False
+                consumer = (py3_module, name, callback)
+                if consumer not in self.consumers[wd]:
+                    self.consumers[wd].append(consumer)
+        return True
+
+    def run(self):
+        while True:
+            try:
+                data = os.read(self.fd, READ_SIZE)
+            except OSError as e:
+                self.py3_wrapper.log("inotify monitoring stopped: {}".format(e))
+                return
+            for wd, mask, name in parse_events(data):
+                self.event(wd, mask, name)
+
+    def event(self, wd, mask, name):
+        """
+        Queue the refresh of the modules interested in the event.
+        """
+        with self.lock:
+            if mask & IN_IGNORED:
+                # the directory is gone, refresh the modules so that they
+                # can go back to polling
+                for py3_module, watched, callback in self.consumers.pop(wd, []):
+                    if (py3_module, None) not in self.pending:
+                        self.pending.append((py3_module, None))
+            for py3_module, watched, callback in self.consumers.get(wd, []):
+                if watched is not None and name and name != watched:
+                    continue
+                if (py3_module, callback) not in self.pending:
+                    self.pending.append((py3_module, callback))
+            if self.pending and self.timer is None:
+                self.timer = Timer(INOTIFY_DEBOUNCE, self.events_done)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def events_done(self):
+        with self.lock:
+            pending, self.pending = self.pending, []
+            self.timer = None
+        refreshed = []
+        for py3_module, callback in pending:
+            if py3_module in refreshed:
+                continue
+            if callback is None or callback():
+                refreshed.append(py3_module)
+                py3_module.force_update()
@@ -8,7 +8,12 @@ from random import randint
 
 from py3status.composite import Composite
 from py3status.constants import MARKUP_LANGUAGES, POSITIONS
-from py3status.py3 import Py3, PY3_CACHE_FOREVER, ModuleErrorException
+from py3status.py3 import (
+    Py3,
+    PY3_CACHE_FOREVER,
+    ModuleErrorException,
+    ModuleRetryException,
+)
 from py3status.profiling import profile
 from py3status.formatter import Formatter
 
@@ -18,6 +23,9 @@ try:
 except NameError:
     basestring = str
 
+# coroutines are only available in python 3.5+
+iscoroutinefunction = getattr(inspect, "iscoroutinefunction", lambda x: False)
+
 
 class Module:
     """
@@ -46,6 +54,7 @@ class Module:
         self.has_post_config_hook = False
         self.has_kill = False
         self.i3status_thread = py3_wrapper.i3status_thread
+        self.is_async = False
         self.last_output = []
         self.methods = OrderedDict()
         self.module_class = instance
@@ -55,6 +64,7 @@ class Module:
         self.new_update = False
         self.nagged = False
         self.prevent_refresh = False
+        self.repeat_events = False
         self.sleeping = False
         self.terminated = False
         self.testing = self.config.get("testing")
@@ -618,6 +628,13 @@ class Module:
             except AttributeError:
                 pass
 
+            # modules reading the repeat count of their click events have
+            # their scroll events merged
+            try:
+                self.repeat_events = class_inst.Meta.repeat_events
+            except AttributeError:
+                pass
+
             # module configuration
             fn = self._py3_wrapper.get_config_attribute
             mod_config = self.config["py3_config"].get(module, {})
@@ -845,8 +862,10 @@ class Module:
                     m_type = type(getattr(class_inst, method))
                     if "method" in str(m_type):
                         params_type = self._params_type(method, class_inst)
+                        coroutine = iscoroutinefunction(getattr(class_inst, method))
                         if method == "on_click":
                             self.click_events = params_type
+                            self.is_async |= coroutine
                         elif method == "kill":
                             self.has_kill = params_type
                         elif method == "post_config_hook":
@@ -857,18 +876,25 @@ class Module:
                             method_obj = {
                                 "cached_until": time(),
                                 "call_type": params_type,
+                                "coroutine": coroutine,
                                 "instance": None,
                                 "last_output": {"name": method, "full_text": ""},
                                 "method": method,
                                 "name": None,
                             }
                             self.methods[method] = method_obj
+                            self.is_async |= coroutine
 
         # done, log some debug info
         if self.config["debug"]:
             self._py3_wrapper.log(
-                'module "{}" click_events={} has_kill={} methods={}'.format(
-                    module, self.click_events, self.has_kill, self.methods.keys()
+                'module "{}" click_events={} has_kill={} is_async={} '
+                "methods={}".format(
+                    module,
+                    self.click_events,
+                    self.has_kill,
+                    self.is_async,
+                    self.methods.keys(),
                 )
             )
 
@@ -898,14 +924,17 @@ class Module:
                 click_method = getattr(self.module_class, "on_click")
                 if self.click_events == self.PARAMS_NEW:
                     # new style modules
-                    click_method(event)
+                    result = click_method(event)
                 else:
                     # legacy modules had extra parameters passed
-                    click_method(
+                    result = click_method(
                         self.i3status_thread.json_list,
                         self.config["py3_config"]["general"],
                         event,
                     )
+                if iscoroutinefunction(click_method):
+                    # run the coroutine on the shared event loop
+                    self._py3_wrapper.async_loop.run_coroutine(result)
                 self.set_updated()
             else:
                 # nothing has happened so no need for refresh
@@ -914,6 +943,155 @@ class Module:
             msg = "on_click event in `{}` failed".format(self.module_full_name)
             self._py3_wrapper.report_exception(msg)
 
+    def call_method(self, meth):
+        """
+        Call the named method of the module and return its response.
+        For coroutine methods this is an awaitable.
+        """
+        method = getattr(self.module_class, meth)
+        if self.methods[meth]["call_type"] == self.PARAMS_NEW:
+            # new style modules
+            return method()
+        # legacy modules had parameters passed
+        return method(
+            self.i3status_thread.json_list, self.config["py3_config"]["general"]
+        )
+
+    def process_response(self, meth, response, cache_time):
+        """
+        Validate and store the response of the named method.
+        Returns the updated time at which the module next needs to run.
+        """
+        my_method = self.methods[meth]
+
+        if isinstance(response, dict):
+            # this is a shiny new module giving a dict response
+            result = response
+        elif isinstance(response, tuple):
+            # this is an old school module reporting its position
+            position, result = response
+            if not isinstance(result, dict):
+                raise TypeError("response should be a dict")
+        else:
+            raise TypeError("response should be a dict")
+
+        if isinstance(response.get("full_text"), (list, Composite)):
+            response["composite"] = response["full_text"]
+            del response["full_text"]
+        if "composite" in response:
+            self.process_composite(response)
+        else:
+            # validate the response
+            if "full_text" not in result:
+                err = 'missing "full_text" key in response'
+                raise KeyError(err)
+            # Remove any none color from our output
+            if hasattr(result.get("color"), "none_setting"):
+                del result["color"]
+            # remove urgent if not allowed
+            if not self.allow_urgent and "urgent" in result:
+                del result["urgent"]
+            # set universal module options in result
+            result.update(self.i3bar_module_options)
+
+        result["instance"] = self.module_inst
+        result["name"] = self.module_name
+
+        # initialize method object
+        if my_method["name"] is None:
+            my_method["name"] = result["name"]
+            if "instance" in result:
+                my_method["instance"] = result["instance"]
+            else:
+                my_method["instance"] = result["name"]
+
+        # update method object cache
+        if "cached_until" in result:
+            cached_until = result["cached_until"]
+            # remove this so we can check later for output changes
+            del result["cached_until"]
+        else:
+            # get module default cached_until
+            cached_until = self.module_class.py3.time_in()
+        my_method["cached_until"] = cached_until
+        if not cache_time or cached_until < cache_time:
+            cache_time = cached_until
+
+        # update method object output
+        if "composite" in response:
+            my_method["last_output"] = result["composite"]
+        else:
+            my_method["last_output"] = result
+
+        # debug info
+        if self.config["debug"]:
+            self._py3_wrapper.log("method {} returned {} ".format(meth, result))
+        # module working correctly so ensure module works as
+        # expected
+        self.allow_config_clicks = True
+        self.error_messages = None
+        self.error_hide = False
+
+        # mark module as updated
+        self.set_updated()
+        return cache_time
+
+    def process_exception(self, meth, e, cache_time):
+        """
+        Handle an exception raised by the named method.  This must be called
+        from within the except block.
+        Returns the updated time at which the module next needs to run.
+        """
+        if isinstance(e, ModuleRetryException):
+            # module wants to be run again soon, eg to retry a failed
+            # request, so keep its output and reschedule the method
+            cached_until = time() + e.timeout
+            self.methods[meth]["cached_until"] = cached_until
+            if not cache_time or cached_until < cache_time:
+                cache_time = cached_until
+
+        elif isinstance(e, ModuleErrorException):
+            # module has indicated that it has an error
+            self.runtime_error(e.msg, meth)
+            if e.timeout:
+                if e.timeout is PY3_CACHE_FOREVER:
+                    cache_time = PY3_CACHE_FOREVER
+                else:
+                    cache_time = time() + e.timeout
+            else:
+                cache_time = time() + getattr(
+                    self.module_class, "cache_timeout", self.config["cache_timeout"]
+                )
+
+        else:
+            msg = "Instance `{}`, user method `{}` failed"
+            msg = msg.format(self.module_full_name, meth)
+            if not self.testing:
+                self._py3_wrapper.report_exception(msg, notify_user=False)
+            # added error
+            self.runtime_error(str(e) or e.__class__.__name__, meth)
+            cache_time = time() + getattr(
+                self.module_class, "cache_timeout", self.config["cache_timeout"]
+            )
+        return cache_time
+
+    def schedule(self, cache_time):
+        """
+        Set the module to run again once the given cache_time is reached.
+        """
+        if cache_time is None:
+            cache_time = time() + self.config["cache_timeout"]
+        self.cache_time = cache_time
+        # new style modules can signal they want to cache forever
+        if cache_time == PY3_CACHE_FOREVER:
+            return
+        # don't be hasty mate
+        # set timeout to do update next time one is needed
+        if not cache_time:
+            cache_time = time() + self.config["minimum_interval"]
+
+        self._py3_wrapper.timeout_queue_add(self, cache_time)
+
     @profile
     def run(self):
         """
@@ -926,8 +1104,6 @@ class Module:
             cache_time = None
             # execute each method of this module
             for meth, obj in self.methods.items():
-                my_method = self.methods[meth]
-
                 # always check py3status is running
                 if not self._py3_wrapper.running:
                     break
@@ -940,128 +1116,18 @@ class Module:
 
                 try:
                     # execute method and get its output
-                    method = getattr(self.module_class, meth)
-                    if my_method["call_type"] == self.PARAMS_NEW:
-                        # new style modules
-                        response = method()
-                    else:
-                        # legacy modules had parameters passed
-                        response = method(
-                            self.i3status_thread.json_list,
-                            self.config["py3_config"]["general"],
-                        )
-
-                    if isinstance(response, dict):
-                        # this is a shiny new module giving a dict response
-                        result = response
-                    elif isinstance(response, tuple):
-                        # this is an old school module reporting its position
-                        position, result = response
-                        if not isinstance(result, dict):
-                            raise TypeError("response should be a dict")
-                    else:
-                        raise TypeError("response should be a dict")
-
-                    if isinstance(response.get("full_text"), (list, Composite)):
-                        response["composite"] = response["full_text"]
-                        del response["full_text"]
-                    if "composite" in response:
-                        self.process_composite(response)
-                    else:
-                        # validate the response
-                        if "full_text" not in result:
-                            err = 'missing "full_text" key in response'
-                            raise KeyError(err)
-                        # Remove any none color from our output
-                        if hasattr(result.get("color"), "none_setting"):
-                            del result["color"]
-                        # remove urgent if not allowed
-                        if not self.allow_urgent and "urgent" in result:
-                            del result["urgent"]
-                        # set universal module options in result
-                        result.update(self.i3bar_module_options)
-
-                    result["instance"] = self.module_inst
-                    result["name"] = self.module_name
-
-                    # initialize method object
-                    if my_method["name"] is None:
-                        my_method["name"] = result["name"]
-                        if "instance" in result:
-                            my_method["instance"] = result["instance"]
-                        else:
-                            my_method["instance"] = result["name"]
-
-                    # update method object cache
-                    if "cached_until" in result:
-                        cached_until = result["cached_until"]
-                        # remove this so we can check later for output changes
-                        del result["cached_until"]
-                    else:
-                        # get module default cached_until
-                        cached_until = self.module_class.py3.time_in()
-                    my_method["cached_until"] = cached_until
-                    if not cache_time or cached_until < cache_time:
-                        cache_time = cached_until
-
-                    # update method object output
-                    if "composite" in response:
-                        my_method["last_output"] = result["composite"]
-                    else:
-                        my_method["last_output"] = result
-
-                    # debug info
-                    if self.config["debug"]:
-                        self._py3_wrapper.log(
-                            "method {} returned {} ".format(meth, result)
-                        )
-                    # module working correctly so ensure module works as
-                    # expected
-                    self.allow_config_clicks = True
-                    self.error_messages = None
-                    self.error_hide = False
-
-                    # mark module as updated
-                    self.set_updated()
-
-                except ModuleErrorException as e:
-                    # module has indicated that it has an error
-                    self.runtime_error(e.msg, meth)
-                    if e.timeout:
-                        if e.timeout is PY3_CACHE_FOREVER:
-                            cache_time = PY3_CACHE_FOREVER
-                        else:
-                            cache_time = time() + e.timeout
-                    else:
-                        cache_time = time() + getattr(
-                            self.module_class,
-                            "cache_timeout",
-                            self.config["cache_timeout"],
-                        )
-
+                    response = self.call_method(meth)
+                    if obj["coroutine"]:
+                        # we are not running on the event loop, eg when
+                        # testing, so wait for the coroutine here
+                        from py3status.async_loop import run_coroutine
+
+                        response = run_coroutine(response)
+                    cache_time = self.process_response(meth, response, cache_time)
                 except Exception as e:
-                    msg = "Instance `{}`, user method `{}` failed"
-                    msg = msg.format(self.module_full_name, meth)
-                    if not self.testing:
-                        self._py3_wrapper.report_exception(msg, notify_user=False)
-                    # added error
-                    self.runtime_error(str(e) or e.__class__.__name__, meth)
-                    cache_time = time() + getattr(
-                        self.module_class, "cache_timeout", self.config["cache_timeout"]
-                    )
-
-            if cache_time is None:
-                cache_time = time() + self.config["cache_timeout"]
-            self.cache_time = cache_time
-            # new style modules can signal they want to cache forever
-            if cache_time == PY3_CACHE_FOREVER:
-                return
-            # don't be hasty mate
-            # set timeout to do update next time one is needed
-            if not cache_time:
-                cache_time = time() + self.config["minimum_interval"]
+                    cache_time = self.process_exception(meth, e, cache_time)
 
-            self._py3_wrapper.timeout_queue_add(self, cache_time)
+            self.schedule(cache_time)
 
     def kill(self):
         # check and execute the 'kill' method if present
@@ -13,7 +13,9 @@ Configuration parameters:
         (default 5)
     button_up: Button to click to increase brightness. Setting to 0 disables.
         (default 4)
-    cache_timeout: How often we refresh this module in seconds (default 10)
+    cache_timeout: How often we refresh this module in seconds, unless
+        refreshed on udev events
+        (default 10)
     command: The program to use to change the backlight.
         Currently xbacklight and light are supported. The program needs
         to be installed and on your path. If no program is installed, this
@@ -29,6 +31,9 @@ Configuration parameters:
     low_tune_threshold: If current brightness value is below this threshold,
         the value is changed by a minimal value instead of the brightness_delta.
         (default 0)
+    on_udev_backlight: dynamic variable to watch for `backlight` udev subsystem
+        events to trigger specified action.
+        (default 'refresh_and_freeze')
 
 Format placeholders:
     {level} brightness
@@ -37,6 +42,8 @@ Requires: one of
     xbacklight: need for changing brightness, not detection
     light: program to easily change brightness on backlight-controllers
     pydbus + logind v243: logind to change brightness without X
+    pyudev: to refresh the module as soon as the brightness changes instead
+        of every cache_timeout
 
 @author Tjaart van der Walt (github:tjaartvdwalt), Jérémy Rosen (github:boucman)
 @license BSD
@@ -48,10 +55,7 @@ SAMPLE OUTPUT
 from __future__ import division
 import os
 
-try:
-    from pydbus import SystemBus
-except ImportError:
-    pass
+from py3status.sampler import ProcFile
 
 STRING_NOT_AVAILABLE = "no available device"
 
@@ -93,8 +97,12 @@ class Py3status:
     format = u"☼: {level}%"
     hide_when_unavailable = False
     low_tune_threshold = 0
+    on_udev_backlight = "refresh_and_freeze"
 
     class Meta:
+        # scroll events are merged, on_click reads their repeat count
+        repeat_events = True
+
         deprecated = {
             "rename": [
                 {
@@ -106,12 +114,14 @@ class Py3status:
         }
 
     def post_config_hook(self):
+        self.brightness_file = None
+        self.brightness_max = None
         try:
-            self._logind_proxy = SystemBus().get(
+            self._logind_proxy = self.py3.get_dbus("system").get(
                 bus_name="org.freedesktop.login1",
                 object_path="/org/freedesktop/login1/session/self",
             )
-        except NameError:
+        except ImportError:
             self._logind_proxy = None
 
         if not self.device:
@@ -145,15 +155,19 @@ class Py3status:
     def on_click(self, event):
         level = self._get_backlight_level()
         button = event["button"]
+        # scrolling fast can be reported as one event repeated
+        repeat = event.get("repeat", 1)
         if button == self.button_up:
-            delta = self.brightness_delta if level >= self.low_tune_threshold else 1
-            level += delta
+            for x in range(repeat):
+                delta = self.brightness_delta if level >= self.low_tune_threshold else 1
+                level += delta
             if level > 100:
                 level = 100
             self._set_backlight_level(level)
         elif button == self.button_down:
-            delta = self.brightness_delta if level > self.low_tune_threshold else 1
-            level -= delta
+            for x in range(repeat):
+                delta = self.brightness_delta if level > self.low_tune_threshold else 1
+                level -= delta
             if level < self.brightness_minimal:
                 level = self.brightness_minimal
             self._set_backlight_level(level)
@@ -163,9 +177,9 @@ class Py3status:
             self.py3.command_run(self._command_set(level))
             return
         if self._logind_proxy:
-            for brightness_max_line in open("%s/max_brightness" % self.device, "rb"):
-                brightness_max = int(brightness_max_line)
-            brightness = brightness_max * level / 100
+            if self.brightness_max is None:
+                self._open_device()
+            brightness = self.brightness_max * level / 100
             self._logind_proxy.SetBrightness(
                 "backlight", os.path.basename(os.path.normpath(self.device)), brightness
             )
@@ -173,11 +187,30 @@ class Py3status:
     def _get_backlight_level(self):
         if self.command_available:
             return float(self.py3.command_output(self._command_get()))
-        for brightness_line in open("%s/brightness" % self.device, "rb"):
-            brightness = int(brightness_line)
-        for brightness_max_line in open("%s/max_brightness" % self.device, "rb"):
-            brightness_max = int(brightness_max_line)
-        return brightness * 100 / brightness_max
+        if self.brightness_file is None:
+            self._open_device()
+        try:
+            brightness = int(self.brightness_file.read())
+        except (IOError, OSError, ValueError):
+            # the device was removed and added again, open it again
+            self._close_device()
+            self._open_device()
+            brightness = int(self.brightness_file.read())
+        return brightness * 100 / self.brightness_max
+
+    def _open_device(self):
+        """
+        Read max_brightness once and keep brightness open to read it again.
+        """
+        with open("%s/max_brightness" % self.device, "rb") as f:
+            self.brightness_max = int(f.read())
+        self.brightness_file = ProcFile("%s/brightness" % self.device, size=64)
+
+    def _close_device(self):
+        if self.brightness_file is not None:
+            self.brightness_file.close()
+        self.brightness_file = None
+        self.brightness_max = None
 
     # Returns the string array for the command to get the current backlight level
     def _command_get(self):
@@ -199,6 +232,9 @@ class Py3status:
         }
         return response
 
+    def kill(self):
+        self._close_device()
+
 
 if __name__ == "__main__":
     """
@@ -58,7 +58,8 @@ Format placeholders:
     {icon} - a character representing the battery level,
         as defined by the 'blocks' and 'charging_character' parameters
     {percent} - the remaining battery percentage (previously '{}')
-    {time_remaining} - the remaining time until the battery is empty
+    {time_remaining} - the remaining time until the battery is empty, with
+        'sys' from the average rate of the last readings
 
 Color options:
     color_bad: Battery level is below threshold_bad
@@ -81,12 +82,15 @@ discharging
 """
 
 from __future__ import division  # python2 compatibility
+from collections import deque
+from fnmatch import fnmatch
 from re import findall
-from glob import iglob
 
 import math
 import os
 
+from py3status.sampler import ProcFile
+
 BLOCKS = u"_▁▂▃▄▅▆▇█"
 CHARGING_CHARACTER = u"⚡"
 EMPTY_BLOCK_CHARGING = u"|"
@@ -98,6 +102,15 @@ FORMAT_NOTIFY_DISCHARGING = u"{time_remaining}"
 SYS_BATTERY_PATH = u"/sys/class/power_supply/"
 MEASUREMENT_MODE = None
 FULLY_CHARGED = u"?"
+# the sysfs attributes read for each battery, the first found of each
+SYS_ATTRIBUTES = [
+    ("capacity", ["energy_full", "charge_full"]),
+    ("remaining_energy", ["energy_now", "charge_now"]),
+    ("present_rate", ["power_now", "current_now", "voltage_now"]),
+    ("status", ["status"]),
+]
+# number of rate readings the remaining time is computed from
+RATE_SAMPLES = 10
 
 
 class Py3status:
@@ -156,6 +169,7 @@ class Py3status:
 
     def post_config_hook(self):
         self.last_known_status = ""
+        self.power_supplies = None
         # Guess mode if not set
         if self.measurement_mode is None:
             if os.path.isdir(self.sys_battery_path):
@@ -263,6 +277,52 @@ class Py3status:
 
         return [_parse_battery_info(battery) for battery in acpi_list]
 
+    def _get_power_supplies(self, names):
+        """
+        Find the batteries and AC adapters and open the files of the
+        attributes read, once rather than on every refresh.
+        """
+        batteries = []
+        adapters = []
+        for name in names:
+            path = os.path.join(self.sys_battery_path, name)
+            try:
+                if fnmatch(name, "BAT*"):
+                    files = {}
+                    for key, attributes in SYS_ATTRIBUTES:
+                        for attribute in attributes:
+                            if os.path.exists(os.path.join(path, attribute)):
+                                files[key] = ProcFile(
+                                    os.path.join(path, attribute), size=64
+                                )
+                                break
+                    batteries.append(
+                        {
+                            "charging": None,
+                            "files": files,
+                            "rates": deque(maxlen=RATE_SAMPLES),
+                        }
+                    )
+                else:
+                    with open(os.path.join(path, "type")) as f:
+                        if f.read().strip() == "Mains":
+                            adapters.append(
+                                ProcFile(os.path.join(path, "online"), size=64)
+                            )
+            except (IOError, OSError):
+                continue
+        return {"adapters": adapters, "batteries": batteries, "names": names}
+
+    def _close_power_supplies(self):
+        if self.power_supplies is None:
+            return
+        for battery in self.power_supplies["batteries"]:
+            for proc_file in battery["files"].values():
+                proc_file.close()
+        for proc_file in self.power_supplies["adapters"]:
+            proc_file.close()
+        self.power_supplies = None
+
     def _extract_battery_info_from_sys(self):
         """
         Extract the percent charged, charging state, time remaining,
@@ -270,47 +330,62 @@ class Py3status:
 
         Only available in kernel 2.6.24(?) and newer. Before kernel provided
         a similar, yet incompatible interface in /proc
-        """
 
-        if not os.listdir(self.sys_battery_path):
+        Only the attributes used are read, rather than the uevent file which
+        has the driver read all of them, and the rate is averaged over the
+        last readings.
+        """
+        names = os.listdir(self.sys_battery_path)
+        if not names:
             return []
-
-        def _parse_battery_info(sys_path):
-            """
-            Extract battery information from uevent file, already convert to
-            int if necessary
-            """
-            raw_values = {}
-            with open(os.path.join(sys_path, u"uevent")) as f:
-                for var in f.read().splitlines():
-                    k, v = var.split("=")
-                    try:
-                        raw_values[k] = int(v)
-                    except ValueError:
-                        raw_values[k] = v
-            return raw_values
+        for retry in range(2):
+            # batteries or adapters were added or removed
+            if self.power_supplies is None or self.power_supplies["names"] != names:
+                self._close_power_supplies()
+                self.power_supplies = self._get_power_supplies(names)
+            try:
+                online = [x.read() for x in self.power_supplies["adapters"]]
+                values = []
+                for battery in self.power_supplies["batteries"]:
+                    r = {}
+                    for key, proc_file in battery["files"].items():
+                        value = proc_file.read().decode("utf-8").strip()
+                        r[key] = value if key == "status" else int(value)
+                    values.append(r)
+                break
+            except (IOError, OSError, ValueError):
+                # a battery was removed, find them again
+                self._close_power_supplies()
+                names = os.listdir(self.sys_battery_path)
+        else:
+            return []
+        if online != self.power_supplies.get("online"):
+            # plugged or unplugged, the previous rates are meaningless
+            self.power_supplies["online"] = online
+            for battery in self.power_supplies["batteries"]:
+                battery["rates"].clear()
 
         battery_list = []
-        for path in iglob(os.path.join(self.sys_battery_path, "BAT*")):
-            r = _parse_battery_info(path)
-
-            capacity = r.get(
-                "POWER_SUPPLY_ENERGY_FULL", r.get("POWER_SUPPLY_CHARGE_FULL")
-            )
-            present_rate = r.get(
-                "POWER_SUPPLY_POWER_NOW",
-                r.get("POWER_SUPPLY_CURRENT_NOW", r.get("POWER_SUPPLY_VOLTAGE_NOW")),
-            )
-            remaining_energy = r.get(
-                "POWER_SUPPLY_ENERGY_NOW", r.get("POWER_SUPPLY_CHARGE_NOW")
-            )
+        for r, state in zip(values, self.power_supplies["batteries"]):
+            capacity = r.get("capacity")
+            remaining_energy = r.get("remaining_energy")
 
             battery = {}
             battery["capacity"] = capacity
-            battery["charging"] = "Charging" in r["POWER_SUPPLY_STATUS"]
+            battery["charging"] = "Charging" in r["status"]
             battery["percent_charged"] = int(
                 math.floor(remaining_energy / capacity * 100)
             )
+
+            rates = state["rates"]
+            if battery["charging"] != state["charging"]:
+                state["charging"] = battery["charging"]
+                rates.clear()
+            if r.get("present_rate"):
+                rates.append(r["present_rate"])
+            else:
+                rates.clear()
+            present_rate = sum(rates) / len(rates) if rates else 0
             try:
                 if battery["charging"]:
                     time_in_secs = (capacity - remaining_energy) / present_rate * 3600
@@ -3,7 +3,8 @@
 Display bluetooth status.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 10)
+    cache_timeout: refresh interval for this module, only used when
+        bluez cannot notify us of the connections (default 10)
     format: display format for this module (default 'BT[: {format_device}]')
     format_device: display format for bluetooth devices (default '{name}')
     format_separator: show separator if more than one (default '\|')
@@ -32,13 +33,10 @@ off
 {'color': '#FF0000', 'full_text': u'BT'}
 """
 
-from pydbus import SystemBus
-
 DEFAULT_FORMAT = "BT[: {format_device}]"
 
 
-def get_connected_devices():
-    bus = SystemBus()
+def get_connected_devices(bus):
     manager = bus.get("org.bluez", "/")["org.freedesktop.DBus.ObjectManager"]
     objects = manager.GetManagedObjects()
     devices = []
@@ -87,6 +85,20 @@ class Py3status:
         }
 
     def post_config_hook(self):
+        # get updated when devices connect or disconnect rather than polling
+        self.bus = self.py3.get_dbus("system")
+        try:
+            # only the properties shown, eg not the signal strength
+            self.py3.dbus_subscribe(
+                "org.bluez",
+                interface="org.bluez.Device1",
+                bus="system",
+                properties=["Address", "Connected", "Name"],
+            )
+            self.cache_timeout = self.py3.CACHE_FOREVER
+        except Exception:
+            pass
+
         # DEPRECATION WARNING. SPECIAL CASE. DO NOT USE THIS AS EXAMPLE.
         format_prefix = getattr(self, "format_prefix", None)
         format_no_conn = getattr(self, "format_no_conn", None)
@@ -118,7 +130,7 @@ class Py3status:
             self.py3.log(msg)
 
     def bluetooth(self):
-        devices = get_connected_devices()
+        devices = get_connected_devices(self.bus)
 
         if devices:
             data = []
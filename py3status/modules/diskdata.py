@@ -57,7 +57,8 @@ SAMPLE OUTPUT
 """
 
 from __future__ import division  # python2 compatibility
-from time import time
+
+import os
 
 
 class Py3status:
@@ -92,65 +93,73 @@ class Py3status:
                 self.init[name] = {"placeholders": placeholders, "keys": match}
 
         if self.init["diskstats"]:
-            self.last_diskstats = self._get_diskstats(self.disk)
-            self.last_time = time()
+            # take a first sample to compute the rates from
+            self.py3.get_proc("diskstats")
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
     def _get_df_usages(self, disk):
-        df_usages = self.py3.command_output(["df", "-k"])
+        # the mounts are only read again when they change
+        mounts = self.py3.get_proc("mountinfo")
         total, used, free, devs = 0, 0, 0, []
 
         if disk and not disk.startswith("/dev/"):
             disk = "/dev/" + disk
 
-        for line in df_usages.splitlines():
-            if (disk and line.startswith(disk)) or (
-                disk is None and line.startswith("/dev/")
+        for device, mount_point, _ in mounts:
+            if (disk and device.startswith(disk)) or (
+                disk is None and device.startswith("/dev/")
             ):
-                data = line.split()
-                if data[0] in devs:
+                if device in devs:
                     # Make sure to count each block device only one time
                     # some filesystems eg btrfs have multiple entries
                     continue
-                total += int(data[1]) / 1024 / 1024
-                used += int(data[2]) / 1024 / 1024
-                free += int(data[3]) / 1024 / 1024
-                devs.append(data[0])
+                try:
+                    stat = os.statvfs(mount_point)
+                except OSError:
+                    continue
+                # in GiB, as df reports them
+                block_size = stat.f_frsize / 1024 / 1024 / 1024
+                total += stat.f_blocks * block_size
+                used += (stat.f_blocks - stat.f_bfree) * block_size
+                free += stat.f_bavail * block_size
+                devs.append(device)
 
         if total == 0:
             return free, used, "err", total
 
         return free, used, 100 * used / total, total
 
-    def _get_diskstats(self, disk):
+    def _get_diskstats(self, disk, diskstats):
         read, write = 0, 0
 
         if disk and disk.startswith("/dev/"):
             disk = disk[5:]
 
-        with open("/proc/diskstats") as fd:
-            for line in fd:
-                data = line.split()
-                if disk:
-                    if data[2] == disk:
-                        read += int(data[5]) * self.sector_size
-                        write += int(data[9]) * self.sector_size
-                else:
-                    if data[1] == "0":
-                        read += int(data[5]) * self.sector_size
-                        write += int(data[9]) * self.sector_size
+        if disk:
+            data = diskstats.get(disk)
+            if data:
+                read += data[4] * self.sector_size
+                write += data[8] * self.sector_size
+        else:
+            for data in diskstats.values():
+                if data[1] == 0:
+                    read += data[4] * self.sector_size
+                    write += data[8] * self.sector_size
 
         return read, write
 
-    def _calc_diskstats(self, diskstats):
-        current_time = time()
-        timedelta = current_time - self.last_time
-        read = (diskstats[0] - self.last_diskstats[0]) / timedelta
-        write = (diskstats[1] - self.last_diskstats[1]) / timedelta
+    def _calc_diskstats(self):
+        timedelta, diskstats, last_diskstats = self.py3.get_proc_delta(
+            "diskstats", self.cache_timeout
+        )
+        if last_diskstats is None:
+            return 0, 0, 0
+        diskstats = self._get_diskstats(self.disk, diskstats)
+        last_diskstats = self._get_diskstats(self.disk, last_diskstats)
+        read = (diskstats[0] - last_diskstats[0]) / timedelta
+        write = (diskstats[1] - last_diskstats[1]) / timedelta
         total = read + write
-        self.last_diskstats = diskstats
-        self.last_time = current_time
 
         return read, write, total
 
@@ -169,7 +178,7 @@ class Py3status:
                 )
 
         if self.init["diskstats"]:
-            diskstats = self._calc_diskstats(self._get_diskstats(self.disk))
+            diskstats = self._calc_diskstats()
             data = dict(zip(self.init["diskstats"]["keys"], diskstats))
             threshold_data.update(data)
 
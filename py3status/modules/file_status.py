@@ -3,7 +3,8 @@
 Display if files or directories exists.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 10)
+    cache_timeout: refresh interval for this module, when the directories of
+        the paths cannot be watched for changes with inotify (default 10)
     format: display format for this module
         (default '\?color=path [\?if=path ●|■]')
     format_path: format for paths (default '{basename}')
@@ -53,8 +54,8 @@ missing
 {'color': '#FF0000', 'full_text': u'\u25a0'}
 """
 
-from glob import glob
-from os.path import basename, expanduser
+from glob import glob, has_magic
+from os.path import basename, dirname, expanduser, isdir
 
 STRING_NO_PATHS = "missing paths"
 
@@ -116,9 +117,33 @@ class Py3status:
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
+        self.directories = sorted(set(dirname(path) for path in self.paths))
+        self.matches = None
+
+    def _glob(self):
+        return sorted([files for path in self.paths for files in glob(path)])
+
+    def _matches_changed(self):
+        # called on changes in the directories, refresh only if needed
+        return self._glob() != self.matches
+
+    def _watch(self):
+        """
+        Watch the directories of the paths, when they exist and are not
+        patterns themselves, rather than polling them.
+        """
+        if any(has_magic(x) or not isdir(x) for x in self.directories):
+            return False
+        return self.py3.inotify_subscribe(self.directories, self._matches_changed)
+
     def file_status(self):
+        # watching again is cheap and picks up removed directories once
+        # they are back, the module is only run on changes meanwhile
+        self.watching = self._watch()
+
         # init data
-        paths = sorted([files for path in self.paths for files in glob(path)])
+        paths = self._glob()
+        self.matches = paths
         count_path = len(paths)
         format_path = None
 
@@ -145,8 +170,13 @@ class Py3status:
             if x in ["path", "paths"]:
                 self.py3.threshold_get_color(count_path, x)
 
+        if self.watching:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(
                 self.format,
                 {"path": count_path, "paths": count_path, "format_path": format_path},
@@ -67,9 +67,6 @@ unknown
 {'color': '#FF0000', 'full_text': u'unknown device'}
 """
 
-from pydbus import SessionBus
-
-
 SERVICE_BUS = "org.kde.kdeconnect"
 INTERFACE = SERVICE_BUS + ".device"
 INTERFACE_DAEMON = SERVICE_BUS + ".daemon"
@@ -106,7 +103,7 @@ class Py3status:
         """
         Get the device id
         """
-        _bus = SessionBus()
+        _bus = self.py3.get_dbus()
 
         if self.device_id is None:
             self.device_id = self._get_device_id(_bus)
@@ -138,14 +138,14 @@ class Py3status:
         layout, variant = [
             x.strip()
             for x in self.py3.command_output(
-                ["xkblayout-state", "print", "%s|SEPARATOR|%v"]
+                ["xkblayout-state", "print", "%s|SEPARATOR|%v"], persistent=True
             ).split("|SEPARATOR|")
         ]
         return layout, variant
 
     def _get_setxkbmap(self):
         # this method works only for the first two predefined layouts.
-        out = self.py3.command_output(["setxkbmap", "-query"])
+        out = self.py3.command_output(["setxkbmap", "-query"], persistent=True)
         layouts = re.match(LAYOUTS_RE, out).group(1).split(",")
         if len(layouts) == 1:
             variant = re.match(VARIANTS_RE, out)
@@ -155,7 +155,7 @@ class Py3status:
             else:
                 return layouts[0], ""
 
-        xset_output = self.py3.command_output(["xset", "-q"])
+        xset_output = self.py3.command_output(["xset", "-q"], persistent=True)
         led_mask = re.match(LEDMASK_RE, xset_output).groups(0)[0]
         return layouts[int(led_mask)], ""
 
@@ -31,6 +31,12 @@ Format_sensor placeholders:
     See https://www.kernel.org/doc/Documentation/hwmon/sysfs-interface
     for more information on the sensor placeholders.
 
+    On Linux the sensors are read from /sys/class/hwmon directly, the chips
+    and sensors being named as `sensors` names them.  Only the placeholders
+    used are read.  `sensors` is run instead when /etc/sensors3.conf or
+    /etc/sensors.d has label, compute, ignore or set statements for the
+    chips used.
+
 Color options for `auto.input` threshold:
     color_zero: zero value or less (color red)
     color_min: minimum value (color lightgreen)
@@ -48,7 +54,8 @@ Color thresholds:
             against a customized threshold
 
 Requires:
-    lm_sensors: a tool to read temperature/voltage/fan sensors
+    lm_sensors: a tool to read temperature/voltage/fan sensors, only used
+        when /sys/class/hwmon is not available or for configured chips
     sensors-detect: see `man sensors-detect # --auto` to read about
         using defaults or to compile a list of kernel modules
 
@@ -164,6 +171,8 @@ sensor_names
 from fnmatch import fnmatch
 from collections import OrderedDict
 
+from py3status.hwmon import get_chips, get_configured_chips
+
 STRING_NOT_INSTALLED = "not installed"
 
 
@@ -183,9 +192,6 @@ class Py3status:
     thresholds = {"auto.input": True}
 
     def post_config_hook(self):
-        if not self.py3.check_commands("sensors"):
-            raise Exception(STRING_NOT_INSTALLED)
-
         placeholders = self.py3.get_placeholders_list(self.format_sensor)
         format_sensor = {x: ":g" for x in placeholders if x != "name"}
         self.sensor_placeholders = [x for x in placeholders if x != "name"]
@@ -194,21 +200,6 @@ class Py3status:
         )
 
         self.first_run = True
-        self.lm_sensors_command = "sensors -u"
-        if not self.py3.format_contains(self.format_chip, "adapter"):
-            self.lm_sensors_command += "A"  # don't print adapters
-
-        if self.chips:
-            lm_sensors_data = self._get_lm_sensors_data()
-            chips = []
-            for _filter in self.chips:
-                for chunk in lm_sensors_data.split("\n\n")[:-1]:
-                    for line in chunk.splitlines():
-                        if fnmatch(line, _filter):
-                            chips.append(line)
-                        break
-            self.lm_sensors_command += " {}".format(" ".join(chips))
-
         self.sensors = {"list": [], "name": {}, "sensors": self.sensors}
 
         self.thresholds_auto = False
@@ -232,10 +223,87 @@ class Py3status:
         if "auto.input" in self.thresholds_man:
             self.thresholds_man.remove("auto.input")
 
+        # read the sensors from sysfs when available
+        self.hwmon_chips = self._get_hwmon_chips()
+        if self.hwmon_chips is not None:
+            return
+
+        if not self.py3.check_commands("sensors"):
+            raise Exception(STRING_NOT_INSTALLED)
+
+        self.lm_sensors_command = "sensors -u"
+        if not self.py3.format_contains(self.format_chip, "adapter"):
+            self.lm_sensors_command += "A"  # don't print adapters
+
+        if self.chips:
+            lm_sensors_data = self._get_lm_sensors_data()
+            chips = []
+            for _filter in self.chips:
+                for chunk in lm_sensors_data.split("\n\n")[:-1]:
+                    for line in chunk.splitlines():
+                        if fnmatch(line, _filter):
+                            chips.append(line)
+                        break
+            self.lm_sensors_command += " {}".format(" ".join(chips))
+
     def _get_lm_sensors_data(self):
-        return self.py3.command_output(self.lm_sensors_command)
+        # shared with the other instances running it at the same time
+        return self.py3.command_output(self.lm_sensors_command, max_age=1)
+
+    def _get_hwmon_chips(self):
+        """
+        Find the chips and sensors to use and open their files.  None if
+        hwmon is not available or lm_sensors is configured for the chips.
+        """
+        hwmon_chips = get_chips()
+        if not hwmon_chips:
+            return None
+
+        names = set(self.sensor_placeholders + self.thresholds_man)
+        if self.thresholds_auto:
+            names.update(["input", "min", "max", "crit"])
 
-    def lm_sensors(self):
+        if self.chips:
+            # in the order of the filters, as sensors lists them
+            hwmon_chips = [
+                chip
+                for _filter in self.chips
+                for chip in hwmon_chips
+                if fnmatch(chip.name, _filter)
+            ]
+
+        # the configuration may rename, compute or ignore sensors
+        if get_configured_chips(hwmon_chips):
+            return None
+
+        chips = []
+        for chip in hwmon_chips:
+            if any(chip is x for x, sensors in chips):
+                continue
+            sensors = []
+            for label, sensor in chip.sensors.items():
+                sensor_name = label.lower().replace(" ", "_")
+                if self.sensors["sensors"] and not any(
+                    fnmatch(sensor_name, x) for x in self.sensors["sensors"]
+                ):
+                    continue
+                sensor.open(names)
+                sensors.append((sensor_name, sensor))
+            chips.append((chip, sensors))
+        return chips
+
+    def _read_hwmon_chips(self):
+        new_chip = []
+        for chip, sensors in self.hwmon_chips:
+            chip_sensors = OrderedDict(
+                (name, sensor.read()) for name, sensor in sensors
+            )
+            new_chip.append(
+                {"name": chip.name, "adapter": chip.adapter, "sensors": chip_sensors}
+            )
+        return new_chip
+
+    def _parse_lm_sensors_data(self):
         lm_sensors_data = self._get_lm_sensors_data()
         new_chip = []
 
@@ -243,7 +311,6 @@ class Py3status:
             chip = {"sensors": OrderedDict()}
             first_line = True
             sensor_name = None
-            new_sensor = []
 
             for line in chunk.splitlines():
                 if line.startswith("  "):
@@ -273,6 +340,19 @@ class Py3status:
                             continue
                     chip["sensors"][sensor_name] = {}
 
+            new_chip.append(chip)
+        return new_chip
+
+    def lm_sensors(self):
+        if self.hwmon_chips is not None:
+            chips = self._read_hwmon_chips()
+        else:
+            chips = self._parse_lm_sensors_data()
+        new_chip = []
+
+        for chip in chips:
+            new_sensor = []
+
             for name, sensor in chip["sensors"].items():
                 sensor["name"] = name
 
@@ -285,9 +365,9 @@ class Py3status:
                     _input = sensor.get("input")
                     if self.first_run and _input is not None:
                         _input = float(_input)
-                        _min = float(sensor.get("min", 0))
-                        _max = float(sensor.get("max", 0))
-                        _crit = float(sensor.get("crit", 0))
+                        _min = float(sensor.get("min") or 0)
+                        _max = float(sensor.get("max") or 0)
+                        _crit = float(sensor.get("crit") or 0)
                         auto_input.append((0, self.color_zero))
                         if _min or _max or _crit:
                             _color_input = self.color_input
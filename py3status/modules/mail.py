@@ -27,6 +27,11 @@ Format placeholders:
 Color thresholds:
     xxx: print a color based on the value of `xxx` placeholder
 
+Local mailboxes:
+    The messages are only counted again in the mailboxes, or the `new` and
+    `cur` directories of a Maildir, that changed since the last update.  On
+    Linux, the module is updated as soon as mail is delivered to them.
+
 IMAP Subscriptions:
     You can specify a list of filters to decide which folders to search.
     By default, we search only the INBOX folder (ie: `['^INBOX$']`). We
@@ -43,6 +48,10 @@ IMAP Subscriptions:
     For more documentation, see https://docs.python.org/3/library/re.html
     and/or any regex builder on the web. Don't forget to escape characters.
 
+    The connections are kept open between updates.  When a server cannot be
+    reached, we wait longer and longer, up to 15 minutes, before connecting
+    again and keep showing the last number of messages.
+
 Examples:
 ```
 # add multiple accounts
@@ -157,14 +166,28 @@ no_mail
 """
 
 import mailbox
+import os
+import re
 from csv import reader
 from imaplib import IMAP4_SSL, IMAP4
 from os.path import exists, expanduser, expandvars
+from socket import error as socket_error
+from time import time
+
+try:
+    # Python 3.5+
+    from os import scandir
+except ImportError:
+    scandir = None
 
 STRING_MISSING = "missing {} {}"
 STRING_INVALID_NAME = "invalid name `{}`"
 STRING_INVALID_BOX = "invalid mailbox `{}`"
 STRING_INVALID_FILTER = "invalid imap filters `{}`"
+STRING_IMAP_ERROR = "imap {} {}"
+IMAP_TIMEOUT = 10
+# longest wait in seconds before connecting again to an unreachable server
+MAX_BACKOFF = 900
 
 
 class Py3status:
@@ -181,8 +204,8 @@ class Py3status:
         if not self.accounts:
             raise Exception("missing accounts")
 
-        self.first_run = True
         self.mailboxes = {}
+        watched = []
         mailboxes = ["Maildir", "mbox", "mh", "Babyl", "MMDF", "IMAP"]
         lowercased_names = [x.lower() for x in mailboxes]
         reserved_names = lowercased_names + ["mail"]
@@ -209,7 +232,13 @@ class Py3status:
                             raise Exception(STRING_INVALID_FILTER.format(filters))
                     else:
                         account["filters"] = ["^INBOX$"]
-                    account["folders"] = []
+                    # found on the first connection
+                    account["folders"] = None
+                    # the connection is kept between updates
+                    account["connection"] = None
+                    account["count"] = None
+                    account["backoff"] = 0
+                    account["retry_at"] = 0
                     self.mailboxes[mail].append(account)
                 else:
                     for box in mailboxes[:-1]:
@@ -222,67 +251,159 @@ class Py3status:
                                 raise Exception(STRING_MISSING.format(mail, path))
                             account["box"] = box
                             account["path"] = path
+                            # the counts of the files or directories by mtime
+                            account["counts"] = {}
                             self.mailboxes[mail].append(account)
+                            watched.extend(self._get_paths(account))
                             break
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
+        # update as soon as new mail is delivered to the local mailboxes
+        if watched:
+            self.py3.inotify_subscribe(watched)
+
+    def _get_folders(self, connection, account, i):
+        filters = "|".join(account["filters"])
+        objs = [x.decode() for x in connection.list()[1]]
+        folders = []
+        lines = ["===== IMAP {} =====".format(i)]
+        for name in [x[-1] for x in reader(objs, delimiter=" ")]:
+            subscribed = " "
+            try:
+                if re.search(filters, name):
+                    subscribed = "x"
+                    folder = name.replace("\\", "\\\\")
+                    folder = folder.replace('"', '\\"')
+                    folder = '"{}"'.format(folder)
+                    folders.append(folder)
+            except re.error:
+                folders = []
+                break
+            lines.append("[{}] {}".format(subscribed, name))
+        # only kept once the folders could be listed, to try again otherwise
+        account["folders"] = folders
+        if not account["folders"]:
+            self.py3.error(
+                STRING_INVALID_FILTER.format(filters), self.py3.CACHE_FOREVER
+            )
+        if account.get("log") is True:
+            for line in lines:
+                self.py3.log(line)
+
+    def _connect_imap(self, account, i):
+        # do not hang on a server not answering or a connection dropped by
+        # the network
+        try:
+            connection = IMAP4_SSL(
+                account["server"], account["port"], timeout=IMAP_TIMEOUT
+            )
+        except TypeError:
+            # python < 3.9
+            connection = IMAP4_SSL(account["server"], account["port"])
+            connection.socket().settimeout(IMAP_TIMEOUT)
+        account["connection"] = connection
+        connection.login(account["user"], account["password"])
+        if account["folders"] is None:
+            self._get_folders(connection, account, i)
+
+    def _disconnect_imap(self, account):
+        connection, account["connection"] = account["connection"], None
+        try:
+            connection.logout()
+        except:  # noqa e722
+            pass
+
+    def _get_imap_count(self, account, i):
+        # the server was unreachable, wait before trying again
+        if account["connection"] is None and time() < account["retry_at"]:
+            if account["count"] is None:
+                self.py3.error(account["error"], account["retry_at"] - time())
+            return account["count"]
+
+        # a kept connection may have been closed by the server in the
+        # meantime so try again with a new one
+        for attempt in range(2):
+            try:
+                if account["connection"] is None:
+                    self._connect_imap(account, i)
+                count_mail = 0
+                for folder in account["folders"][:]:
+                    # STATUS does not need the folder to be selected
+                    status, data = account["connection"].status(folder, "(UNSEEN)")
+                    if status == "OK":
+                        unseen = re.search(br"UNSEEN (\d+)", data[0])
+                        count_mail += int(unseen.group(1))
+                    else:
+                        account["folders"].remove(folder)
+                account["count"] = count_mail
+                account["backoff"] = 0
+                return count_mail
+            except (IMAP4.error, socket_error, IOError) as e:
+                account["error"] = STRING_IMAP_ERROR.format(i, e)
+                self._disconnect_imap(account)
+
+        # wait longer each time, eg not to get throttled for failed logins
+        account["backoff"] = min(
+            max(account["backoff"] * 2, self.cache_timeout), MAX_BACKOFF
+        )
+        account["retry_at"] = time() + account["backoff"]
+        self.py3.log(
+            "{}, retrying in {}s".format(account["error"], account["backoff"]),
+            level=self.py3.LOG_WARNING,
+        )
+        if account["count"] is None:
+            self.py3.error(account["error"], account["backoff"])
+        return account["count"]
+
+    def _get_paths(self, account):
+        """
+        Return the files or directories whose changes change the count.
+        """
+        if account["box"] == "Maildir":
+            return [os.path.join(account["path"], x) for x in ["new", "cur"]]
+        return [account["path"]]
+
+    def _count_box(self, account, path):
+        if account["box"] == "Maildir":
+            # like len() of a Maildir but without looking at every message
+            if scandir is None:
+                return len(os.listdir(path))
+            return sum(1 for entry in scandir(path) if not entry.is_dir())
+        inbox = getattr(mailbox, account["box"])(path, create=False)
+        count_mail = len(inbox)
+        inbox.close()
+        return count_mail
+
+    def _get_local_count(self, account):
+        """
+        Count the messages again only in the files or directories that have
+        changed since they were last counted.
+        """
+        count_mail = 0
+        for path in self._get_paths(account):
+            stat = os.stat(path)
+            mtime = (stat.st_mtime, stat.st_size)
+            cached = account["counts"].get(path)
+            if cached and cached[0] == mtime:
+                count_mail += cached[1]
+                continue
+            count = self._count_box(account, path)
+            # a change in the same clock tick would not change the mtime
+            if time() - stat.st_mtime > 1:
+                account["counts"][path] = (mtime, count)
+            count_mail += count
+        return count_mail
+
     def mail(self):
         mail_data = {"mail": 0, "urgent": False}
         for k, v in self.mailboxes.items():
             mail_data[k] = 0
             for i, account in enumerate(v, 1):
                 if k == "imap":
-                    inbox = IMAP4_SSL(account["server"], account["port"])
-                    inbox.login(account["user"], account["password"])
-
-                    if self.first_run:
-                        import re
-
-                        filters = "|".join(account.pop("filters"))
-                        objs = [x.decode() for x in inbox.list()[1]]
-                        folders = [x[-1] for x in reader(objs, delimiter=" ")]
-                        lines = ["===== IMAP {} =====".format(i)]
-                        for name in folders:
-                            subscribed = " "
-                            try:
-                                if re.search(filters, name):
-                                    subscribed = "x"
-                                    folder = name.replace("\\", "\\\\")
-                                    folder = folder.replace('"', '\\"')
-                                    folder = '"{}"'.format(folder)
-                                    account["folders"].append(folder)
-                            except re.error:
-                                account["folders"] = []
-                                break
-                            lines.append("[{}] {}".format(subscribed, name))
-                        if not account["folders"]:
-                            self.py3.error(
-                                STRING_INVALID_FILTER.format(filters),
-                                self.py3.CACHE_FOREVER,
-                            )
-                        if account.get("log") is True:
-                            for line in lines:
-                                self.py3.log(line)
-
-                    count_mail = 0
-                    for folder in account["folders"]:
-                        if inbox.select(folder, readonly=True)[0] == "OK":
-                            imap_data = inbox.search(None, "(UNSEEN)")
-                            count_mail += len(imap_data[1][0].split())
-                        else:
-                            account["folders"].remove(folder)
-                    try:
-                        inbox.close()
-                        inbox.logout()
-                    except IMAP4.error:
-                        pass
+                    count_mail = self._get_imap_count(account, i)
                 else:
-                    inbox = getattr(mailbox, account["box"])(
-                        account["path"], create=False
-                    )
-                    count_mail = len(inbox)
-                    inbox.close()
+                    count_mail = self._get_local_count(account)
                 if "name" in account:
                     mail_data[account["name"]] = count_mail
                 if account["urgent"] and count_mail:
@@ -295,8 +416,6 @@ class Py3status:
             if x in mail_data:
                 self.py3.threshold_get_color(mail_data[x], x)
 
-        self.first_run = False
-
         response = {
             "cached_until": self.py3.time_in(self.cache_timeout),
             "full_text": self.py3.safe_format(self.format, mail_data),
@@ -305,6 +424,11 @@ class Py3status:
             response["urgent"] = True
         return response
 
+    def kill(self):
+        for account in self.mailboxes.get("imap", []):
+            if account["connection"] is not None:
+                self._disconnect_imap(account)
+
 
 if __name__ == "__main__":
     """
@@ -98,12 +98,8 @@ SAMPLE OUTPUT
 
 from datetime import timedelta
 from time import time
-from gi.repository import GObject
 from gi.repository.GLib import GError
-from threading import Thread
 import re
-import sys
-from pydbus import SessionBus
 
 
 SERVICE_BUS = "org.mpris.MediaPlayer2"
@@ -163,7 +159,7 @@ class Py3status:
         self._player_details = {}
         self._tries = 0
         # start last
-        self._dbus = SessionBus()
+        self._dbus = self.py3.get_dbus()
         self._start_listener()
         self._states = {
             "pause": {
@@ -309,15 +305,6 @@ class Py3status:
 
         return response
 
-    def _start_loop(self):
-        self._loop = GObject.MainLoop()
-        GObject.timeout_add(1000, self._timeout)
-        try:
-            self._loop.run()
-        except KeyboardInterrupt:
-            # This branch is only needed for the test mode
-            self._kill = True
-
     def _name_owner_changed(self, *args):
         player_id = args[5][0]
         player_add = args[5][2]
@@ -464,7 +451,9 @@ class Py3status:
         self._set_player()
 
     def _start_listener(self):
-        self._dbus.con.signal_subscribe(
+        # the signals are dispatched by the main loop py3status shares
+        # between the modules using dbus
+        self._name_owner_subscription = self._dbus.con.signal_subscribe(
             None,
             "org.freedesktop.DBus",
             "NameOwnerChanged",
@@ -474,14 +463,6 @@ class Py3status:
             self._name_owner_changed,
         )
         self._get_players()
-        t = Thread(target=self._start_loop)
-        t.daemon = True
-        t.start()
-
-    def _timeout(self):
-        if self._kill:
-            self._loop.quit()
-            sys.exit(0)
 
     def _update_metadata(self, metadata):
         is_stream = False
@@ -517,6 +498,9 @@ class Py3status:
 
     def kill(self):
         self._kill = True
+        self._dbus.con.signal_unsubscribe(self._name_owner_subscription)
+        for player_id in list(self._mpris_players):
+            self._remove_player(player_id)
 
     def mpris(self):
         """
@@ -7,7 +7,8 @@ interfaces and IPs, as well as to show interfaces with no IP address. It will
 show an alternate text if no IP are available.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module in seconds.
+    cache_timeout: refresh interval for this module in seconds, only used
+        when the interfaces cannot be monitored with rtnetlink.
         (default 30)
     format: format of the output.
         (default 'Network: {format_iface}')
@@ -39,7 +40,8 @@ Color options:
     color_good: IPs to show
 
 Requires:
-    ip: utility found in iproute2 package
+    ip: utility found in iproute2 package, only used when the interfaces
+        cannot be monitored with rtnetlink
 
 Examples:
 ```
@@ -80,15 +82,22 @@ class Py3status:
         self.iface_re = re.compile(r"\d+: (?P<iface>[\w\-]+):")
         self.ip_re = re.compile(r"\s+inet (?P<ip4>[\d\.]+)(?:/| )")
         self.ip6_re = re.compile(r"\s+inet6 (?P<ip6>[\da-f:]+)(?:/| )")
+        # refreshed as soon as the interfaces change
+        self.netlink = self.py3.net_subscribe()
 
     def net_iplist(self):
-        response = {
-            "cached_until": self.py3.time_in(seconds=self.cache_timeout),
-            "full_text": "",
-        }
+        interfaces = None
+        if self.netlink:
+            # None once the interfaces are no longer monitored
+            interfaces = self.py3.get_net_interfaces()
+        if interfaces is not None:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(seconds=self.cache_timeout)
+        response = {"cached_until": cached_until, "full_text": ""}
 
         connection = False
-        data = self._get_data()
+        data = self._get_data(interfaces)
         iface_list = []
         for iface, ips in data.items():
             if not self._check_blacklist(iface, self.iface_blacklist):
@@ -129,8 +138,18 @@ class Py3status:
 
         return response
 
-    def _get_data(self):
-        txt = self.py3.command_output(["ip", "address", "show"]).splitlines()
+    def _get_data(self, interfaces=None):
+        if interfaces is not None:
+            data = {}
+            for iface, info in interfaces.items():
+                ips = {x: info[x] for x in ["ip4", "ip6"] if info[x]}
+                if ips or not self.remove_empty:
+                    data[iface] = ips
+            return data
+
+        # shared with the other instances running it at the same time
+        output = self.py3.command_output(["ip", "address", "show"], max_age=1)
+        txt = output.splitlines()
 
         data = {}
         for line in txt:
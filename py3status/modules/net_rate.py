@@ -56,6 +56,8 @@ SAMPLE OUTPUT
 from __future__ import division  # python2 compatibility
 from time import time
 
+from py3status.sampler import TICK, parse_net_dev
+
 
 class Py3status:
     """
@@ -104,29 +106,43 @@ class Py3status:
         self._value_formats = values
         # last
         self.last_interface = None
-        self.last_stat = self._get_stat()
-        self.last_time = time()
+        # /proc/net/dev is sampled by py3status, other files are read here
+        self.shared = self.devfile == "/proc/net/dev"
+        if self.shared:
+            # take a first sample to compute the rates from
+            self.py3.get_proc("net_dev")
+        else:
+            self.last_stat = self._read_devfile()
+            self.last_time = time()
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
+        # refreshed as soon as an interface appears or goes up or down
+        self.netlink = self.py3.net_subscribe()
 
     def net_rate(self):
-        network_stat = self._get_stat()
+        timedelta, network_stat, last_stat = self._get_stat()
+        if last_stat is None:
+            # the sample taken on start is still the latest one, come back
+            # as soon as there is a new one to compute the rates from
+            return {
+                "cached_until": self.py3.time_in(TICK),
+                "full_text": self.format_no_connection,
+            }
         deltas = {}
         try:
-            # time from previous check
-            current_time = time()
-            timedelta = current_time - self.last_time
-
             # calculate deltas for all interfaces
-            for old, new in zip(self.last_stat, network_stat):
-                down = (int(new[1]) - int(old[1])) / timedelta
-                up = (int(new[9]) - int(old[9])) / timedelta
-
-                deltas[new[0]] = {"total": up + down, "up": up, "down": down}
-
-            # update last_ info
-            self.last_stat = network_stat
-            self.last_time = current_time
+            # only the interfaces looked up are parsed
+            names = self._get_names(network_stat)
+            for name in names:
+                if not self._dev_filter(name):
+                    continue
+                if name not in network_stat or name not in last_stat:
+                    continue
+                new, old = network_stat[name], last_stat[name]
+                down = (new[0] - old[0]) / timedelta
+                up = (new[8] - old[8]) / timedelta
+
+                deltas[name] = {"total": up + down, "up": up, "down": down}
 
             # get the interface with max rate
             if self.sum_values:
@@ -182,41 +198,65 @@ class Py3status:
                     "down": self._format_value(delta["down"]),
                     "total": self._format_value(delta["total"]),
                     "up": self._format_value(delta["up"]),
-                    "interface": interface[:-1],
+                    "interface": interface,
                 },
             )
 
         return response
 
-    def _get_stat(self):
+    def _get_names(self, network_stat):
         """
-        Get statistics from devfile in list of lists of words
+        Return the names of the interfaces to compute the rates of.  When
+        the interfaces are known from rtnetlink the ones that are down are
+        skipped, so that their statistics are not even parsed.
         """
-
-        def dev_filter(x):
-            # get first word and remove trailing interface number
-            x = x.strip().split(" ")[0][:-1]
-
-            if x in self.interfaces_blacklist:
-                return False
-
+        names = network_stat if self.all_interfaces else self.interfaces
+        interfaces = None
+        if self.netlink and self.shared:
+            interfaces = self.py3.get_net_interfaces()
+        if interfaces is not None:
             if self.all_interfaces:
-                return True
+                names = interfaces
+            names = [
+                x
+                for x in names
+                if x not in interfaces
+                or interfaces[x]["operstate"] not in ["down", "lowerlayerdown"]
+            ]
+        return names
+
+    def _dev_filter(self, x):
+        if x in self.interfaces_blacklist:
+            return False
 
-            if x in self.interfaces:
-                return True
+        if self.all_interfaces:
+            return True
 
-            return False
+        if x in self.interfaces:
+            return True
 
-        # read devfile, skip two header files
-        x = filter(dev_filter, open(self.devfile).readlines()[2:])
+        return False
 
-        try:
-            # split info into words, filter empty ones
-            return [list(filter(lambda x: x, _x.split(" "))) for _x in x]
+    def _read_devfile(self):
+        with open(self.devfile, "rb") as f:
+            return parse_net_dev(f.read())
 
-        except StopIteration:
-            return None
+    def _get_stat(self):
+        """
+        Get the seconds elapsed since the previous check and the statistics
+        of the interfaces then and now
+        """
+        if self.shared:
+            return self.py3.get_proc_delta("net_dev", self.cache_timeout)
+
+        network_stat = self._read_devfile()
+        current_time = time()
+        timedelta = current_time - self.last_time
+        last_stat = self.last_stat
+        # update last_ info
+        self.last_stat = network_stat
+        self.last_time = current_time
+        return timedelta, network_stat, last_stat
 
     def _format_value(self, value):
         """
@@ -34,7 +34,6 @@ SAMPLE OUTPUT
 """
 
 from __future__ import division  # python2 compatibility
-from time import time
 
 
 class Py3status:
@@ -108,9 +107,6 @@ class Py3status:
         }
 
     def post_config_hook(self):
-        self.last_transmitted_bytes = 0
-        self.last_received_bytes = 0
-        self.last_time = time()
         # Get default gateway from /proc.
         if self.nic is None:
             with open("/proc/net/route") as fh:
@@ -125,25 +121,24 @@ class Py3status:
 
         self.thresholds_init = self.py3.get_color_names_list(self.format)
 
-    def _get_bytes(self):
-        with open("/proc/net/dev") as fh:
-            net_data = fh.read().split()
-        interface_index = net_data.index(self.nic + ":")
-        received_bytes = int(net_data[interface_index + 1])
-        transmitted_bytes = int(net_data[interface_index + 9])
+    def _get_bytes(self, net_data):
+        received_bytes = net_data[self.nic][0]
+        transmitted_bytes = net_data[self.nic][8]
         return received_bytes, transmitted_bytes
 
     def netdata(self):
-        received_bytes, transmitted_bytes = self._get_bytes()
+        timedelta, net_data, last_net_data = self.py3.get_proc_delta(
+            "net_dev", self.cache_timeout
+        )
+        received_bytes, transmitted_bytes = self._get_bytes(net_data)
         # speed
-        current_time = time()
-        timedelta = current_time - self.last_time
-        self.last_time = current_time
-        down = (received_bytes - self.last_received_bytes) / 1024 / timedelta
-        up = (transmitted_bytes - self.last_transmitted_bytes) / 1024 / timedelta
-        # history
-        self.last_received_bytes = received_bytes
-        self.last_transmitted_bytes = transmitted_bytes
+        down = up = 0
+        if last_net_data and self.nic in last_net_data:
+            last_received_bytes, last_transmitted_bytes = self._get_bytes(
+                last_net_data
+            )
+            down = (received_bytes - last_received_bytes) / 1024 / timedelta
+            up = (transmitted_bytes - last_transmitted_bytes) / 1024 / timedelta
         # traffic
         download = received_bytes / 1024 / 1024
         upload = transmitted_bytes / 1024 / 1024
@@ -12,6 +12,9 @@ Configuration parameters:
         *(default '{gpu_name} [\?color=temperature.gpu {temperature.gpu}°C] '
         '[\?color=memory.used_percent {memory.used_percent}%]')*
     format_gpu_separator: show separator if more than one (default ' ')
+    loop: keep nvidia-smi running and read its samples every cache_timeout
+        rather than starting it for each refresh, this saves the time it
+        takes to initialise but keeps the driver loaded (default False)
     memory_unit: specify memory unit, eg 'KiB', 'MiB', 'GiB', otherwise auto
         (default None)
     thresholds: specify color thresholds to use
@@ -75,6 +78,11 @@ percent
 ]
 """
 
+import os
+
+from subprocess import Popen, PIPE
+from threading import Event, Thread
+
 STRING_NOT_INSTALLED = "not installed"
 
 
@@ -90,6 +98,7 @@ class Py3status:
         "[\?color=memory.used_percent {memory.used_percent}%]"
     )
     format_gpu_separator = " "
+    loop = False
     memory_unit = None
     thresholds = [(0, "good"), (65, "degraded"), (75, "orange"), (85, "bad")]
 
@@ -105,7 +114,7 @@ class Py3status:
         )
 
         new_memory_properties = set()
-        new_properties = set(["memory.used", "memory.total"])
+        new_properties = set(["count", "memory.used", "memory.total"])
         for name in properties:
             if "used_percent" in name:
                 continue
@@ -122,10 +131,63 @@ class Py3status:
 
         self.thresholds_init = self.py3.get_color_names_list(self.format_gpu)
 
+        self.nvidia_data = None
+        self.process = None
+        if self.loop:
+            self.killed = Event()
+            self.thread = Thread(target=self._loop)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _loop(self):
+        """
+        Run nvidia-smi in loop mode, keeping the last sample of all the GPUs
+        read from it, and start it again if it exits.
+        """
+        command = self.nvidia_command.split()
+        command.append("--loop-ms={}".format(int(self.cache_timeout * 1000)))
+        count = self.properties.index("count")
+        while not self.killed.is_set():
+            try:
+                with open(os.devnull, "w") as devnull:
+                    self.process = Popen(command, stdout=PIPE, stderr=devnull)
+            except OSError as e:
+                self.py3.log("nvidia-smi cannot be started: {}".format(e))
+                self.killed.wait(self.cache_timeout)
+                continue
+            lines = []
+            # a sample is a line for each GPU
+            for line in iter(self.process.stdout.readline, b""):
+                line = line.decode("utf-8").strip()
+                if not line:
+                    continue
+                lines.append(line)
+                try:
+                    complete = len(lines) >= int(line.split(", ")[count])
+                except (IndexError, ValueError):
+                    complete = True
+                if complete:
+                    nvidia_data = "\n".join(lines)
+                    lines = []
+                    if nvidia_data != self.nvidia_data:
+                        self.nvidia_data = nvidia_data
+                        self.py3.update()
+            self.process.stdout.close()
+            status = self.process.wait()
+            if self.killed.is_set():
+                break
+            # go back to running nvidia-smi until it is started again
+            self.nvidia_data = None
+            self.py3.log("nvidia-smi exited with status {}".format(status))
+            self.py3.update()
+            self.killed.wait(self.cache_timeout)
+
     def _get_nvidia_data(self):
-        return self.py3.command_output(self.nvidia_command)
+        return self.nvidia_data or self.py3.command_output(self.nvidia_command)
 
     def nvidia_smi(self):
+        # refreshed when nvidia-smi writes a new sample
+        streaming = self.nvidia_data is not None
         nvidia_data = self._get_nvidia_data()
         new_gpu = []
 
@@ -149,11 +211,22 @@ class Py3status:
         format_gpu_separator = self.py3.safe_format(self.format_gpu_separator)
         format_gpu = self.py3.composite_join(format_gpu_separator, new_gpu)
 
+        if streaming:
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(self.format, {"format_gpu": format_gpu}),
         }
 
+    def kill(self):
+        if self.loop:
+            self.killed.set()
+            if self.process is not None and self.process.poll() is None:
+                self.process.kill()
+
 
 if __name__ == "__main__":
     from sys import argv
@@ -69,7 +69,7 @@ class Py3status:
 
     def _is_running(self):
         try:
-            self.py3.command_output(self.pgrep_command)
+            self.py3.command_output(self.pgrep_command, persistent=True)
             return True
         except self.py3.CommandError:
             return False
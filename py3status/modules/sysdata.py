@@ -101,10 +101,10 @@ SAMPLE OUTPUT
 
 from __future__ import division
 from fnmatch import fnmatch
-from os import getloadavg
-
 import re
 
+from py3status.hwmon import get_chips, get_configured_chips
+
 
 class Py3status:
     """
@@ -211,6 +211,7 @@ class Py3status:
 
     def post_config_hook(self):
         self.first_run = True
+        self.cpu_temp_sensors = {}
         temp_unit = self.temp_unit.upper()
         if temp_unit in ["C", u"°C"]:
             temp_unit = u"°C"
@@ -260,11 +261,7 @@ class Py3status:
             self.thresholds_init["legacy"]["cpu_freq"] = name
 
         if self.init["stat"]:
-            self.cpus = {"cpus": self.cpus, "last": {}, "list": []}
-
-    def _get_cpuinfo(self):
-        with open("/proc/cpuinfo") as f:
-            return [float(line.split()[-1]) for line in f if "cpu MHz" in line]
+            self.cpus = {"cpus": self.cpus, "list": []}
 
     def _calc_cpu_freqs(self, cpu_freqs, unit, keys):
         freq_avg, freq_max = None, None
@@ -277,27 +274,15 @@ class Py3status:
                 freq_max, _ = self.py3.format_units(value, unit, si=True)
         return freq_avg, freq_max
 
-    def _get_stat(self):
-        # kernel/system statistics. man -P 'less +//proc/stat' procfs
-        stat = []
-        with open("/proc/stat") as f:
-            for line in f:
-                if "cpu" in line:
-                    stat.append(line)
-                else:
-                    return stat
-
     def _filter_stat(self, stat, avg=False):
         # if avg, return (name, idle, total)
         if avg:
-            fields = stat[0].split()
-            return "avg", int(fields[4]), sum(map(int, fields[1:]))
+            fields = stat["cpu"]
+            return "avg", fields[3], sum(fields)
 
         # return a list of (name, idle, total)
         new_stat = []
-        for line in stat:
-            fields = line.split()
-            cpu_name = fields[0]
+        for cpu_name in stat:
             if self.cpus["cpus"]:
                 if self.first_run:
                     for _filter in self.cpus["cpus"]:
@@ -306,7 +291,8 @@ class Py3status:
                 if cpu_name not in self.cpus["list"]:
                     continue
 
-            new_stat.append((cpu_name, int(fields[4]), sum(map(int, fields[1:]))))
+            fields = stat[cpu_name]
+            new_stat.append((cpu_name, fields[3], sum(fields)))
         return new_stat
 
     def _calc_mem_info(self, unit, meminfo, memory):
@@ -316,19 +302,19 @@ class Py3status:
         of used memory, and units of mem (KiB, MiB, GiB).
         """
         if memory:
-            total_mem_kib = meminfo["MemTotal:"]
+            total_mem_kib = meminfo["MemTotal"]
             used_mem_kib = (
                 total_mem_kib
-                - meminfo["MemFree:"]
+                - meminfo["MemFree"]
                 - (
-                    meminfo["Buffers:"]
-                    + meminfo["Cached:"]
-                    + (meminfo["SReclaimable:"] - meminfo["Shmem:"])
+                    meminfo["Buffers"]
+                    + meminfo["Cached"]
+                    + (meminfo["SReclaimable"] - meminfo["Shmem"])
                 )
             )
         else:
-            total_mem_kib = meminfo["SwapTotal:"]
-            used_mem_kib = total_mem_kib - meminfo["SwapFree:"]
+            total_mem_kib = meminfo["SwapTotal"]
+            used_mem_kib = total_mem_kib - meminfo["SwapFree"]
 
         if total_mem_kib == 0:
             used_percent = 0
@@ -340,42 +326,67 @@ class Py3status:
         (used, used_unit) = self.py3.format_units(used_mem_kib * 1024, unit)
         return total, total_unit, used, used_unit, used_percent
 
-    def _get_meminfo(self, head=24):
-        with open("/proc/meminfo") as f:
-            info = [line.split() for line in (next(f) for x in range(head))]
-            return {fields[0]: float(fields[1]) for fields in info}
-
-    def _calc_cpu_percent(self, cpu):
+    def _calc_cpu_percent(self, cpu, last_stat):
         name, idle, total = cpu
-        last_idle = self.cpus["last"].get(name, {}).get("idle", 0)
-        last_total = self.cpus["last"].get(name, {}).get("total", 0)
+        last_idle, last_total = 0, 0
+        # since boot on the first run
+        if last_stat:
+            fields = last_stat.get("cpu" if name == "avg" else name)
+            if fields:
+                last_idle, last_total = fields[3], sum(fields)
         used_percent = 0
 
         if total != last_total:
             used_percent = (1 - (idle - last_idle) / (total - last_total)) * 100
 
-        self.cpus["last"].setdefault(name, {}).update(
-            zip(["name", "idle", "total"], cpu)
-        )
         return used_percent
 
+    def _get_cputemp_sensor(self, chips, zone=None):
+        """
+        Return the hwmon sensor of the CPU temperature, of the chips matching
+        zone if given, that 'sensors' would show.  None if there is none.
+        """
+        for chip in chips:
+            if zone and not fnmatch(chip.name, zone):
+                continue
+            for label, sensor in chip.sensors.items():
+                if re.search("Core 0|CPU Temp", label) and "input" in sensor.paths:
+                    sensor.open(["input"])
+                    return sensor
+        return None
+
     def _get_cputemp_with_lmsensors(self, zone=None):
         """
         Tries to determine CPU temperature using the 'sensors' command.
         Searches for the CPU temperature by looking for a value prefixed
         by either "CPU Temp" or "Core 0" - does not look for or average
         out temperatures of all codes if more than one.
+
+        The sensor is read from hwmon directly when found there.
         """
+        if zone not in self.cpu_temp_sensors:
+            chips = get_chips()
+            # the configuration of lm_sensors may rename or ignore sensors
+            if get_configured_chips(chips):
+                chips = []
+            self.cpu_temp_sensors[zone] = self._get_cputemp_sensor(
+                chips, zone
+            ) or self._get_cputemp_sensor(chips)
+        sensor = self.cpu_temp_sensors[zone]
+        if sensor is not None:
+            cpu_temp = sensor.read().get("input")
+            return "?" if cpu_temp is None else cpu_temp
 
         sensors = None
         command = ["sensors"]
         if zone:
             try:
-                sensors = self.py3.command_output(command + [zone])
+                sensors = self.py3.command_output(command + [zone], max_age=1)
             except self.py3.CommandError:
                 pass
         if not sensors:
-            sensors = self.py3.command_output(command)
+            # shared with the other instances running it at the same time
+            sensors = self.py3.command_output(command, max_age=1)
         m = re.search("(Core 0|CPU Temp).+\+(.+).+\(.+", sensors)
         if m:
             cpu_temp = float(m.groups()[1].strip()[:-2])
@@ -412,23 +423,25 @@ class Py3status:
 
         if self.init["cpu_freq"]:
             cpu_freqs = self._calc_cpu_freqs(
-                self._get_cpuinfo(), self.cpu_freq_unit, self.init["cpu_freq"]
+                self.py3.get_proc("cpuinfo"), self.cpu_freq_unit, self.init["cpu_freq"]
             )
             cpu_freq_keys = ["cpu_freq_avg", "cpu_freq_max"]
             sys.update(zip(cpu_freq_keys, cpu_freqs))
 
         if self.init["stat"]:
-            stat = self._get_stat()
+            # kernel/system statistics. man -P 'less +//proc/stat' procfs
+            _, stat, last_stat = self.py3.get_proc_delta("stat", self.cache_timeout)
 
             if self.init["cpu_percent"]:
                 cpu = self._filter_stat(stat, avg=True)
-                sys["cpu_used_percent"] = self._calc_cpu_percent(cpu)
+                sys["cpu_used_percent"] = self._calc_cpu_percent(cpu, last_stat)
 
             if self.init["cpu_per_core"]:
                 cpu_keys = ["name", "used_percent"]
                 new_cpu = []
                 for cpu in self._filter_stat(stat):
-                    cpu = dict(zip(cpu_keys, [cpu[0], self._calc_cpu_percent(cpu)]))
+                    used_percent = self._calc_cpu_percent(cpu, last_stat)
+                    cpu = dict(zip(cpu_keys, [cpu[0], used_percent]))
                     for x in self.thresholds_init["format_cpu"]:
                         if x in cpu:
                             self.py3.threshold_get_color(cpu[x], x)
@@ -443,10 +456,10 @@ class Py3status:
 
         if self.init["load"]:
             load_keys = ["load1", "load5", "load15"]
-            sys.update(zip(load_keys, getloadavg()))
+            sys.update(zip(load_keys, self.py3.get_proc("loadavg")))
 
         if self.init["meminfo"]:
-            meminfo = self._get_meminfo()
+            meminfo = self.py3.get_proc("meminfo")
 
             if self.init["mem"]:
                 mem = self._calc_mem_info(self.mem_unit, meminfo, True)
@@ -3,7 +3,8 @@
 Display status of a service on your system.
 
 Configuration parameters:
-    cache_timeout: refresh interval for this module (default 5)
+    cache_timeout: refresh interval for this module, only used when
+        systemd cannot notify us of the unit changes (default 5)
     format: display format for this module (default '\?if=!hide {unit}: {status}')
     hide_extension: suppress extension of the systemd unit (default False)
     hide_if_default: suppress the output if the systemd unit is in default state
@@ -52,8 +53,6 @@ not-found
 {'color': '#FFFF00', 'full_text': 'sshd.service: not-found'}
 """
 
-from pydbus import SessionBus, SystemBus
-
 
 class Py3status:
     """
@@ -68,12 +67,25 @@ class Py3status:
     user = False
 
     def post_config_hook(self):
-        if self.user:
-            bus = SessionBus()
-        else:
-            bus = SystemBus()
+        bus_name = "session" if self.user else "system"
+        bus = self.py3.get_dbus(bus_name)
         systemd = bus.get("org.freedesktop.systemd1")
-        self.systemd_unit = bus.get(".systemd1", systemd.LoadUnit(self.unit))
+        unit_path = systemd.LoadUnit(self.unit)
+        self.systemd_unit = bus.get(".systemd1", unit_path)
+        # get updated when the unit changes rather than polling it, systemd
+        # only sends the signals once asked to
+        try:
+            systemd.Subscribe()
+            self.py3.dbus_subscribe(
+                "org.freedesktop.systemd1",
+                unit_path,
+                "org.freedesktop.systemd1.Unit",
+                bus=bus_name,
+                properties=["ActiveState", "LoadState", "UnitFileState"],
+            )
+            self.cache_timeout = self.py3.CACHE_FOREVER
+        except Exception:
+            pass
 
     def systemd(self):
         status = self.systemd_unit.Get("org.freedesktop.systemd1.Unit", "ActiveState")
@@ -45,8 +45,7 @@ SAMPLE OUTPUT
 ]
 """
 
-from threading import Thread
-from gi.repository import GLib, Gio
+from gi.repository import Gio
 import re
 
 STRING_USBGUARD_DBUS = "start usbguard-dbus.service"
@@ -85,7 +84,9 @@ class Py3status:
         self._init_dbus()
 
     def _init_dbus(self):
-        self.bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        # the signals are dispatched by the main loop py3status shares
+        # between the modules using dbus
+        self.bus = self.py3.get_dbus("system").con
         self.proxy = Gio.DBusProxy.new_sync(
             self.bus,
             Gio.DBusProxyFlags.NONE,
@@ -106,10 +107,6 @@ class Py3status:
                 lambda *args: self.py3.update(),
             )
 
-        thread = Thread(target=lambda: GLib.MainLoop().run())
-        thread.daemon = True
-        thread.start()
-
     def _get_devices(self):
         try:
             raw_devices = self.proxy.listDevices("(s)", "block")
@@ -8,8 +8,8 @@ Configuration parameters:
     button_down: button to decrease volume (default 5)
     button_mute: button to toggle mute (default 1)
     button_up: button to increase volume (default 4)
-    cache_timeout: how often we refresh this module in seconds.
-        (default 10)
+    cache_timeout: how often we refresh this module in seconds, only used
+        with amixer or when the volume cannot be monitored. (default 10)
     card: Card to use. amixer supports this. (default None)
     channel: channel to track. Default value is backend dependent.
         (default None)
@@ -46,8 +46,13 @@ Requires:
     pamixer: pulseaudio command-line mixer like amixer
 
 Notes:
-    If you are changing volume state by external scripts etc and
-    want to refresh the module quicker than the i3status interval,
+    With pactl, or pamixer when pactl is installed, `pactl subscribe` is
+    kept running so that the module is refreshed as soon as the volume
+    changes, and the volume is only asked again after a change.  This
+    works with PulseAudio and with PipeWire through pipewire-pulse.
+
+    Otherwise, if you are changing volume state by external scripts etc
+    and want to refresh the module quicker than the i3status interval,
     send a USR1 signal to py3status in the keybinding.
     Example: killall -s USR1 py3status
 
@@ -80,8 +85,12 @@ mute
 {'color': '#FF0000', 'full_text': u'\u266a: muted'}
 """
 
+import os
 import re
 import math
+from subprocess import Popen, PIPE
+from threading import Event, Lock, Thread
+
 from py3status.exceptions import CommandError
 
 STRING_ERROR = "invalid command `%s`"
@@ -90,6 +99,9 @@ COMMAND_NOT_INSTALLED = "command `%s` not installed"
 
 
 class Audio:
+    # command printing a line for each change of the volume, if any
+    monitor_cmd = None
+
     def __init__(self, parent):
         self.card = parent.card
         self.channel = parent.channel
@@ -97,16 +109,85 @@ class Audio:
         self.is_input = parent.is_input
         self.max_volume = parent.max_volume
         self.parent = parent
+        self.cache = None
+        self.changes = 0
+        self.killed = Event()
+        self.lock = Lock()
+        self.monitoring = False
+        self.process = None
         self.setup(parent)
+        if self.monitor_cmd:
+            thread = Thread(target=self.monitor)
+            thread.daemon = True
+            thread.start()
 
     def setup(self, parent):
         raise NotImplementedError
 
+    def is_change(self, line):
+        return True
+
+    def changed(self):
+        with self.lock:
+            self.cache = None
+            self.changes += 1
+
+    def monitor(self):
+        """
+        Run the monitor command, refreshing the module on every change it
+        reports, and start it again if it exits.
+        """
+        env = dict(os.environ, LC_ALL="C")
+        while not self.killed.is_set():
+            try:
+                with open(os.devnull, "w") as devnull:
+                    self.process = Popen(
+                        self.monitor_cmd, stdout=PIPE, stderr=devnull, env=env
+                    )
+            except OSError as e:
+                self.parent.py3.log("cannot monitor the volume: {}".format(e))
+                return
+            self.monitoring = True
+            for line in iter(self.process.stdout.readline, b""):
+                if self.is_change(line.decode("utf-8", "replace")):
+                    self.changed()
+                    self.parent.py3.update()
+            self.process.stdout.close()
+            status = self.process.wait()
+            self.monitoring = False
+            self.changed()
+            if self.killed.is_set():
+                break
+            # poll until it is started again
+            self.parent.py3.log("volume monitor exited with status {}".format(status))
+            self.parent.py3.update()
+            self.killed.wait(self.parent.cache_timeout)
+
+    def kill(self):
+        self.killed.set()
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+
+    def volume(self):
+        """
+        Return the volume, only asked again after a change when monitored.
+        """
+        with self.lock:
+            if self.cache is not None:
+                return self.cache
+            changes = self.changes
+        volume = self.get_volume()
+        with self.lock:
+            # a change may have happened while asking
+            if self.monitoring and changes == self.changes:
+                self.cache = volume
+        return volume
+
     def run_cmd(self, cmd):
         return self.parent.py3.command_run(cmd)
 
     def command_output(self, cmd):
-        return self.parent.py3.command_output(cmd)
+        return self.parent.py3.command_output(cmd, persistent=True)
 
 
 class Amixer(Audio):
@@ -167,6 +248,13 @@ class Pamixer(Audio):
     def setup(self, parent):
         is_input = "--source" if self.is_input else "--sink"
         self.cmd = ["pamixer", "--allow-boost", is_input, self.device or "0"]
+        self.device_type = "source" if self.is_input else "sink"
+        if parent.py3.check_commands("pactl"):
+            self.monitor_cmd = ["pactl", "subscribe"]
+
+    def is_change(self, line):
+        # eg Event 'change' on sink #0
+        return " on {} ".format(self.device_type) in line
 
     def get_volume(self):
         try:
@@ -182,7 +270,7 @@ class Pamixer(Audio):
         return perc, muted
 
     def volume_up(self, delta):
-        perc, muted = self.get_volume()
+        perc, muted = self.volume()
         if int(perc) + delta >= self.max_volume:
             options = ["--set-volume", str(self.max_volume)]
         else:
@@ -206,7 +294,18 @@ class Pactl(Audio):
         self.use_default_device = self.device is None
         if self.use_default_device:
             self.device = self.get_default_device()
+        self.default_changed = False
         self.update_device()
+        self.monitor_cmd = ["pactl", "subscribe"]
+
+    def is_change(self, line):
+        # eg Event 'change' on sink #0, the server changes when the default
+        # device does
+        if " on server" in line:
+            with self.lock:
+                self.default_changed = True
+            return self.use_default_device
+        return " on {} ".format(self.device_type) in line
 
     def update_device(self):
         self.re_volume = re.compile(
@@ -250,9 +349,19 @@ class Pactl(Audio):
 
     def get_volume(self):
         output = self.command_output(["pactl", "list", self.device_type_pl]).strip()
+        # when monitored the default device is only looked up when it changes
         if self.use_default_device:
-            self.device = self.get_default_device()
-            self.update_device()
+            with self.lock:
+                default_changed, self.default_changed = self.default_changed, False
+            if default_changed or not self.monitoring:
+                try:
+                    self.device = self.get_default_device()
+                except Exception:
+                    # looked up again on the next update
+                    with self.lock:
+                        self.default_changed = True
+                    raise
+                self.update_device()
         try:
             muted, perc = self.re_volume.search(output).groups()
             muted = muted == "yes"
@@ -261,7 +370,7 @@ class Pactl(Audio):
         return perc, muted
 
     def volume_up(self, delta):
-        perc, muted = self.get_volume()
+        perc, muted = self.volume()
         if int(perc) + delta >= self.max_volume:
             change = "{}%".format(self.max_volume)
         else:
@@ -315,6 +424,9 @@ class Py3status:
     volume_delta = 5
 
     class Meta:
+        # scroll events are merged, on_click reads their repeat count
+        repeat_events = True
+
         def deprecate_function(config):
             # support old thresholds
             return {
@@ -363,7 +475,7 @@ class Py3status:
         self.color_muted = self.py3.COLOR_MUTED or self.py3.COLOR_BAD
 
     def volume_status(self):
-        perc, muted = self.backend.get_volume()
+        perc, muted = self.backend.volume()
         color = None
         icon = None
         new_format = self.format
@@ -384,23 +496,36 @@ class Py3status:
 
         volume_data = {"icon": icon, "percentage": perc}
 
+        if self.backend.monitoring:
+            # refreshed when the volume changes
+            cached_until = self.py3.CACHE_FOREVER
+        else:
+            cached_until = self.py3.time_in(self.cache_timeout)
+
         return {
-            "cached_until": self.py3.time_in(self.cache_timeout),
+            "cached_until": cached_until,
             "full_text": self.py3.safe_format(new_format, volume_data),
             "color": color,
         }
 
     def on_click(self, event):
         button = event["button"]
+        # scrolling fast can be reported as one event repeated
+        delta = self.volume_delta * event.get("repeat", 1)
         if button == self.button_up:
             try:
-                self.backend.volume_up(self.volume_delta)
+                self.backend.volume_up(delta)
             except TypeError:
                 pass
         elif button == self.button_down:
-            self.backend.volume_down(self.volume_delta)
+            self.backend.volume_down(delta)
         elif button == self.button_mute:
             self.backend.toggle_mute()
+        # show the new volume right away
+        self.backend.changed()
+
+    def kill(self):
+        self.backend.kill()
 
 
 if __name__ == "__main__":
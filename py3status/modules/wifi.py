@@ -41,7 +41,8 @@ Color thresholds:
 
 Requires:
     iw: cli configuration utility for wireless devices
-    ip: only for {ip}. may be part of iproute2: ip routing utilities
+    ip: only for {ip} when the interfaces cannot be monitored with
+        rtnetlink. may be part of iproute2: ip routing utilities
 
 Notes:
     Some distributions require commands to be run with privileges. You can
@@ -131,6 +132,8 @@ class Py3status:
         self.signal_dbm_bad = self._percent_to_dbm(self.signal_bad)
         self.signal_dbm_degraded = self._percent_to_dbm(self.signal_degraded)
         self.thresholds_init = self.py3.get_color_names_list(self.format)
+        # refreshed as soon as the device connects or disconnects
+        self.netlink = self.py3.net_subscribe()
 
         # DEPRECATION WARNING
         format_down = getattr(self, "format_down", None)
@@ -157,7 +160,7 @@ class Py3status:
     def _get_wifi_data(self, command):
         for time in range(2):
             try:
-                return self.py3.command_output(command)
+                return self.py3.command_output(command, persistent=True)
             except self.py3.CommandError as ce:
                 if str(command) not in self.commands:
                     command[0:0] = ["sudo", "-n"]
@@ -168,7 +171,14 @@ class Py3status:
                 self.commands.add(str(command))
 
     def wifi(self):
-        iw = self._get_wifi_data(self.iw_dev_id_link)
+        interface = None
+        if self.netlink:
+            interface = (self.py3.get_net_interfaces() or {}).get(self.device)
+        if interface and interface["operstate"] in ["down", "lowerlayerdown"]:
+            # not connected, no need to ask iw
+            iw = ""
+        else:
+            iw = self._get_wifi_data(self.iw_dev_id_link)
 
         bitrate = None
         bitrate_unit = None
@@ -213,7 +223,9 @@ class Py3status:
             freq_ghz = freq_mhz / 1000.0
 
         # ip
-        if self.py3.format_contains(self.format, "ip"):
+        if interface and self.py3.format_contains(self.format, "ip"):
+            ip = (interface["ip4"] or [None])[0]
+        elif self.py3.format_contains(self.format, "ip"):
             ip_info = self._get_wifi_data(self.ip_addr_list_id)
             ip_match = re.search(r"inet\s+([0-9.]+)", ip_info)
             if ip_match:
@@ -128,11 +128,16 @@ class Msg(Ipc):
         wm_msg = {"i3msg": "i3-msg"}.get(parent.ipc, parent.ipc)
         self.tree_command = [wm_msg, "-t", "get_tree"]
 
+    def get_tree(self):
+        return self.json_loads(self.parent.py3.command_output(self.tree_command))
+
     def get_window_properties(self):
-        tree = self.json_loads(self.parent.py3.command_output(self.tree_command))
+        tree = self.get_tree()
         focused = self.find_needle(tree)
-        window_properties = focused.get(
-            "window_properties", {"title": None, "class": None, "instance": None}
+        window_properties = dict(
+            focused.get(
+                "window_properties", {"title": None, "class": None, "instance": None}
+            )
         )
 
         # hide title on containers with window title
@@ -168,6 +173,21 @@ class Msg(Ipc):
         return {}
 
 
+class Shared(Msg):
+    """
+    py3status - connection to the window manager shared by all the modules
+    """
+
+    def setup(self, parent):
+        self.parent.cache_timeout = self.parent.py3.CACHE_FOREVER
+
+    def get_tree(self):
+        tree = self.parent.py3.get_wm_tree()
+        if tree is None:
+            raise Exception("window manager tree not available")
+        return tree
+
+
 class Py3status:
     """
     """
@@ -179,8 +199,13 @@ class Py3status:
     max_width = None
 
     def post_config_hook(self):
-        # ipc: specify i3ipc, i3-msg, or swaymsg, otherwise auto
+        # ipc: specify py3status, i3ipc, i3-msg, or swaymsg, otherwise auto
         self.ipc = getattr(self, "ipc", "")
+        if self.ipc in ["", "py3status"]:
+            if self.py3.wm_subscribe(["window", "workspace"]):
+                self.ipc = "py3status"
+            elif self.ipc:
+                raise Exception(STRING_ERROR.format(self.ipc))
         if self.ipc in ["", "i3ipc"]:
             try:
                 from i3ipc import Connection  # noqa f401, auto ipc
@@ -191,7 +216,9 @@ class Py3status:
                     raise  # module not found
 
         self.ipc = (self.ipc or self.py3.get_wm_msg()).replace("-", "")
-        if self.ipc in ["i3ipc"]:
+        if self.ipc in ["py3status"]:
+            self.backend = Shared(self)
+        elif self.ipc in ["i3ipc"]:
             self.backend = I3ipc(self)
         elif self.ipc in ["i3msg", "swaymsg"]:
             self.backend = Msg(self)
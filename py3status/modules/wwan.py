@@ -164,8 +164,6 @@ down
 
 from datetime import timedelta
 
-from pydbus import SystemBus
-
 STRING_MODEMMANAGER_DBUS = "org.freedesktop.ModemManager1"
 STRING_MODEMMANAGER_SMS_PATH = "/org/freedesktop/ModemManager1/SMS/"
 STRING_MODEM_ERROR = "MM_MODEM_STATE_FAILED"
@@ -324,7 +322,7 @@ class Py3status:
             256: "auto",
         }
 
-        self.bus = SystemBus()
+        self.bus = self.py3.get_dbus("system")
         self.init = {
             "ip": [],
             "sms_message": [],
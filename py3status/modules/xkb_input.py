@@ -363,9 +363,14 @@ class Swaymsg(Xkb):
 
         return xkb_input
 
+    def get_inputs(self):
+        if self.parent.wm_events:
+            return self.parent.py3.get_wm_inputs() or []
+        return self.loads(self.py3_command_output(self.swaymsg_command))
+
     def get_xkb_inputs(self):
         try:
-            xkb_data = self.loads(self.py3_command_output(self.swaymsg_command))
+            xkb_data = self.get_inputs()
         except Exception:
             xkb_data = []
 
@@ -379,10 +384,12 @@ class Swaymsg(Xkb):
                         if not self.fnmatch(xkb_input[key], value):
                             break
                     else:
-                        new_input.append(self.update_xkb_input(xkb_input, _filter))
+                        new_input.append(
+                            self.update_xkb_input(dict(xkb_input), _filter)
+                        )
             else:
                 _filter = {}
-                new_input.append(self.update_xkb_input(xkb_input, _filter))
+                new_input.append(self.update_xkb_input(dict(xkb_input), _filter))
 
         return new_input
 
@@ -422,8 +429,14 @@ class Py3status:
             raise Exception(STRING_NOT_AVAILABLE)
 
         self.error = None
+        # sway input events come through the connection shared by modules
+        self.wm_events = False
+        if self.switcher == "swaymsg" and getattr(self, "listener", True):
+            self.wm_events = self.py3.wm_subscribe(["input"])
         self.input_backend = globals()[self.switcher.replace("-", "_").title()](self)
-        if getattr(self, "listener", True):
+        if self.wm_events:
+            self.cache_timeout = self.py3.CACHE_FOREVER
+        elif getattr(self, "listener", True):
             self.listener_backend = Listener(self)
 
         self.thresholds_init = {}
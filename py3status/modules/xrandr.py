@@ -206,7 +206,7 @@ class Py3status:
         )
         self.old_layout = self.layout or layout
 
-        current = self.py3.command_output("xrandr")
+        current = self.py3.command_output("xrandr", persistent=True)
         for line in current.splitlines():
             try:
                 s = line.split(" ")
@@ -14,15 +14,21 @@ from copy import deepcopy
 from fnmatch import fnmatch
 from math import log10
 from pprint import pformat
+from random import uniform
+from signal import SIGKILL
 from subprocess import Popen, PIPE, STDOUT
+from threading import BoundedSemaphore, Timer, current_thread
 from time import time
 from uuid import uuid4
 
 from py3status import exceptions
+from py3status.coprocess import CoprocessDied, CoprocessPool, shell_command
+from py3status.dbus_monitor import DbusMonitor
 from py3status.formatter import Formatter, Composite, expand_color
-from py3status.request import HttpResponse
+from py3status.request import CircuitBreaker, HttpResponse
+from py3status.sampler import Sampler
 from py3status.storage import Storage
-from py3status.util import Gradients
+from py3status.util import Gradients, SharedCalls, new_session
 from py3status.version import version
 
 
@@ -31,6 +37,12 @@ PY3_LOG_ERROR = "error"
 PY3_LOG_INFO = "info"
 PY3_LOG_WARNING = "warning"
 
+# how many commands can be run at the same time by all the modules
+COMMAND_CONCURRENCY = 8
+
+# upper bound in seconds of the wait between two request retries
+REQUEST_RETRY_MAX_WAIT = 60
+
 # basestring does not exist in python3
 try:
     basestring
@@ -48,6 +60,16 @@ class ModuleErrorException(Exception):
         self.timeout = timeout
 
 
+class ModuleRetryException(Exception):
+    """
+    This exception is used to indicate that a module wants to be run again
+    after timeout seconds, keeping its current output in the meantime.
+    """
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+
 class NoneColor:
     """
     This class represents a color that has explicitly been set as None by the user.
@@ -96,6 +118,12 @@ class Py3:
     """Show as Warning"""
 
     # Shared by all Py3 Instances
+    _circuit_breaker = CircuitBreaker()
+    _command_semaphore = BoundedSemaphore(COMMAND_CONCURRENCY)
+    _coprocess_pool = CoprocessPool(_command_semaphore)
+    _dbus_monitor = DbusMonitor()
+    _sampler = Sampler()
+    _shared_commands = SharedCalls()
     _formatter = None
     _gradients = Gradients()
     _none_color = NoneColor()
@@ -104,6 +132,7 @@ class Py3:
     # Exceptions
     Py3Exception = exceptions.Py3Exception
     CommandError = exceptions.CommandError
+    CommandTimeout = exceptions.CommandTimeout
     RequestException = exceptions.RequestException
     RequestInvalidJSON = exceptions.RequestInvalidJSON
     RequestTimeout = exceptions.RequestTimeout
@@ -120,7 +149,9 @@ class Py3:
         self._format_placeholders_cache = {}
         self._is_python_2 = sys.version_info < (3, 0)
         self._module = module
+        self._py3status_module = None
         self._report_exception_cache = set()
+        self._request_attempts = {}
         self._thresholds = None
         self._threshold_gradients = {}
         self._uid = uuid4()
@@ -510,6 +541,162 @@ class Py3:
         """
         return self._py3_wrapper.config["wm"]["msg"]
 
+    def wm_subscribe(self, events):
+        """
+        Refresh the module whenever the window manager sends one of the given
+        events.  A single connection to the window manager is shared by all
+        the modules.  Returns False if the window manager cannot be reached,
+        eg when testing the module, so that it can fall back to polling.
+
+        :param events: list of ``window``, ``workspace`` or ``input`` (sway only).
+        """
+        if not self._module:
+            return False
+        wm_events = getattr(self._py3_wrapper, "wm_events", None)
+        if not wm_events:
+            return False
+        return wm_events.subscribe(self._module, events)
+
+    def get_wm_tree(self):
+        """
+        Return the layout tree of the window manager, as given by
+        ``i3-msg -t get_tree``, once the module is subscribed with
+        ``wm_subscribe()``.  The tree is kept up to date from the window
+        manager events and is shared so it must not be modified.
+        """
+        return self._py3_wrapper.wm_events.get_tree()
+
+    def get_wm_inputs(self):
+        """
+        Return the inputs of sway, as given by ``swaymsg -t get_inputs``,
+        once the module is subscribed with ``wm_subscribe()``.  The inputs are
+        kept up to date from the input events and are shared so they must not
+        be modified.
+        """
+        return self._py3_wrapper.wm_events.get_inputs()
+
+    def inotify_subscribe(self, paths, callback=None):
+        """
+        Refresh the module as soon as one of the given files or directories
+        changes, rather than waiting for its ``cache_timeout``.  A single
+        inotify thread is shared by all the modules.  Returns False if the
+        paths cannot be watched, eg when testing the module or on systems
+        without inotify, so that it can keep polling.
+
+        :param paths: list of paths of files or directories, a file is watched through its directory so it does not need to exist.
+        :param callback: function called once the changes are done, the module is only refreshed if it returns True.  It is called from the inotify thread so must not block.
+        """
+        if not self._module:
+            return False
+        inotify = getattr(self._py3_wrapper, "inotify", None)
+        if not inotify:
+            return False
+        return inotify.subscribe(self._module, paths, callback)
+
+    def net_subscribe(self):
+        """
+        Refresh the module as soon as a network interface appears, goes up
+        or down, or has an address added or removed.  A single rtnetlink
+        socket is shared by all the modules.  Returns False if the
+        interfaces cannot be monitored, eg when testing the module or on
+        systems other than Linux, so that it can keep polling.
+        """
+        if not self._module:
+            return False
+        rtnetlink = getattr(self._py3_wrapper, "rtnetlink", None)
+        if not rtnetlink:
+            return False
+        return rtnetlink.subscribe(self._module)
+
+    def get_net_interfaces(self):
+        """
+        Return the network interfaces by name, in the order of their index,
+        once the module is subscribed with ``net_subscribe()``.  Each is a
+        dict of its ``index``, ``flags``, ``operstate`` (eg ``up``, ``down``
+        or ``dormant``), hardware ``address`` and the lists of its ``ip4``
+        and ``ip6`` addresses, as ``ip address show`` lists them.  None when
+        the interfaces are no longer monitored, eg after the rtnetlink socket
+        failed, the module is then refreshed once and should poll them.
+        """
+        rtnetlink = getattr(self._py3_wrapper, "rtnetlink", None)
+        if not rtnetlink:
+            return None
+        return rtnetlink.get_interfaces()
+
+    def get_dbus(self, bus="session"):
+        """
+        Return the pydbus connection to the D-Bus ``session`` or ``system``
+        bus.  The connections are shared by all the modules and their signals
+        are dispatched by a single GLib main loop thread, so modules do not
+        need to run a main loop of their own.
+        """
+        return self._dbus_monitor.get_bus(bus)
+
+    def dbus_subscribe(
+        self,
+        service,
+        object_path=None,
+        interface=None,
+        bus="session",
+        callback=None,
+        properties=None,
+    ):
+        """
+        Update the module when the ``PropertiesChanged`` signal of a D-Bus
+        object is received, so that it does not need to poll the object.
+        Returns the pydbus subscription, its ``unsubscribe()`` method can be
+        used to stop receiving the signals.
+
+        :param service: bus name of the service sending the signal.
+        :param object_path: path of the object, by default any object.
+        :param interface: only for properties of this interface.
+        :param bus: ``session`` or ``system``.
+        :param callback: function called first with the interface, a dict of the changed properties and a list of the invalidated ones.  It is called from the main loop thread so must not block.
+        :param properties: list of the properties whose changes are wanted, by default all of them.
+        """
+
+        def properties_changed(interface, changed, invalidated):
+            if properties and not set(properties).intersection(
+                list(changed) + list(invalidated)
+            ):
+                return
+            if callback:
+                callback(interface, changed, invalidated)
+            if self._module:
+                self._module.force_update()
+
+        return self._dbus_monitor.subscribe(
+            properties_changed, service, object_path, interface, bus
+        )
+
+    def get_proc(self, name):
+        """
+        Return the parsed content of a /proc file.  The files are read at
+        most once per half second however many modules use them.  The values
+        are shared so they must not be modified.
+
+        :param name: ``cpuinfo`` (list of cpu frequencies in MHz), ``diskstats`` (dict of block devices statistics), ``loadavg`` (tuple of load averages), ``meminfo`` (dict of values in kB), ``mountinfo`` (list of the source, mount point and type of the mounts, only read again when they change), ``net_dev`` (dict of interfaces statistics) or ``stat`` (dict of cpus times in jiffies).
+        """
+        return self._sampler.sample(name).values
+
+    def get_proc_delta(self, name, interval):
+        """
+        Return a tuple of the seconds elapsed between two samples of a /proc
+        file and the parsed content of both, the latest first, see
+        ``get_proc()``.  The previous sample is the one taken about interval
+        seconds before, the last samples being kept so that modules can
+        compute rates without keeping previous values themselves.  The
+        elapsed time and previous content are None on the first call.
+
+        :param name: see ``get_proc()``.
+        :param interval: seconds between the samples, usually the ``cache_timeout`` of the module.
+        """
+        latest = self._sampler.sample(name)
+        previous = self._sampler.previous(name, interval)
+        if previous is None:
+            return None, latest.values, None
+        return latest.time - previous.time, latest.values, previous.values
+
     def get_output(self, module_name):
         """
         Return the output of the named module.  This will be a list.
@@ -991,11 +1178,19 @@ class Py3:
                 pretty_cmd = command
             else:
                 pretty_cmd = " ".join(command)
-            msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e.errno)
-            raise exceptions.CommandError(msg, error_code=e.errno)
+            error_code = getattr(e, "errno", None)
+            msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=error_code)
+            raise exceptions.CommandError(msg, error_code=error_code)
 
     def command_output(
-        self, command, shell=False, capture_stderr=False, localized=False
+        self,
+        command,
+        shell=False,
+        capture_stderr=False,
+        localized=False,
+        timeout=None,
+        persistent=False,
+        max_age=None,
     ):
         """
         Run a command and return its output as unicode.
@@ -1005,8 +1200,144 @@ class Py3:
         :param shell: if `True` then command is run through the shell
         :param capture_stderr: if `True` then STDERR is piped to STDOUT
         :param localized: if `False` then command is forced to use its default (English) locale
+        :param timeout: time in seconds after which the command, and any process it started, is killed
+        :param persistent: if `True` then command is run by a long running helper shell
+        :param max_age: time in seconds for which the output of the command can be shared
+
+        Only a limited number of commands are run at the same time by all the
+        modules, other calls wait for their turn.
+
+        Persistent mode is meant for commands polled every few seconds.  The
+        helper shells are shared by all modules and save py3status from
+        forking itself for each call.
+
+        With ``max_age``, or the module's ``command_max_age`` setting which
+        overrides it, calls made by several modules at the same time for the
+        same command only run it once and they all get its output, which is
+        also given to the calls made in the following ``max_age`` seconds
+        rather than running the command again.  A setting of ``False`` turns
+        it off.  Commands with side effects must not use it.
+
+        A CommandError is raised if an error occurs and a CommandTimeout if
+        the command had to be killed.
+        """
+        command, pretty_cmd, env = self._command_prepare(command, shell, localized)
+        timeout = self._command_timeout(timeout)
+        setting = getattr(self._py3status_module, "command_max_age", None)
+        if setting is not None:
+            max_age = setting
+        if persistent:
+            run = self._command_output_persistent
+        else:
+            run = self._command_output_popen
+        args = (command, pretty_cmd, env, shell, capture_stderr, timeout)
+        if max_age is None or max_age is False:
+            return run(*args)
+        if isinstance(command, list):
+            key = (tuple(command), shell, capture_stderr, localized, timeout)
+        else:
+            key = (command, shell, capture_stderr, localized, timeout)
+        return self._shared_commands.call(key, max_age, run, *args)
+
+    def _command_output_popen(
+        self, command, pretty_cmd, env, shell, capture_stderr, timeout
+    ):
+        """
+        Run the command in a new process.
+        """
+        stderr = STDOUT if capture_stderr else PIPE
+
+        with self._command_semaphore:
+            try:
+                process = Popen(
+                    command,
+                    stdout=PIPE,
+                    stderr=stderr,
+                    close_fds=True,
+                    universal_newlines=True,
+                    shell=shell,
+                    env=env,
+                    **new_session()
+                )
+            except Exception as e:
+                msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e)
+                self.log(msg)
+                raise exceptions.CommandError(msg, error_code=getattr(e, "errno", None))
+
+            killed = []
+
+            def kill():
+                killed.append(True)
+                self._command_kill(process.pid)
+
+            timer = Timer(timeout, kill)
+            timer.start()
+            try:
+                output, error = process.communicate()
+            finally:
+                timer.cancel()
+
+        if killed:
+            self._command_timed_out(pretty_cmd, timeout)
+        if self._is_python_2 and isinstance(output, str):
+            output = output.decode("utf-8")
+            error = error.decode("utf-8")
+        retcode = process.poll()
+        return self._command_result(pretty_cmd, retcode, output, error)
+
+    def _command_output_persistent(
+        self, command, pretty_cmd, env, shell, capture_stderr, timeout
+    ):
+        """
+        Run the command using the shared helper shells.
+        """
+        if not shell:
+            command = shell_command(command)
+        try:
+            retcode, output, error = self._coprocess_pool.run(
+                command, env, capture_stderr, timeout
+            )
+        except CoprocessDied as e:
+            if e.returncode is None:
+                self._command_timed_out(pretty_cmd, timeout)
+            msg = "Command `{cmd}` failed, its shell exited with status {error}"
+            msg = msg.format(cmd=pretty_cmd, error=e.returncode)
+            raise exceptions.CommandError(msg, error_code=e.returncode)
+        output = output.decode("utf-8", "replace")
+        error = error.decode("utf-8", "replace")
+        return self._command_result(pretty_cmd, retcode, output, error)
+
+    def command_output_async(
+        self,
+        command,
+        shell=False,
+        capture_stderr=False,
+        localized=False,
+        timeout=None,
+    ):
+        """
+        Coroutine version of ``command_output()`` to be awaited from
+        ``async def`` module methods.
+
+        The command is run as an asyncio subprocess so waiting for it does
+        not block the event loop.  The parameters are the same as for
+        ``command_output()``.
+
+        A CommandError is raised if an error occurs and a CommandTimeout if
+        the command had to be killed.
+        """
+        from py3status.async_loop import command_output
+
+        command, pretty_cmd, env = self._command_prepare(command, shell, localized)
+        timeout = self._command_timeout(timeout)
+        return command_output(
+            self, command, pretty_cmd, env, shell, capture_stderr, timeout
+        )
 
-        A CommandError is raised if an error occurs
+    def _command_prepare(self, command, shell, localized):
+        """
+        Return the command to run, a printable version of it for error
+        reporting and the environment to run it in.
         """
         # make a pretty command for error loggings and...
         if isinstance(command, basestring):
@@ -1017,29 +1348,34 @@ class Py3:
         if not shell and isinstance(command, basestring):
             command = shlex.split(command)
 
-        stderr = STDOUT if capture_stderr else PIPE
         env = self._english_env if not localized else None
+        return command, pretty_cmd, env
 
+    def _command_timeout(self, timeout):
+        if timeout is None:
+            timeout = getattr(self._py3status_module, "command_timeout", 120)
+        return timeout
+
+    def _command_kill(self, pid):
+        """
+        Kill a command along with anything it started.  Commands are run in
+        their own session so that a shell and its children go together.
+        """
         try:
-            process = Popen(
-                command,
-                stdout=PIPE,
-                stderr=stderr,
-                close_fds=True,
-                universal_newlines=True,
-                shell=shell,
-                env=env,
-            )
-        except Exception as e:
-            msg = "Command `{cmd}` {error}".format(cmd=pretty_cmd, error=e)
-            self.log(msg)
-            raise exceptions.CommandError(msg, error_code=e.errno)
+            os.killpg(pid, SIGKILL)
+        except OSError:
+            # already finished
+            pass
 
-        output, error = process.communicate()
-        if self._is_python_2 and isinstance(output, str):
-            output = output.decode("utf-8")
-            error = error.decode("utf-8")
-        retcode = process.poll()
+    def _command_timed_out(self, pretty_cmd, timeout):
+        msg = "Command `{cmd}` killed after {timeout} seconds"
+        msg = msg.format(cmd=pretty_cmd, timeout=timeout)
+        raise exceptions.CommandTimeout(msg, error_code=-SIGKILL)
+
+    def _command_result(self, pretty_cmd, retcode, output, error):
+        """
+        Check the return code of a finished command and return its output.
+        """
         if retcode:
             # under certain conditions a successfully run command may get a
             # return code of -15 even though correct output was returned see
@@ -1279,11 +1615,123 @@ class Py3:
         :param auth: authentication info as tuple `(username, password)`
         :param cookiejar: an object of a CookieJar subclass
         :param retry_times: how many times to retry the request
-        :param retry_wait: how long to wait between retries in seconds
+        :param retry_wait: how long to wait before the first retry in seconds
+
+        The wait between retries is doubled, with some jitter, on every retry.
+        When called from a module's update method, a failed request does not
+        wait for the retry.  Instead the module is scheduled to run again
+        once the wait is over and keeps its current output meanwhile.
+
+        Hosts failing repeatedly are skipped for a while, requests to them
+        failing immediately with a ``RequestURLError``.
 
         :returns: HttpResponse
         """
 
+        get_http_response, retry_times, retry_wait = self._request_prepare(
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=timeout,
+            auth=auth,
+            cookiejar=cookiejar,
+            retry_times=retry_times,
+            retry_wait=retry_wait,
+        )
+        circuit_breaker = self._circuit_breaker
+
+        # When run by the scheduler we ask to be run again later rather than
+        # holding the module's thread while waiting for the retry.
+        if self._module is not None:
+            if getattr(current_thread(), "module", None) is self._module:
+                attempt = self._request_attempts.get(url, 0) + 1
+                try:
+                    response = get_http_response()
+                except (self.RequestTimeout, self.RequestURLError):
+                    if attempt >= retry_times:
+                        self._request_attempts.pop(url, None)
+                        raise
+                    self._request_attempts[url] = attempt
+                    self.log("HTTP request retry {}/{}".format(attempt, retry_times))
+                    wait = max(
+                        self._request_retry_wait(retry_wait, attempt),
+                        circuit_breaker.open_for(url),
+                    )
+                    raise ModuleRetryException(wait)
+                self._request_attempts.pop(url, None)
+                return response
+
+        if self.is_gevent():
+            from gevent import sleep
+        else:
+            from time import sleep
+
+        for attempt in range(1, retry_times):
+            try:
+                return get_http_response()
+            except (self.RequestTimeout, self.RequestURLError):
+                # no point waiting on a host we know is unreachable
+                if circuit_breaker.open_for(url):
+                    raise
+                self.log("HTTP request retry {}/{}".format(attempt, retry_times))
+                sleep(self._request_retry_wait(retry_wait, attempt))
+        return get_http_response()
+
+    def request_async(
+        self,
+        url,
+        params=None,
+        data=None,
+        headers=None,
+        timeout=None,
+        auth=None,
+        cookiejar=None,
+        retry_times=None,
+        retry_wait=None,
+    ):
+        """
+        Coroutine version of ``request()`` to be awaited from ``async def``
+        module methods.
+
+        The request itself is made in a worker thread and the wait between
+        retries does not block the event loop.  The parameters are the same as
+        for ``request()``.
+
+        :returns: HttpResponse
+        """
+        from py3status.async_loop import request
+
+        get_http_response, retry_times, retry_wait = self._request_prepare(
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            timeout=timeout,
+            auth=auth,
+            cookiejar=cookiejar,
+            retry_times=retry_times,
+            retry_wait=retry_wait,
+        )
+        return request(self, url, get_http_response, retry_times, retry_wait)
+
+    def _request_prepare(
+        self,
+        url,
+        params,
+        data,
+        headers,
+        timeout,
+        auth,
+        cookiejar,
+        retry_times,
+        retry_wait,
+    ):
+        """
+        Apply the request defaults and return a function making a single
+        request attempt along with the retry settings to use.
+        """
+
         # The aim of this function is to be a limited lightweight replacement
         # for the requests library but using only pythons standard libs.
 
@@ -1308,27 +1756,33 @@ class Py3:
         if "User-Agent" not in headers:
             headers["User-Agent"] = "py3status/{} {}".format(version, self._uid)
 
-        def get_http_response():
-            return HttpResponse(
-                url,
-                params=params,
-                data=data,
-                headers=headers,
-                timeout=timeout,
-                auth=auth,
-                cookiejar=cookiejar,
-            )
+        circuit_breaker = self._circuit_breaker
 
-        for n in range(1, retry_times):
+        def get_http_response():
+            if circuit_breaker.open_for(url):
+                raise self.RequestURLError("host unreachable, request skipped")
             try:
-                return get_http_response()
+                response = HttpResponse(
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    timeout=timeout,
+                    auth=auth,
+                    cookiejar=cookiejar,
+                )
             except (self.RequestTimeout, self.RequestURLError):
-                if self.is_gevent():
-                    from gevent import sleep
-                else:
-                    from time import sleep
-                self.log("HTTP request retry {}/{}".format(n, retry_times))
-                sleep(retry_wait)
-        self.log("HTTP request retry {}/{}".format(retry_times, retry_times))
-        sleep(retry_wait)
-        return get_http_response()
+                circuit_breaker.failure(url)
+                raise
+            circuit_breaker.success(url)
+            return response
+
+        return get_http_response, retry_times, retry_wait
+
+    def _request_retry_wait(self, retry_wait, attempt):
+        """
+        Exponential backoff with jitter so that modules failing together do
+        not all retry at the same time.
+        """
+        wait = min(retry_wait * 2 ** (attempt - 1), REQUEST_RETRY_MAX_WAIT)
+        return uniform(wait / 2, wait)
@@ -2,6 +2,9 @@ import base64
 import json
 import socket
 
+from threading import Lock
+from time import time
+
 try:
     # Python 3
     from urllib.error import URLError, HTTPError
@@ -33,6 +36,58 @@ except ImportError:
 
 from py3status.exceptions import RequestTimeout, RequestURLError, RequestInvalidJSON
 
+# number of consecutive failures before a host is considered down
+CIRCUIT_THRESHOLD = 5
+# how long in seconds requests to a host considered down are skipped
+CIRCUIT_COOLDOWN = 60
+
+
+class CircuitBreaker:
+    """
+    Keep track of hosts that keep failing to respond.
+
+    Once a host has failed too many times in a row we stop contacting it for
+    a cooldown period so that modules fail fast rather than each waiting for
+    their own timeout against a host we already know is unreachable.
+    """
+
+    def __init__(self, threshold=CIRCUIT_THRESHOLD, cooldown=CIRCUIT_COOLDOWN):
+        self.cooldown = cooldown
+        self.threshold = threshold
+        self._hosts = {}
+        self._lock = Lock()
+
+    def _host(self, url):
+        return urlsplit(url).netloc
+
+    def open_for(self, url):
+        """
+        Return how many seconds requests to the url's host should still be
+        skipped for, 0 if the host can be contacted.
+        """
+        with self._lock:
+            failures, open_until = self._hosts.get(self._host(url), (0, 0))
+        return max(open_until - time(), 0)
+
+    def failure(self, url):
+        """
+        Record a failed request to the url's host.
+        """
+        host = self._host(url)
+        with self._lock:
+            failures, open_until = self._hosts.get(host, (0, 0))
+            failures += 1
+            if failures >= self.threshold:
+                open_until = time() + self.cooldown
+            self._hosts[host] = (failures, open_until)
+
+    def success(self, url):
+        """
+        Record a successful request to the url's host.
+        """
+        with self._lock:
+            self._hosts.pop(self._host(url), None)
+
 
 class HttpResponse:
     """
@@ -0,0 +1,298 @@
+"""
+Tracking of the network interfaces and their addresses with rtnetlink.
+
+A single netlink socket is shared by all the modules, it is set up when a
+module first subscribes.  The interfaces and addresses are dumped once then
+kept up to date from the kernel notifications, so modules no longer need to
+run `ip` to find them and are refreshed as soon as they change.
+"""
+
+import errno
+import socket
+import struct
+
+from collections import OrderedDict
+from threading import Lock, Thread, Timer
+
+# seconds to wait after a change for the changes it is part of to be done,
+# eg an interface coming up and being given its addresses
+RTNETLINK_DEBOUNCE = 0.1
+
+NETLINK_ROUTE = 0
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_DELADDR = 21
+RTM_GETADDR = 22
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_OPERSTATE = 16
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+# as in /sys/class/net/*/operstate
+OPERSTATES = [
+    "unknown",
+    "notpresent",
+    "down",
+    "lowerlayerdown",
+    "testing",
+    "dormant",
+    "up",
+]
+
+NLMSGHDR = struct.Struct("=LHHLL")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBi")
+RTATTR = struct.Struct("=HH")
+READ_SIZE = 65536
+
+
+def align(length):
+    return (length + 3) & ~3
+
+
+def parse_attributes(data, offset):
+    """
+    Return the attributes of a message by type.
+    """
+    attributes = {}
+    while offset + RTATTR.size <= len(data):
+        length, attribute = RTATTR.unpack_from(data, offset)
+        if length < RTATTR.size:
+            break
+        attributes[attribute] = data[offset + RTATTR.size : offset + length]
+        offset += align(length)
+    return attributes
+
+
+def parse_messages(data):
+    """
+    Yield the type and payload of the messages read.
+    """
+    offset = 0
+    while offset + NLMSGHDR.size <= len(data):
+        length, message_type = NLMSGHDR.unpack_from(data, offset)[:2]
+        if length < NLMSGHDR.size:
+            break
+        yield message_type, data[offset + NLMSGHDR.size : offset + length]
+        offset += align(length)
+
+
+class Rtnetlink:
+    """
+    Refresh the subscribed modules when the network interfaces or their
+    addresses change, see Py3.net_subscribe()
+    """
+
+    def __init__(self, py3_wrapper):
+        self.available = None
+        self.consumers = []
+        self.interfaces = OrderedDict()
+        self.lock = Lock()
+        self.py3_wrapper = py3_wrapper
+        self.sequence = 0
+        self.sock = None
+        self.timer = None
+
+    def _start(self):
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+        except (AttributeError, socket.error) as e:
+            self.py3_wrapper.log("rtnetlink not available: {}".format(e))
+            return False
+        self.sock = sock
+        try:
+            self._dump()
+        except socket.error as e:
+            self.py3_wrapper.log("rtnetlink not available: {}".format(e))
+            sock.close()
+            return False
+        thread = Thread(target=self.run)
+        thread.daemon = True
+        thread.start()
+        self.py3_wrapper.log("rtnetlink monitoring enabled")
+        return True
+
+    def _dump(self):
+        """
+        Read all the interfaces then all their addresses, the kernel only
+        allowing one dump at a time on a socket.
+        """
+        self.interfaces = OrderedDict()
+        for request, payload in [
+            (RTM_GETLINK, IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)),
+            (RTM_GETADDR, IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)),
+        ]:
+            self.sequence += 1
+            header = NLMSGHDR.pack(
+                NLMSGHDR.size + len(payload),
+                request,
+                NLM_F_REQUEST | NLM_F_DUMP,
+                self.sequence,
+                0,
+            )
+            self.sock.send(header + payload)
+            done = False
+            while not done:
+                for message_type, message in parse_messages(self.sock.recv(READ_SIZE)):
+                    if message_type in [NLMSG_DONE, NLMSG_ERROR]:
+                        done = True
+                    else:
+                        self.message(message_type, message)
+
+    def subscribe(self, py3_module):
+        """
+        Refresh the module when the interfaces change.  Returns False if
+        rtnetlink is not available.
+        """
+        with self.lock:
+            if self.available is None:
+                self.available = self._start()
+            if not self.available:
+                return False
+            if py3_module not in self.consumers:
+                self.consumers.append(py3_module)
+        return True
+
+    def get_interfaces(self):
+        """
+        Return the interfaces by name, see Py3.get_net_interfaces()
+        """
+        with self.lock:
+            if not self.available:
+                return None
+            interfaces = OrderedDict()
+            for interface in self.interfaces.values():
+                if "name" not in interface:
+                    continue
+                interface = dict(interface)
+                interface["ip4"] = list(interface["ip4"])
+                interface["ip6"] = list(interface["ip6"])
+                interfaces[interface["name"]] = interface
+            return interfaces
+
+    def message(self, message_type, message):
+        """
+        Update the interfaces from a message, return whether they changed.
+        """
+        if message_type in [RTM_NEWLINK, RTM_DELLINK]:
+            index = IFINFOMSG.unpack_from(message)[2]
+            if message_type == RTM_DELLINK:
+                return self.interfaces.pop(index, None) is not None
+            flags = IFINFOMSG.unpack_from(message)[3]
+            attributes = parse_attributes(message, IFINFOMSG.size)
+            interface = self.interfaces.get(index)
+            if interface is None:
+                interface = self.interfaces[index] = {
+                    "index": index,
+                    "ip4": [],
+                    "ip6": [],
+                }
+            before = dict(interface)
+            interface["flags"] = flags
+            if IFLA_IFNAME in attributes:
+                name = attributes[IFLA_IFNAME].rstrip(b"\0")
+                interface["name"] = name.decode("utf-8", "replace")
+            if IFLA_OPERSTATE in attributes:
+                operstate = ord(attributes[IFLA_OPERSTATE][:1])
+                if operstate < len(OPERSTATES):
+                    interface["operstate"] = OPERSTATES[operstate]
+            if IFLA_ADDRESS in attributes:
+                interface["address"] = ":".join(
+                    "{:02x}".format(x) for x in bytearray(attributes[IFLA_ADDRESS])
+                )
+            interface.setdefault("operstate", "unknown")
+            interface.setdefault("address", None)
+            return interface != before
+        elif message_type in [RTM_NEWADDR, RTM_DELADDR]:
+            family, prefix_length, flags, scope, index = IFADDRMSG.unpack_from(message)
+            interface = self.interfaces.get(index)
+            if interface is None or family not in [socket.AF_INET, socket.AF_INET6]:
+                return False
+            attributes = parse_attributes(message, IFADDRMSG.size)
+            # the address of the other end of point to point links is
+            # IFA_ADDRESS, the local address is IFA_LOCAL
+            address = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS))
+            if address is None:
+                return False
+            address = socket.inet_ntop(family, address)
+            addresses = interface["ip4" if family == socket.AF_INET else "ip6"]
+            if message_type == RTM_DELADDR:
+                if address not in addresses:
+                    return False
+                addresses.remove(address)
+            elif address not in addresses:
+                addresses.append(address)
+            else:
+                return False
+            return True
+        return False
+
+    def run(self):
+        try:
+            self.listen()
+        except (socket.error, struct.error) as e:
+            self.py3_wrapper.log("rtnetlink monitoring stopped: {}".format(e))
+        self.stop()
+
+    def listen(self):
+        """
+        Process the notifications until the socket fails.
+        """
+        while True:
+            try:
+                data = self.sock.recv(READ_SIZE)
+            except socket.error as e:
+                if e.errno != errno.ENOBUFS:
+                    raise
+                # notifications were lost, read everything again
+                with self.lock:
+                    self._dump()
+                self.changed()
+                continue
+            changed = False
+            with self.lock:
+                for message_type, message in parse_messages(data):
+                    changed = self.message(message_type, message) or changed
+            if changed:
+                self.changed()
+
+    def stop(self):
+        """
+        Stop monitoring, the modules are refreshed to poll the interfaces
+        again.
+        """
+        with self.lock:
+            self.available = False
+            self.interfaces = OrderedDict()
+            consumers, self.consumers = self.consumers, []
+            self.sock.close()
+        for py3_module in consumers:
+            py3_module.force_update()
+
+    def changed(self):
+        with self.lock:
+            if self.timer is None:
+                self.timer = Timer(RTNETLINK_DEBOUNCE, self.changes_done)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def changes_done(self):
+        with self.lock:
+            self.timer = None
+            consumers = list(self.consumers)
+        for py3_module in consumers:
+            py3_module.force_update()
@@ -0,0 +1,328 @@
+"""
+Sampling of the /proc files read by the system metrics modules.
+
+The files are shared by all the modules so that a file is read and parsed
+at most once per tick however many modules use it.  The last samples of each
+file are kept so that modules can compute rates without keeping their own
+previous values.
+
+The files are kept open and read into reused buffers, saving the opening
+of the files but not the allocations: the content read is copied out of the
+buffer and parsing it creates the objects of the lines and fields.  The
+lines of meminfo and diskstats are only parsed when they are first looked
+up, eg only the disks displayed.  stat and net/dev are parsed in full as
+their users read all the cpus or interfaces.
+"""
+
+import os
+import re
+import select
+
+from collections import OrderedDict, deque, namedtuple
+from threading import Lock
+from time import time
+
+try:
+    # Python 3
+    from collections.abc import Mapping, Sequence
+except ImportError:
+    # Python 2
+    from collections import Mapping, Sequence
+
+# seconds during which a sample is used rather than reading the file again
+TICK = 0.5
+# number of samples kept for each file
+HISTORY = 32
+
+# initial size of the buffers the files are read into
+BUFFER_SIZE = 16384
+# lines of a file looked up one by one before parsing all of them
+MAX_SEARCHES = 8
+
+Sample = namedtuple("Sample", "time values")
+
+
+class Fields(Sequence):
+    """
+    The numbers of a line, only converted to int when used.
+    """
+
+    __slots__ = ["fields"]
+
+    def __init__(self, fields):
+        self.fields = fields
+
+    def __getitem__(self, index):
+        try:
+            return int(self.fields[index])
+        except TypeError:
+            # a slice
+            return tuple(map(int, self.fields[index]))
+
+    def __iter__(self):
+        return iter(map(int, self.fields))
+
+    def __len__(self):
+        return len(self.fields)
+
+
+class Table(Mapping):
+    """
+    The lines of a /proc file, by name.  A line is only found and parsed
+    when it is first looked up so that modules only pay for the disks or
+    values they use.  The first lines looked up are found with a regular
+    expression search over the whole file, all the lines are found at once
+    when they are iterated over or many are looked up.  The samples are
+    shared by the modules threads so the lines are parsed under a lock.
+
+    line is the pattern of a line, formatted with the pattern of the name,
+    its groups being the name and the fields given to parse.
+    """
+
+    def __init__(self, data, line, name, parse):
+        self.data = data
+        self.indexed = False
+        self.line = line
+        self.lock = Lock()
+        self.name = name
+        self.parse = parse
+        self.parsed = {}
+        self.searches = 0
+
+    def _parse_all(self):
+        with self.lock:
+            if not self.indexed:
+                parsed = OrderedDict()
+                pattern = self.line % self.name
+                for name, fields in re.findall(pattern, self.data, re.M):
+                    name = name.decode("utf-8")
+                    parsed[name] = self.parsed.get(name) or self.parse(fields)
+                self.parsed = parsed
+                self.indexed = True
+            return self.parsed
+
+    def __getitem__(self, name):
+        value = self.parsed.get(name)
+        if value is not None:
+            return value
+        with self.lock:
+            # searching for many names costs more than finding all the lines
+            if not self.indexed and self.searches < MAX_SEARCHES:
+                self.searches += 1
+                pattern = self.line % re.escape(name.encode("utf-8"))
+                match = re.search(pattern, self.data, re.M)
+                if match is None:
+                    raise KeyError(name)
+                value = self.parsed[name] = self.parse(match.group(2))
+                return value
+        return self._parse_all()[name]
+
+    def __iter__(self):
+        return iter(self._parse_all())
+
+    def __len__(self):
+        return len(self._parse_all())
+
+
+def parse_cpuinfo(data):
+    """
+    Return the frequencies of the cpus in MHz.
+    """
+    return [float(line.split()[-1]) for line in data.splitlines() if b"cpu MHz" in line]
+
+
+def parse_diskstats(data):
+    """
+    Return the major and minor numbers followed by the statistics of each
+    block device, by name.
+    """
+
+    def parse(data):
+        fields = data.split()
+        del fields[2]
+        return Fields(fields)
+
+    # the name is the third field but the whole line is parsed
+    return Table(data, br"^ *(?=\d+ +\d+ (%s) )(.*)$", br"\S+", parse)
+
+
+def parse_loadavg(data):
+    """
+    Return the 1, 5 and 15 minutes load averages.
+    """
+    return tuple(float(x) for x in data.split()[:3])
+
+
+def parse_meminfo(data):
+    """
+    Return the memory statistics in kB, by name.
+    """
+    return Table(data, br"^(%s): +(\d+)", br"[^:\n]+", int)
+
+
+def parse_mountinfo(data):
+    """
+    Return the source, mount point and filesystem type of each mount.
+    """
+
+    def unescape(field):
+        # spaces and the like are octal escaped
+        field = re.sub(
+            br"\\([0-7]{3})", lambda m: bytearray([int(m.group(1), 8)]), field
+        )
+        return field.decode("utf-8", "replace")
+
+    mounts = []
+    for line in data.splitlines():
+        fields, _, extra = line.partition(b" - ")
+        mount_point = fields.split()[4]
+        fs_type, source = extra.split()[:2]
+        mounts.append((unescape(source), unescape(mount_point), unescape(fs_type)))
+    return mounts
+
+
+def parse_net_dev(data):
+    """
+    Return the received and transmitted statistics of each interface, by
+    name.
+    """
+    interfaces = OrderedDict()
+    # skip the two header lines, the counters are only converted to int when
+    # used as most of them are not
+    for line in data.splitlines()[2:]:
+        name, _, fields = line.partition(b":")
+        interfaces[name.strip().decode("utf-8")] = Fields(fields.split())
+    return interfaces
+
+
+def parse_stat(data):
+    """
+    Return the time spent in each mode by all the cpus as ``cpu`` followed
+    by each cpu, in jiffies.
+    """
+    cpus = OrderedDict()
+    for line in data.splitlines():
+        if line.startswith(b"cpu"):
+            fields = line.split()
+            cpus[fields[0].decode("utf-8")] = tuple(map(int, fields[1:]))
+    return cpus
+
+
+def read_into(fd, buffer):
+    """
+    Read the file from its start into the buffer and return the number of
+    bytes read.
+    """
+    try:
+        return os.preadv(fd, [buffer], 0)
+    except AttributeError:
+        # python < 3.7
+        os.lseek(fd, 0, os.SEEK_SET)
+        data = os.read(fd, len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class ProcFile:
+    """
+    A /proc file kept open and read in a single system call into a buffer
+    kept between reads, the kernel generating its content again on every
+    read from its start.  sysfs files are read the same way.
+    """
+
+    def __init__(self, path, watch=False, size=BUFFER_SIZE):
+        self.fd = os.open(path, os.O_RDONLY)
+        self.buffer = bytearray(size)
+        self.poll = None
+        if watch:
+            self.poll = select.poll()
+            self.poll.register(self.fd, select.POLLPRI | select.POLLERR)
+
+    def close(self):
+        os.close(self.fd)
+
+    def changed(self):
+        """
+        Return whether the content of a watched file may have changed since
+        it was last checked, eg for mountinfo the mounts.
+        """
+        return self.poll is None or bool(self.poll.poll(0))
+
+    def read(self):
+        """
+        Return the content of the file.  It is a copy of the buffer as the
+        samples keep it, the lines of lazy tables being parsed from it later,
+        while the buffer is reused by the next read.
+        """
+        while True:
+            size = read_into(self.fd, self.buffer)
+            if size < len(self.buffer):
+                return bytes(memoryview(self.buffer)[:size])
+            # the file may not have been read in full
+            self.buffer = bytearray(len(self.buffer) * 2)
+
+
+PROC_FILES = {
+    "cpuinfo": ("/proc/cpuinfo", parse_cpuinfo),
+    "diskstats": ("/proc/diskstats", parse_diskstats),
+    "loadavg": ("/proc/loadavg", parse_loadavg),
+    "meminfo": ("/proc/meminfo", parse_meminfo),
+    "mountinfo": ("/proc/self/mountinfo", parse_mountinfo),
+    "net_dev": ("/proc/net/dev", parse_net_dev),
+    "stat": ("/proc/stat", parse_stat),
+}
+# files only read again when polling them tells they changed
+WATCHED_FILES = ["mountinfo"]
+
+
+class Sampler:
+    """
+    The samples of the /proc files, see Py3.get_proc()
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.lock = Lock()
+        self.samples = {}
+
+    def sample(self, name):
+        """
+        Return the latest sample of the file, reading it if the last one is
+        older than a tick.  Watched files are only read again if they
+        changed.
+        """
+        path, parse = PROC_FILES[name]
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=HISTORY)
+            proc_file = self.files.get(name)
+            if proc_file is None:
+                proc_file = ProcFile(path, watch=name in WATCHED_FILES)
+                self.files[name] = proc_file
+            now = time()
+            if samples and now - samples[-1].time < TICK:
+                return samples[-1]
+            if samples and not proc_file.changed():
+                return samples[-1]
+            sample = Sample(now, parse(proc_file.read()))
+            samples.append(sample)
+            return sample
+
+    def previous(self, name, interval):
+        """
+        Return the most recent sample taken about interval seconds before the
+        latest one, or the oldest one kept if none is that old.  None if
+        there is only the latest sample.
+        """
+        with self.lock:
+            samples = self.samples.get(name)
+            if not samples or len(samples) < 2:
+                return None
+            latest = samples[-1]
+            # allow for the modules not being run exactly on time
+            interval -= TICK
+            for sample in reversed(samples):
+                if latest.time - sample.time >= interval and sample is not latest:
+                    return sample
+            return samples[0]
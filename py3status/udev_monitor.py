@@ -1,5 +1,5 @@
 from collections import defaultdict
-from time import sleep
+from threading import Lock, Timer
 
 from py3status.constants import ON_TRIGGER_ACTIONS
 
@@ -8,10 +8,17 @@ try:
 except ImportError:
     pyudev = None
 
+# seconds to wait after a udev event for the burst of events it is part of to
+# end and for sysfs to settle before refreshing the modules
+UDEV_DEBOUNCE = 0.5
+
 
 class UdevMonitor:
     """
     This class allows us to react to udev events.
+
+    Only the events of the subsystems modules subscribed to are received and
+    those arriving together are coalesced so each module is refreshed once.
     """
 
     def __init__(self, py3_wrapper):
@@ -21,26 +28,46 @@ class UdevMonitor:
         self.py3_wrapper = py3_wrapper
         self.pyudev_available = pyudev is not None
         self.udev_consumers = defaultdict(list)
+        self.udev_monitor = None
         self.udev_observer = None
+        self.lock = Lock()
+        self.pending_subsystems = set()
+        self.timer = None
 
     def _setup_pyudev_monitoring(self):
         """
         Setup the udev monitor.
         """
         context = pyudev.Context()
-        monitor = pyudev.Monitor.from_netlink(context)
-        self.udev_observer = pyudev.MonitorObserver(monitor, self._udev_event)
+        self.udev_monitor = pyudev.Monitor.from_netlink(context)
+        self.udev_observer = pyudev.MonitorObserver(self.udev_monitor, self._udev_event)
         self.udev_observer.start()
         self.py3_wrapper.log("udev monitoring enabled")
 
     def _udev_event(self, action, device):
         """
         This is a callback method that will trigger a refresh on subscribers.
+        It runs in the observer thread so must not block, the refresh is
+        done once the burst of events is over.
         """
         # self.py3_wrapper.log(
         #     "detected udev action '%s' on subsystem '%s'" % (action, device.subsystem)
         # )
-        self.trigger_actions(device.subsystem)
+        with self.lock:
+            self.pending_subsystems.add(device.subsystem)
+            if self.timer is None:
+                self.timer = Timer(UDEV_DEBOUNCE, self._udev_events_done)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def _udev_events_done(self):
+        """
+        Refresh the subscribers of the subsystems that had events.
+        """
+        with self.lock:
+            subsystems, self.pending_subsystems = self.pending_subsystems, set()
+            self.timer = None
+        self.trigger_actions(*sorted(subsystems))
 
     def subscribe(self, py3_module, trigger_action, subsystem):
         """
@@ -59,6 +86,9 @@ class UdevMonitor:
                     % (py3_module.module_full_name, trigger_action)
                 )
                 return False
+            if subsystem not in self.udev_consumers:
+                # have the kernel only send us the events we are interested in
+                self.udev_monitor.filter_by(subsystem)
             self.udev_consumers[subsystem].append((py3_module, trigger_action))
             self.py3_wrapper.log(
                 "module %s subscribed to udev events on %s"
@@ -72,15 +102,21 @@ class UdevMonitor:
             )
             return False
 
-    def trigger_actions(self, subsystem):
+    def trigger_actions(self, *subsystems):
         """
-        Refresh all modules which subscribed to the given subsystem.
+        Refresh all modules which subscribed to the given subsystems, once
+        even if subscribed to several of them.
         """
-        for py3_module, trigger_action in self.udev_consumers[subsystem]:
-            if trigger_action in ON_TRIGGER_ACTIONS:
+        refreshed = set()
+        for subsystem in subsystems:
+            for py3_module, trigger_action in self.udev_consumers.get(subsystem, []):
+                if trigger_action not in ON_TRIGGER_ACTIONS:
+                    continue
+                if py3_module in refreshed:
+                    continue
+                refreshed.add(py3_module)
                 self.py3_wrapper.log(
                     "%s udev event, refresh consumer %s"
                     % (subsystem, py3_module.module_full_name)
                 )
-                sleep(0.1)
                 py3_module.force_update()
@@ -1,9 +1,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 
+import os
 import re
+import sys
 from colorsys import rgb_to_hsv, hsv_to_rgb
+from copy import copy
 from math import modf
+from threading import Event, Lock
+from time import time
+
+
+def new_session():
+    """
+    Return the Popen keyword arguments starting a process in a session of
+    its own, so that it can be killed along with its children.
+    """
+    if sys.version_info < (3, 2):
+        return {"preexec_fn": os.setsid}
+    return {"start_new_session": True}
 
 
 class Gradients:
@@ -137,3 +152,63 @@ class Gradients:
         # cache gradient
         self._gradients_cache[key] = colors
         return colors
+
+
+class SharedCalls:
+    """
+    Share the result of identical calls made by different modules.
+
+    A call made while an identical one is in progress waits for it and gets
+    its result, as does a call made less than max_age seconds after an
+    identical one finished.  Exceptions are shared the same way, each
+    waiting call raising its own copy.
+    """
+
+    class Call:
+        def __init__(self, max_age):
+            self.done = Event()
+            self.error = None
+            self.finished = None
+            self.max_age = max_age
+            self.result = None
+
+        def fresh(self, now):
+            return not self.done.is_set() or now - self.finished < self.max_age
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = Lock()
+
+    def call(self, key, max_age, function, *args):
+        with self._lock:
+            now = time()
+            # forget the results too old to be given to anyone
+            for old_key, old_call in list(self._calls.items()):
+                if not old_call.fresh(now):
+                    del self._calls[old_key]
+            call = self._calls.get(key)
+            if call and call.done.is_set() and now - call.finished >= max_age:
+                call = None
+            owner = call is None
+            if owner:
+                call = self._calls[key] = self.Call(max_age)
+
+        if owner:
+            try:
+                call.result = function(*args)
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                call.finished = time()
+                call.done.set()
+                if not max_age:
+                    with self._lock:
+                        if self._calls.get(key) is call:
+                            del self._calls[key]
+            return call.result
+
+        call.done.wait()
+        if call.error:
+            raise copy(call.error)
+        return call.result
@@ -0,0 +1,384 @@
+"""
+Talk to i3 or sway over their IPC socket.
+
+Commands are sent over one connection kept open and shared by all the click
+events.  They are sent without waiting for the replies of the previous ones,
+the replies being read and logged in a thread of their own.
+
+The layout tree and inputs used by modules are kept up to date from the
+window manager events received over another connection, also shared by all
+the modules.
+"""
+
+import json
+import os
+import socket
+import struct
+
+from collections import defaultdict, deque
+from subprocess import check_output, CalledProcessError
+from threading import Event, Lock, Thread
+from time import sleep
+
+MAGIC = b"i3-ipc"
+HEADER = struct.Struct("=6sII")
+RUN_COMMAND = 0
+SUBSCRIBE = 2
+GET_TREE = 4
+GET_INPUTS = 100
+# replies to subscriptions have the high bit of their type set
+EVENT_MASK = 1 << 31
+EVENTS = {0: "workspace", 3: "window", 21: "input"}
+# window events only changing the container they are about, others can
+# change the layout so the whole tree is fetched again
+WINDOW_PATCHES = ["focus", "fullscreen_mode", "mark", "title", "urgent"]
+SOCKET_ENV = {"i3": "I3SOCK", "sway": "SWAYSOCK"}
+# seconds to wait before reconnecting, eg while the window manager restarts
+RECONNECT_WAIT = 5
+# seconds modules wait for the tree or inputs when first asking for them
+READY_TIMEOUT = 5
+
+
+def pack(message_type, payload=u""):
+    """
+    Return an IPC message.
+    """
+    payload = payload.encode("utf-8")
+    return HEADER.pack(MAGIC, len(payload), message_type) + payload
+
+
+def read_message(reader):
+    """
+    Read an IPC message from a file object and return its type and decoded
+    payload, or None if the connection was closed.
+    """
+    header = reader.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    magic, length, message_type = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("invalid IPC message")
+    payload = reader.read(length)
+    if len(payload) < length:
+        return None
+    return message_type, json.loads(payload.decode("utf-8"))
+
+
+def get_socket_path(wm_name):
+    """
+    Return the path of the IPC socket of the window manager or None if it
+    cannot be found.
+    """
+    path = os.environ.get(SOCKET_ENV.get(wm_name, ""))
+    if not path:
+        try:
+            command = [wm_name, "--get-socketpath"]
+            path = check_output(command).decode("utf-8").strip()
+        except (CalledProcessError, OSError):
+            pass
+    return path or None
+
+
+def patch_tree(node, patches):
+    """
+    Return the tree with the nodes whose id is in patches replaced by the
+    result of their patch function.  Only the nodes leading to a patched one
+    are copied, the rest is shared with the original tree.
+    """
+    patch = patches.get(node.get("id"))
+    if patch:
+        node = patch(node)
+    new_node = None
+    for key in ["nodes", "floating_nodes"]:
+        children = node.get(key)
+        if not children:
+            continue
+        new_children = [patch_tree(child, patches) for child in children]
+        if any(new is not old for new, old in zip(new_children, children)):
+            if new_node is None:
+                new_node = dict(node)
+            new_node[key] = new_children
+    return new_node or node
+
+
+def find_focused(node):
+    """
+    Return the id of the focused node of the tree.
+    """
+    if node.get("focused"):
+        return node.get("id")
+    for child in node.get("nodes", []) + node.get("floating_nodes", []):
+        focused = find_focused(child)
+        if focused is not None:
+            return focused
+    return None
+
+
+class WmIpc:
+    """
+    Send commands to the window manager, see Events.wm_msg()
+    """
+
+    def __init__(self, py3_wrapper):
+        self.lock = Lock()
+        self.pending = deque()
+        self.py3_wrapper = py3_wrapper
+        self.sock = None
+        self.socket_path = None
+        self.wm_name = py3_wrapper.config["wm_name"]
+
+    def get_socket_path(self):
+        if self.socket_path is None:
+            self.socket_path = get_socket_path(self.wm_name) or ""
+        return self.socket_path or None
+
+    def connect(self):
+        path = self.get_socket_path()
+        if not path:
+            raise socket.error("no IPC socket found")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except socket.error:
+            sock.close()
+            raise
+        self.sock = sock
+        reader = Thread(target=self.read_replies, args=(sock,))
+        reader.daemon = True
+        reader.start()
+
+    def disconnect(self, sock):
+        """
+        Drop the connection, the replies still expected on it are lost.
+        """
+        if self.sock is sock:
+            self.sock = None
+            self.pending.clear()
+        # wake up its reader thread
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except (socket.error, OSError):
+            pass
+        sock.close()
+
+    def command(self, module_name, command):
+        """
+        Send the command without waiting for it to be run.  Returns False if
+        it could not be sent, eg if the window manager is not reachable.
+        """
+        message = pack(RUN_COMMAND, command)
+        with self.lock:
+            # a connection closed by the window manager (eg on restart) is
+            # only noticed when writing so try again with a new one
+            for attempt in range(2):
+                try:
+                    if self.sock is None:
+                        self.connect()
+                    self.pending.append((module_name, command))
+                    self.sock.sendall(message)
+                    return True
+                except (socket.error, IOError, OSError):
+                    if self.sock is not None:
+                        self.disconnect(self.sock)
+        return False
+
+    def read_replies(self, sock):
+        """
+        Log the replies to the commands as they come in, they are in the
+        order the commands were sent.
+        """
+        reader = sock.makefile("rb")
+        try:
+            while True:
+                message = read_message(reader)
+                if message is None:
+                    break
+                message_type, reply = message
+                if message_type & EVENT_MASK or not self.pending:
+                    continue
+                module_name, command = self.pending.popleft()
+                self.py3_wrapper.log(
+                    '{} module="{}" command="{}" reply={}'.format(
+                        self.wm_name, module_name, command, json.dumps(reply)
+                    )
+                )
+        except (socket.error, IOError, OSError, ValueError):
+            pass
+        reader.close()
+        with self.lock:
+            self.disconnect(sock)
+
+
+class WmEvents:
+    """
+    Keep the layout tree and inputs of the window manager up to date from
+    its events and refresh the modules subscribed to them, see
+    Py3.wm_subscribe()
+
+    Events only changing a window are applied to the cached tree, copying
+    just the nodes leading to it, the tree is fetched again for other ones.
+    Modules must not modify the tree or inputs they are given.
+    """
+
+    def __init__(self, py3_wrapper):
+        self.consumers = defaultdict(list)
+        self.focused = None
+        self.inputs = None
+        self.inputs_ready = Event()
+        self.inputs_requested = False
+        self.inputs_wanted = False
+        self.lock = Lock()
+        self.py3_wrapper = py3_wrapper
+        self.socket_path = None
+        self.thread = None
+        self.tree = None
+        self.tree_ready = Event()
+        self.tree_requested = False
+        self.tree_wanted = False
+        self.waiting = set()
+        self.wm_name = py3_wrapper.config["wm_name"]
+
+    def subscribe(self, py3_module, events):
+        """
+        Refresh the module on the given events, the connection to the window
+        manager is made when the first module subscribes.  Returns False if
+        the window manager cannot be reached.
+        """
+        with self.lock:
+            if self.thread is None:
+                self.socket_path = get_socket_path(self.wm_name)
+                if not (self.socket_path and os.path.exists(self.socket_path)):
+                    return False
+                self.thread = Thread(target=self.run)
+                self.thread.daemon = True
+                self.thread.start()
+                self.py3_wrapper.log(
+                    "{} IPC events monitoring enabled".format(self.wm_name)
+                )
+            for event in events:
+                self.consumers[event].append(py3_module)
+        return True
+
+    def get_tree(self):
+        self.tree_ready.wait(READY_TIMEOUT)
+        return self.tree
+
+    def get_inputs(self):
+        self.inputs_ready.wait(READY_TIMEOUT)
+        return self.inputs
+
+    def notify(self, events):
+        """
+        Refresh the modules subscribed to the events.
+        """
+        with self.lock:
+            modules = []
+            for event in events:
+                for py3_module in self.consumers.get(event, []):
+                    if py3_module not in modules:
+                        modules.append(py3_module)
+        for py3_module in modules:
+            py3_module.force_update()
+
+    def run(self):
+        while self.py3_wrapper.running:
+            try:
+                self.listen()
+            except (socket.error, IOError, OSError, ValueError):
+                pass
+            self.py3_wrapper.log("{} IPC connection lost".format(self.wm_name))
+            sleep(RECONNECT_WAIT)
+
+    def listen(self):
+        """
+        Subscribe to the events and process them until the connection is
+        closed.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+            reader = sock.makefile("rb")
+            events = ["window", "workspace"]
+            if self.wm_name == "sway":
+                events.append("input")
+            sock.sendall(pack(SUBSCRIBE, json.dumps(events)))
+            # the modules waiting on the tree or inputs get them once they
+            # have been fetched
+            self.waiting = {"window", "workspace"}
+            self.tree_wanted = True
+            self.tree_requested = False
+            self.inputs_wanted = self.wm_name == "sway"
+            self.inputs_requested = False
+            while True:
+                self.request(sock)
+                message = read_message(reader)
+                if message is None:
+                    return
+                message_type, payload = message
+                if message_type & EVENT_MASK:
+                    event = EVENTS.get(message_type & ~EVENT_MASK)
+                    if event == "input":
+                        self.input_event(payload)
+                    elif event:
+                        self.tree_event(event, payload)
+                elif message_type == GET_TREE:
+                    self.tree_requested = False
+                    self.tree = payload
+                    self.focused = find_focused(payload)
+                    self.tree_ready.set()
+                    waiting, self.waiting = self.waiting, set()
+                    self.notify(waiting)
+                elif message_type == GET_INPUTS:
+                    self.inputs_requested = False
+                    self.inputs = payload
+                    self.inputs_ready.set()
+                    self.notify(["input"])
+        finally:
+            sock.close()
+
+    def request(self, sock):
+        """
+        Fetch the tree and inputs if needed, without asking for them again
+        while a request is outstanding so that bursts of events are
+        coalesced.
+        """
+        if self.tree_wanted and not self.tree_requested:
+            self.tree_wanted = False
+            self.tree_requested = True
+            sock.sendall(pack(GET_TREE))
+        if self.inputs_wanted and not self.inputs_requested:
+            self.inputs_wanted = False
+            self.inputs_requested = True
+            sock.sendall(pack(GET_INPUTS))
+
+    def tree_event(self, event, payload):
+        change = payload.get("change")
+        if event == "window" and change in WINDOW_PATCHES and self.tree:
+            container = payload["container"]
+            patches = {container["id"]: lambda node: container}
+            if change == "focus":
+                if self.focused not in (None, container["id"]):
+                    patches[self.focused] = lambda node: dict(node, focused=False)
+                self.focused = container["id"]
+            self.tree = patch_tree(self.tree, patches)
+            self.notify([event])
+        else:
+            self.tree_wanted = True
+            self.waiting.add(event)
+
+    def input_event(self, payload):
+        if self.inputs is None:
+            return
+        change = payload.get("change")
+        changed = payload["input"]
+        inputs = [x for x in self.inputs if x["identifier"] != changed["identifier"]]
+        if change != "removed":
+            # keep the order of the inputs
+            for index, x in enumerate(self.inputs):
+                if x["identifier"] == changed["identifier"]:
+                    inputs.insert(index, changed)
+                    break
+            else:
+                inputs.append(changed)
+        self.inputs = inputs
+        self.notify(["input"])
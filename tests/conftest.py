@@ -0,0 +1,53 @@
+import time
+
+import pytest
+
+
+class MockModule:
+    """
+    A module counting the times it is refreshed.
+    """
+
+    def __init__(self, name=""):
+        self.module_full_name = name
+        self.module_name = name.split(" ")[0]
+        self.module_inst = "".join(name.split(" ")[1:])
+        self.module_nice_name = name
+        self.updates = 0
+        self.full_text = "0"
+
+    def force_update(self):
+        self.updates += 1
+
+    def get_latest(self):
+        return [{"full_text": self.full_text, "name": self.module_name}]
+
+
+class MockPy3statusWrapper:
+    def log(self, *arg, **kw):
+        pass
+
+
+def wait_for(condition, timeout=2):
+    """
+    Wait until condition() is true, for the threads of the tests to have
+    done their work rather than for a given time.
+    """
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def mock_module():
+    return MockModule
+
+
+@pytest.fixture
+def py3_wrapper():
+    return MockPy3statusWrapper()
+
+
+@pytest.fixture(name="wait_for")
+def wait_for_fixture():
+    return wait_for
@@ -0,0 +1,54 @@
+import os
+
+from py3status.modules.backlight import Py3status
+
+
+class MockPy3:
+    CommandError = Exception
+    CACHE_FOREVER = -1
+
+    def command_output(self, command):
+        raise self.CommandError()
+
+    def get_dbus(self, bus):
+        raise ImportError()
+
+    def safe_format(self, format_string, param_dict=None):
+        return param_dict["level"]
+
+    def time_in(self, seconds):
+        return seconds
+
+    def update_placeholder_formats(self, format_string, formats):
+        return format_string
+
+
+def test_backlight_sys(tmpdir):
+    device = tmpdir.mkdir("intel_backlight")
+    device.join("max_brightness").write("1000\n")
+    device.join("brightness").write("500\n")
+
+    module = Py3status()
+    module.py3 = MockPy3()
+    module.device = str(device)
+    module.post_config_hook()
+    try:
+        assert module.backlight()["full_text"] == 50
+
+        # max_brightness is only read once, brightness is kept open
+        device.join("max_brightness").write("2000\n")
+        device.join("brightness").write("250\n")
+        brightness_file = module.brightness_file
+        assert module.backlight()["full_text"] == 25
+        assert module.brightness_file is brightness_file
+
+        # a failed read opens the device again
+        fd = os.open(str(tmpdir), os.O_RDONLY)
+        os.dup2(fd, brightness_file.fd)
+        os.close(fd)
+        assert module.backlight()["full_text"] == 12.5
+        assert module.brightness_max == 2000
+        assert module.brightness_file is not brightness_file
+    finally:
+        module.kill()
+    assert module.brightness_file is None
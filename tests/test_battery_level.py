@@ -0,0 +1,65 @@
+from py3status.modules.battery_level import Py3status
+
+
+class MockPy3:
+    def log(self, *arg, **kw):
+        pass
+
+
+def test_battery_level_sys(tmpdir):
+    ac = tmpdir.mkdir("AC")
+    ac.join("type").write("Mains\n")
+    ac.join("online").write("0\n")
+    battery = tmpdir.mkdir("BAT0")
+    for name, value in [
+        ("energy_full", "50000000"),
+        ("energy_now", "25000000"),
+        ("power_now", "10000000"),
+        ("status", "Discharging"),
+    ]:
+        battery.join(name).write(value + "\n")
+
+    module = Py3status()
+    module.py3 = MockPy3()
+    module.sys_battery_path = str(tmpdir) + "/"
+    module.post_config_hook()
+    assert module.measurement_mode == "sys"
+
+    info = module.get_battery_info()
+    assert info == [
+        {
+            "capacity": 50000000,
+            "charging": False,
+            "percent_charged": 50,
+            "time_remaining": "2:30:00",
+        }
+    ]
+    files = module.power_supplies["batteries"][0]["files"]
+
+    # the remaining time is computed from the average rate
+    battery.join("power_now").write("40000000\n")
+    assert module.get_battery_info()[0]["time_remaining"] == "1:00:00"
+    assert module.power_supplies["batteries"][0]["files"] is files
+
+    # plugging the AC adapter discards the previous rates
+    ac.join("online").write("1\n")
+    battery.join("status").write("Charging\n")
+    battery.join("power_now").write("25000000\n")
+    info = module.get_battery_info()[0]
+    assert info["charging"]
+    assert info["time_remaining"] == "1:00:00"
+
+    # a new battery is found
+    second = tmpdir.mkdir("BAT1")
+    for name, value in [
+        ("charge_full", "4000000"),
+        ("charge_now", "4000000"),
+        ("current_now", "0"),
+        ("status", "Full"),
+    ]:
+        second.join(name).write(value + "\n")
+    info = module.get_battery_info()
+    assert len(info) == 2
+    info = [x for x in info if x["capacity"] == 4000000][0]
+    assert info["percent_charged"] == 100
+    assert info["time_remaining"] == "?"
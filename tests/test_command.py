@@ -0,0 +1,154 @@
+import json
+import socket
+
+import pytest
+
+from py3status import command
+from py3status.command import CommandServer, ModuleIndex
+
+
+@pytest.fixture
+def server(mock_module, py3_wrapper):
+    names = ["wifi", "net_rate eth0", "net_rate wlan0"]
+    py3_wrapper.config = {"debug": False}
+    py3_wrapper.output_modules = {
+        name: {"module": mock_module(name), "type": "py3status"} for name in names
+    }
+    py3_wrapper.module_index = ModuleIndex()
+    for name in names:
+        py3_wrapper.module_index.add(name, name)
+    py3_wrapper.report_exception = lambda *arg, **kw: None
+    server = CommandServer(py3_wrapper)
+    server.daemon = True
+    server.start()
+    yield server
+    server.kill()
+
+
+def connect(server):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(server.server_address)
+    return sock
+
+
+def refresh(modules, reply=True):
+    data = {"command": "refresh", "module": modules, "reply": reply}
+    return json.dumps(data).encode("utf-8") + b"\n"
+
+
+def test_batched_commands(server):
+    sock = connect(server)
+    sock.sendall(refresh(["wifi"]) + refresh(["net_rate"]) + b'{"command": "x"')
+    sock.sendall(b', "reply": true}\n')
+    sock.shutdown(socket.SHUT_WR)
+    replies = sock.makefile("rb").read().splitlines()
+    assert [json.loads(x.decode("utf-8")) for x in replies] == [
+        {"result": ["wifi"]},
+        {"result": ["net_rate eth0", "net_rate wlan0"]},
+        {"error": "unknown command `x`"},
+    ]
+
+
+def test_legacy_client(server, wait_for):
+    # an unterminated message is run once the client closes the connection
+    sock = connect(server)
+    sock.sendall(refresh(["wifi"], reply=False).strip())
+    sock.close()
+    module = server.py3_wrapper.output_modules["wifi"]["module"]
+    wait_for(lambda: module.updates)
+    assert module.updates == 1
+
+
+def test_slow_client(server):
+    # a client sending a partial message does not hold up the others
+    slow = connect(server)
+    slow.sendall(refresh(["wifi"])[:10])
+    sock = connect(server)
+    sock.settimeout(2)
+    sock.sendall(refresh(["wifi"]))
+    assert json.loads(sock.recv(1024).decode("utf-8")) == {"result": ["wifi"]}
+    slow.close()
+    sock.close()
+
+
+def test_client_not_reading(monkeypatch, server, wait_for):
+    # a client that does not read its replies is dropped
+    monkeypatch.setattr(command, "MAX_OUT_SIZE", 64 * 1024)
+    sock = connect(server)
+    sock.settimeout(5)
+    try:
+        sock.sendall(refresh(["wifi"]) * 50000)
+    except socket.error:
+        pass
+    wait_for(lambda: not server.connections, timeout=5)
+    assert server.connections == {}
+    sock.close()
+
+
+def test_watch(server):
+    sock = connect(server)
+    sock.settimeout(2)
+    sock.sendall(b'{"command": "watch", "module": ["net_rate"], "reply": true}\n')
+    lines = sock.makefile("rb")
+
+    def read():
+        return json.loads(lines.readline().decode("utf-8"))
+
+    assert read() == {"result": ["net_rate eth0", "net_rate wlan0"]}
+    update = read()["update"]
+    assert sorted(update) == ["net_rate eth0", "net_rate wlan0"]
+    assert update["net_rate eth0"] == [{"full_text": "0", "name": "net_rate"}]
+
+    # updates of other modules are filtered out
+    module = server.py3_wrapper.output_modules["net_rate eth0"]["module"]
+    module.full_text = "1"
+    server.notify_update(["wifi", "net_rate eth0"])
+    assert read() == {
+        "update": {"net_rate eth0": [{"full_text": "1", "name": "net_rate"}]}
+    }
+
+    # updates made while the client is not reading are coalesced
+    for x in range(10000):
+        module.full_text = str(x) * 100
+        server.notify_update(["net_rate eth0"])
+    frames = 1
+    while read()["update"]["net_rate eth0"][0]["full_text"] != "9999" * 100:
+        frames += 1
+    assert frames < 10000
+    sock.close()
+
+
+def test_watch_no_module(server):
+    # watching modules that do not exist is an error, not a watch of all
+    sock = connect(server)
+    sock.settimeout(2)
+    sock.sendall(b'{"command": "watch", "module": ["nope"], "reply": true}\n')
+    sock.sendall(refresh(["wifi"]))
+    lines = sock.makefile("rb")
+    assert json.loads(lines.readline().decode("utf-8")) == {
+        "error": "no module matching `nope`"
+    }
+    assert json.loads(lines.readline().decode("utf-8")) == {"result": ["wifi"]}
+    assert server.watchers == {}
+    sock.close()
+
+
+def test_module_index():
+    index = ModuleIndex()
+    for name in ["wifi", "net_rate eth0", "net_rate wlan0", "netdata"]:
+        index.add(name, name)
+    index.add("group _anon_module_0", "group")
+
+    assert index.find("net_rate") == {"net_rate eth0", "net_rate wlan0"}
+    assert index.find("net_rate eth0") == {"net_rate eth0"}
+    assert index.find("net_rate eth1") == set()
+    assert index.find("group") == {"group _anon_module_0"}
+    assert index.find("net*") == {"net_rate eth0", "net_rate wlan0", "netdata"}
+    assert index.find("net_rate w*") == {"net_rate wlan0"}
+    assert index.find("[vw]ifi") == {"wifi"}
+
+    index.remove("net_rate wlan0")
+    assert index.find("net_rate") == {"net_rate eth0"}
+    assert index.find("net*") == {"net_rate eth0", "netdata"}
+    index.remove("net_rate eth0")
+    assert index.find("net_rate") == set()
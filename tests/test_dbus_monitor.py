@@ -0,0 +1,204 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+from py3status import dbus_monitor
+from py3status.dbus_monitor import DbusMonitor
+from py3status.py3 import Py3
+
+
+class MockBus:
+    """
+    Records the subscriptions like pydbus and fires their signals.
+    """
+
+    def __init__(self):
+        self.subscriptions = []
+
+    def subscribe(self, **kw):
+        self.subscriptions.append(kw)
+        return kw
+
+    def properties_changed(self, sender, object_path, interface, changed, invalid):
+        for subscription in self.subscriptions:
+            if subscription["sender"] != sender:
+                continue
+            if subscription["object"] not in (None, object_path):
+                continue
+            if subscription["arg0"] not in (None, interface):
+                continue
+            subscription["signal_fired"](
+                sender,
+                object_path,
+                subscription["iface"],
+                subscription["signal"],
+                (interface, changed, invalid),
+            )
+
+
+class MockMainLoop:
+    started = 0
+
+    def run(self):
+        MockMainLoop.started += 1
+
+
+@pytest.fixture
+def mock_dbus(monkeypatch):
+    # pydbus and gi as used by DbusMonitor, they are imported on first use
+    pydbus = types.ModuleType("pydbus")
+    pydbus.SessionBus = type("SessionBus", (MockBus,), {})
+    pydbus.SystemBus = type("SystemBus", (MockBus,), {})
+    gi = types.ModuleType("gi")
+    gi.repository = types.ModuleType("gi.repository")
+    gi.repository.GLib = types.SimpleNamespace(MainLoop=MockMainLoop)
+    monkeypatch.setitem(sys.modules, "pydbus", pydbus)
+    monkeypatch.setitem(sys.modules, "gi", gi)
+    monkeypatch.setitem(sys.modules, "gi.repository", gi.repository)
+    monkeypatch.setattr(MockMainLoop, "started", 0)
+    monitor = DbusMonitor()
+    monkeypatch.setattr(Py3, "_dbus_monitor", monitor)
+    return monitor
+
+
+def test_mocked_shared_connection(mock_dbus, wait_for):
+    session = mock_dbus.get_bus()
+    system = mock_dbus.get_bus("system")
+    assert type(session).__name__ == "SessionBus"
+    assert type(system).__name__ == "SystemBus"
+    assert mock_dbus.get_bus("session") is session
+    assert mock_dbus.get_bus("system") is system
+    # a single main loop for all the buses
+    wait_for(lambda: MockMainLoop.started)
+    assert MockMainLoop.started == 1
+    with pytest.raises(ValueError):
+        mock_dbus.get_bus("other")
+
+    changes = []
+    subscription = mock_dbus.subscribe(
+        lambda *args: changes.append(args),
+        "org.bluez",
+        interface="org.bluez.Device1",
+        bus="system",
+    )
+    assert subscription["iface"] == dbus_monitor.PROPERTIES_INTERFACE
+    assert subscription["signal"] == "PropertiesChanged"
+    system.properties_changed(
+        "org.bluez", "/org/bluez/hci0/dev_1", "org.bluez.Device1", {"RSSI": -60}, []
+    )
+    system.properties_changed(
+        "org.bluez", "/org/bluez/hci0", "org.bluez.Adapter1", {}, []
+    )
+    session.properties_changed(
+        "org.bluez", "/org/bluez/hci0/dev_1", "org.bluez.Device1", {}, []
+    )
+    assert changes == [("org.bluez.Device1", {"RSSI": -60}, [])]
+
+
+def test_py3_dbus_subscribe(mock_dbus, mock_module):
+    py3 = Py3()
+    module = py3._module = mock_module("bluetooth")
+    changes = []
+    py3.dbus_subscribe(
+        "org.bluez",
+        interface="org.bluez.Device1",
+        bus="system",
+        callback=lambda *args: changes.append(args),
+        properties=["Connected", "Name"],
+    )
+    system = mock_dbus.get_bus("system")
+
+    def changed(changed, invalidated=()):
+        system.properties_changed(
+            "org.bluez",
+            "/org/bluez/hci0/dev_1",
+            "org.bluez.Device1",
+            changed,
+            list(invalidated),
+        )
+
+    # changes of the properties not asked for are ignored
+    changed({"RSSI": -60})
+    assert module.updates == 0
+    assert changes == []
+    changed({"Connected": True, "RSSI": -50})
+    assert module.updates == 1
+    assert changes == [("org.bluez.Device1", {"Connected": True, "RSSI": -50}, [])]
+    changed({}, ["Name"])
+    assert module.updates == 2
+
+    # without a filter every change updates the module
+    py3.dbus_subscribe("org.mpris.MediaPlayer2.vlc", "/org/mpris/MediaPlayer2")
+    mock_dbus.get_bus().properties_changed(
+        "org.mpris.MediaPlayer2.vlc",
+        "/org/mpris/MediaPlayer2",
+        "org.mpris.MediaPlayer2.Player",
+        {"Position": 10},
+        [],
+    )
+    assert module.updates == 3
+
+
+@pytest.fixture
+def session_bus(monkeypatch):
+    pytest.importorskip("pydbus")
+    # a private bus so that the tests do not depend on the user session
+    daemon = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--print-address"],
+        stdout=subprocess.PIPE,
+    )
+    address = daemon.stdout.readline().decode("utf-8").strip()
+    monkeypatch.setitem(os.environ, "DBUS_SESSION_BUS_ADDRESS", address)
+    yield address
+    daemon.kill()
+    daemon.wait()
+
+
+def test_shared_connection(session_bus, wait_for):
+    from pydbus.generic import signal
+
+    class Player:
+        """
+        <node>
+            <interface name="org.example.Player">
+                <property name="Volume" type="i" access="read"/>
+            </interface>
+        </node>
+        """
+
+        PropertiesChanged = signal()
+
+        def __init__(self):
+            self.Volume = 0
+
+        def set_volume(self, volume):
+            self.Volume = volume
+            self.PropertiesChanged("org.example.Player", {"Volume": volume}, [])
+
+    monitor = DbusMonitor()
+    bus = monitor.get_bus("session")
+    assert monitor.get_bus("session") is bus
+
+    player = Player()
+    bus.publish("org.example.Player", ("/org/example/Player", player))
+
+    changes = []
+    monitor.subscribe(
+        lambda *args: changes.append(args),
+        "org.example.Player",
+        "/org/example/Player",
+        "org.example.Player",
+    )
+    for volume in [10, 20]:
+        player.set_volume(volume)
+    wait_for(lambda: len(changes) == 2)
+    assert changes == [
+        ("org.example.Player", {"Volume": 10}, []),
+        ("org.example.Player", {"Volume": 20}, []),
+    ]
+
+    with pytest.raises(ValueError):
+        monitor.get_bus("other")
@@ -0,0 +1,79 @@
+from py3status.events import EventDispatcher
+
+
+class MockPy3statusWrapper:
+    def __init__(self):
+        self.tasks = []
+
+    def report_exception(self, *arg, **kw):
+        pass
+
+    def timeout_queue_add(self, item, cache_time=0):
+        self.tasks.append(item)
+
+
+class MockEvents:
+    def __init__(self):
+        self.events = []
+        self.on_event = None
+        self.py3_wrapper = MockPy3statusWrapper()
+
+    def process_event(self, module_name, event, default_event=False):
+        self.events.append((module_name, event["button"], event["repeat"]))
+        if self.on_event:
+            on_event, self.on_event = self.on_event, None
+            on_event()
+
+
+def test_event_dispatcher_coalesces():
+    events = MockEvents()
+    dispatcher = EventDispatcher(events)
+    tasks = events.py3_wrapper.tasks
+
+    def click(module_name, button, repeat=True):
+        event = {"button": button, "index": "", "name": module_name}
+        dispatcher.add(module_name, event, False, repeat)
+
+    # one task is scheduled per module, under the name of the module so that
+    # it never runs while the module updates
+    click("volume_status", 4)
+    for x in range(10):
+        click("volume_status", 4)
+    click("backlight", 5)
+    click("backlight", 5)
+    click("volume_status", 1)
+    click("volume_status", 1)
+    click("volume_status", 5)
+    click("volume_status", 4)
+    click("volume_status", 4)
+    assert [x.module_full_name for x in tasks] == ["volume_status", "backlight"]
+
+    tasks.pop(0).run()
+    assert events.events == [
+        ("volume_status", 4, 11),
+        ("volume_status", 1, 1),
+        ("volume_status", 1, 1),
+        ("volume_status", 5, 1),
+        ("volume_status", 4, 2),
+    ]
+    tasks.pop(0).run()
+    assert events.events[-1] == ("backlight", 5, 2)
+
+    # events arriving while the task runs are processed by it
+    del events.events[:]
+    events.on_event = lambda: [click("volume_status", 4) for x in range(3)]
+    click("volume_status", 4)
+    assert len(tasks) == 1
+    tasks.pop(0).run()
+    assert events.events == [("volume_status", 4, 1), ("volume_status", 4, 3)]
+
+    # once done a new task is scheduled for the next event
+    click("volume_status", 4)
+    assert len(tasks) == 1
+
+    # the events of modules not reading the repeat count are all kept
+    del events.events[:]
+    click("timer", 4, repeat=False)
+    click("timer", 4, repeat=False)
+    tasks.pop().run()
+    assert events.events == [("timer", 4, 1), ("timer", 4, 1)]
@@ -0,0 +1,111 @@
+import os
+
+from py3status.hwmon import get_chips, get_configured_chips
+
+
+def test_get_chips(tmpdir):
+    hwmon = tmpdir.mkdir("hwmon")
+    devices = tmpdir.mkdir("devices")
+    bus = tmpdir.mkdir("bus")
+
+    def chip(entry, name, files, device=None, subsystem=None):
+        path = hwmon.mkdir(entry)
+        path.join("name").write(name + "\n")
+        for filename, value in files.items():
+            path.join(filename).write(value + "\n")
+        if device:
+            device = devices.mkdir(device)
+            subsystem = bus.ensure_dir(subsystem)
+            os.symlink(str(subsystem), str(device.join("subsystem")))
+            os.symlink(str(device), str(path.join("device")))
+        return path
+
+    coretemp = chip(
+        "hwmon10",
+        "coretemp",
+        {
+            "temp2_label": "Core 0",
+            "temp2_input": "48000",
+            "temp2_crit_alarm": "0",
+            "temp3_label": "Core 1",
+            "temp3_input": "50000",
+        },
+        "coretemp.0",
+        "platform",
+    )
+    chip(
+        "hwmon9",
+        "nouveau",
+        {"temp1_input": "52000", "fan1_input": "1200"},
+        "0000:05:00.0",
+        "pci",
+    )
+    chip("hwmon2", "acpitz", {"temp1_input": "27800"})
+    chip("hwmon4", "drivetemp", {"temp1_input": "35000"}, "1:0:0:0", "scsi")
+    chip("hwmon5", "lm70", {"temp1_input": "40000"}, "spi0.1", "spi")
+    chip("hwmon6", "corsairpsu", {"temp1_input": "30000"}, "0003:1B1C:1C05.000A", "hid")
+    # chips without sensors are skipped, as are the devices that lm_sensors
+    # does not list
+    chip("hwmon3", "empty", {})
+    chip("hwmon7", "unknown", {"temp1_input": "30000"}, "unknown0", "unknown")
+
+    # named as lm_sensors names them, in the order of the hwmon devices
+    chips = get_chips(str(hwmon))
+    assert [(x.name, x.adapter) for x in chips] == [
+        ("acpitz-virtual-0", "Virtual device"),
+        ("drivetemp-scsi-1-0", "SCSI adapter"),
+        ("lm70-spi-0-1", "SPI adapter"),
+        ("corsairpsu-hid-3-a", "HID adapter"),
+        ("nouveau-pci-0500", "PCI adapter"),
+        ("coretemp-isa-0000", "ISA adapter"),
+    ]
+    assert list(chips[4].sensors) == ["fan1", "temp1"]
+    assert list(chips[5].sensors) == ["Core 0", "Core 1"]
+
+    # only the files opened are read, the values are scaled
+    sensor = chips[5].sensors["Core 0"]
+    assert sensor.read() == {}
+    sensor.open(["input", "crit_alarm"])
+    assert sensor.read() == {"crit_alarm": 0.0, "input": 48.0}
+    fan = chips[4].sensors["fan1"]
+    fan.open()
+    assert fan.read() == {"input": 1200.0}
+
+    # the files are kept open and read again
+    coretemp.join("temp2_input").write("49500\n")
+    assert sensor.read()["input"] == 49.5
+    coretemp.join("temp2_input").write("")
+    assert sensor.read()["input"] is None
+
+
+def test_get_configured_chips(tmpdir):
+    class Chip:
+        def __init__(self, name):
+            self.name = name
+
+    chips = [
+        Chip("coretemp-isa-0000"),
+        Chip("nouveau-pci-0500"),
+        Chip("it8728-isa-0a30"),
+    ]
+    config = tmpdir.join("sensors3.conf")
+    config.write(
+        """
+# chips without statements changing their sensors are read from hwmon
+chip "lm78-*" "it87*-*"
+    bus "i2c-0" "SMBus I801"
+
+chip "coretemp-*" "w83627*-*"  # the cores
+    label temp2 "CPU"
+
+chip "nouveau-*"
+    # ignore fan1
+"""
+    )
+    configured = get_configured_chips(chips, [str(config)])
+    assert [x.name for x in configured] == ["coretemp-isa-0000"]
+
+    tmpdir.join("nouveau.conf").write('chip "nouveau-pci-*"\n  ignore fan1\n')
+    config_files = [str(config), str(tmpdir.join("nouveau.conf"))]
+    configured = get_configured_chips(chips, config_files)
+    assert [x.name for x in configured] == ["coretemp-isa-0000", "nouveau-pci-0500"]
@@ -0,0 +1,60 @@
+import pytest
+
+from py3status import inotify
+from py3status.inotify import Inotify
+
+
+@pytest.mark.skipif(inotify.load_libc() is None, reason="no inotify")
+def test_inotify(monkeypatch, tmpdir, mock_module, py3_wrapper, wait_for):
+    monkeypatch.setattr(inotify, "INOTIFY_DEBOUNCE", 0.05)
+    monitor = Inotify(py3_wrapper)
+    watched = tmpdir.join("watched")
+    other = tmpdir.join("other")
+    maildir = tmpdir.mkdir("new")
+    file_module = mock_module("file_status")
+    dir_module = mock_module("mail")
+
+    # the file does not need to exist
+    assert monitor.subscribe(file_module, [str(watched)])
+    assert monitor.subscribe(dir_module, [str(maildir)])
+    assert not monitor.subscribe(file_module, [str(tmpdir.join("a", "b"))])
+
+    # a burst of changes refreshes the module once
+    for x in range(10):
+        watched.write("{}".format(x))
+    wait_for(lambda: file_module.updates)
+    assert file_module.updates == 1
+    assert dir_module.updates == 0
+
+    # other files of the directory are ignored, the events are read in order
+    # so the change of other has been seen once the one of maildir has
+    other.write("x")
+    maildir.join("message").write("x")
+    wait_for(lambda: dir_module.updates)
+    assert dir_module.updates == 1
+    assert file_module.updates == 1
+
+
+@pytest.mark.skipif(inotify.load_libc() is None, reason="no inotify")
+def test_inotify_callback(monkeypatch, tmpdir, mock_module, py3_wrapper, wait_for):
+    monkeypatch.setattr(inotify, "INOTIFY_DEBOUNCE", 0.05)
+    monitor = Inotify(py3_wrapper)
+    module = mock_module("file_status")
+    changed = []
+
+    def callback():
+        changed.append(True)
+        return len(changed) > 1
+
+    assert monitor.subscribe(module, [str(tmpdir)], callback)
+    # subscribing again does not refresh the module twice
+    assert monitor.subscribe(module, [str(tmpdir)], callback)
+
+    # the callback decides whether the module is refreshed
+    tmpdir.join("a").write("x")
+    wait_for(lambda: changed)
+    assert module.updates == 0
+    tmpdir.join("b").write("x")
+    wait_for(lambda: module.updates)
+    assert changed == [True, True]
+    assert module.updates == 1
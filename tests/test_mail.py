@@ -0,0 +1,67 @@
+from py3status.modules import mail
+from py3status.modules.mail import Py3status
+
+
+class MockPy3:
+    CACHE_FOREVER = -1
+    LOG_WARNING = "warning"
+
+    def __init__(self):
+        self.errors = []
+
+    def error(self, msg, timeout=None):
+        self.errors.append(msg)
+
+    def get_color_names_list(self, format_string):
+        return []
+
+    def log(self, *arg, **kw):
+        pass
+
+
+class MockIMAP4_SSL:
+    connections = []
+    list_errors = 0
+
+    def __init__(self, server, port, timeout=None):
+        self.timeout = timeout
+        self.connections.append(self)
+
+    def list(self):
+        if MockIMAP4_SSL.list_errors:
+            MockIMAP4_SSL.list_errors -= 1
+            raise IOError("connection reset")
+        return "OK", [b'(\\HasNoChildren) "/" INBOX', b'(\\HasNoChildren) "/" Spam']
+
+    def login(self, user, password):
+        pass
+
+    def logout(self):
+        pass
+
+    def status(self, folder, names):
+        return "OK", [b"INBOX (UNSEEN 3)"]
+
+
+def test_imap_list_fails(monkeypatch):
+    monkeypatch.setattr(mail, "IMAP4_SSL", MockIMAP4_SSL)
+    MockIMAP4_SSL.list_errors = 2
+
+    module = Py3status()
+    module.py3 = MockPy3()
+    module.accounts = {
+        "imap": [{"user": "user", "password": "password", "server": "server"}]
+    }
+    module.post_config_hook()
+    account = module.mailboxes["imap"][0]
+
+    # the filters are kept when the folders could not be listed
+    assert module._get_imap_count(account, 1) is None
+    assert module.py3.errors == ["imap 1 connection reset"]
+    assert account["filters"] == ["^INBOX$"]
+    assert account["folders"] is None
+
+    account["retry_at"] = 0
+    assert module._get_imap_count(account, 1) == 3
+    assert account["folders"] == ['"INBOX"']
+    assert [x.timeout for x in MockIMAP4_SSL.connections] == [mail.IMAP_TIMEOUT] * 3
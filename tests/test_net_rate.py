@@ -0,0 +1,50 @@
+from py3status.modules.net_rate import Py3status
+from py3status.sampler import TICK
+
+
+class MockPy3:
+    def __init__(self, samples):
+        self.samples = samples
+
+    def format_units(self, value, unit=None, si=False):
+        return value, unit
+
+    def get_color_names_list(self, format_string):
+        return []
+
+    def get_placeholder_formats_list(self, format_string):
+        return [("value", ":.1f"), ("unit", None)]
+
+    def get_proc(self, name):
+        return self.samples[0][1]
+
+    def get_proc_delta(self, name, interval):
+        return self.samples.pop(0)
+
+    def net_subscribe(self):
+        return False
+
+    def safe_format(self, format_string, param_dict=None):
+        return param_dict.get("total", param_dict.get("value"))
+
+    def time_in(self, seconds):
+        return seconds
+
+
+def stat(received, transmitted):
+    return {"eth0": [received] + [0] * 7 + [transmitted] + [0] * 7}
+
+
+def test_net_rate_first_sample():
+    module = Py3status()
+    module.py3 = MockPy3(
+        [(None, stat(1000, 0), None), (2.0, stat(3000, 1000), stat(1000, 0))]
+    )
+    module.post_config_hook()
+
+    # without a previous sample the module comes back as soon as possible
+    response = module.net_rate()
+    assert response == {"cached_until": TICK, "full_text": ""}
+
+    response = module.net_rate()
+    assert response == {"cached_until": 2, "full_text": 1500.0}
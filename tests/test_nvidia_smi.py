@@ -0,0 +1,79 @@
+import os
+import sys
+
+from py3status.modules.nvidia_smi import Py3status
+
+# prints a sample of two GPUs every --loop-ms, the value of every property
+# but the count of GPUs being the number of the sample
+NVIDIA_SMI = """#!{}
+import sys
+import time
+
+query = [x for x in sys.argv if x.startswith("--query-gpu=")][0]
+loop = [x for x in sys.argv if x.startswith("--loop-ms=")][0]
+properties = query.split("=")[1].split(",")
+sample = 0
+while True:
+    line = ", ".join("2" if x == "count" else str(sample) for x in properties)
+    sys.stdout.write(line + "\\n" + line + "\\n")
+    sys.stdout.flush()
+    sample += 1
+    time.sleep(int(loop.split("=")[1]) / 1000.0)
+"""
+
+
+class MockPy3:
+    CACHE_FOREVER = -1
+
+    def __init__(self):
+        self.updates = 0
+
+    def check_commands(self, cmd_list):
+        return True
+
+    def get_color_names_list(self, format_string):
+        return []
+
+    def get_placeholders_list(self, format_string):
+        return ["memory.used"]
+
+    def log(self, *arg, **kw):
+        pass
+
+    def update(self):
+        self.updates += 1
+
+    def update_placeholder_formats(self, format_string, formats):
+        return format_string
+
+
+def test_nvidia_smi_loop(monkeypatch, tmpdir, wait_for):
+    script = tmpdir.join("nvidia-smi")
+    script.write(NVIDIA_SMI.format(sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", "{}:{}".format(tmpdir, os.environ["PATH"]))
+    module = Py3status()
+    module.py3 = MockPy3()
+    module.cache_timeout = 0.05
+    module.loop = True
+    module.post_config_hook()
+    try:
+        # the lines of both GPUs are served as one sample
+        wait_for(lambda: module.nvidia_data)
+        lines = module.nvidia_data.splitlines()
+        assert len(lines) == 2
+        assert lines[0] == lines[1]
+        wait_for(lambda: module.py3.updates > 2)
+        assert module.nvidia_data.splitlines()[0] != lines[0]
+
+        # nvidia-smi is started again when it dies
+        process = module.process
+        process.kill()
+        wait_for(lambda: module.process is not process and module.nvidia_data)
+        assert module.process is not process
+        assert len(module.nvidia_data.splitlines()) == 2
+    finally:
+        module.kill()
+    module.thread.join(2)
+    assert not module.thread.is_alive()
+    assert module.process.poll() is not None
@@ -1,5 +1,7 @@
 from pprint import pformat
 
+import pytest
+
 from py3status.py3 import Py3
 
 
@@ -218,3 +220,179 @@ def test_flatten_dict_parent_key():
     print("returned data")
     print(pformat(returned))
     assert returned == expected
+
+
+def test_circuit_breaker():
+    from py3status.request import CircuitBreaker
+
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    url = "http://example.com/api"
+    assert not breaker.open_for(url)
+    breaker.failure(url)
+    assert not breaker.open_for(url)
+    breaker.failure("https://example.com/other")
+    assert 0 < breaker.open_for(url) <= 60
+    assert not breaker.open_for("http://example.org")
+    breaker.success(url)
+    assert not breaker.open_for(url)
+
+
+def test_command_output_async():
+    from py3status.async_loop import run_coroutine
+
+    assert run_coroutine(py3.command_output_async("echo hello")) == "hello\n"
+    assert run_coroutine(py3.command_output_async("echo $0", shell=True)) != ""
+    with pytest.raises(py3.CommandError) as e:
+        run_coroutine(py3.command_output_async(["sh", "-c", "echo oops; exit 3"]))
+    assert e.value.error_code == 3
+    assert e.value.output == "oops\n"
+
+
+def test_command_output_timeout():
+    from py3status.async_loop import run_coroutine
+
+    assert py3.command_output("echo hello", timeout=5) == "hello\n"
+    # the shell and its children must all be killed
+    with pytest.raises(py3.CommandTimeout):
+        py3.command_output("sleep 10 | cat", shell=True, timeout=0.2)
+    with pytest.raises(py3.CommandTimeout):
+        run_coroutine(py3.command_output_async("sleep 10 | cat", True, timeout=0.2))
+
+
+def test_command_output_python_2(monkeypatch):
+    import os
+    import types
+
+    from py3status import py3 as py3_module, util
+
+    # python 2 has no start_new_session
+    monkeypatch.setattr(util, "sys", types.SimpleNamespace(version_info=(2, 7)))
+    assert util.new_session() == {"preexec_fn": os.setsid}
+    assert py3.command_output("echo hello", timeout=5) == "hello\n"
+    with pytest.raises(py3.CommandTimeout):
+        py3.command_output("sleep 10 | cat", shell=True, timeout=0.2)
+
+    # errors without an errno are still reported as command errors
+    def popen(*args, **kwargs):
+        raise TypeError("unexpected keyword argument")
+
+    monkeypatch.setattr(py3_module, "Popen", popen)
+    monkeypatch.setattr(py3, "log", lambda *arg, **kw: None)
+    with pytest.raises(py3.CommandError) as e:
+        py3.command_output("echo hello")
+    assert e.value.error_code is None
+
+
+def test_command_output_persistent():
+    assert py3.command_output(["printf", "%s", "a b"], persistent=True) == "a b"
+    assert py3.command_output("cd /; pwd", shell=True, persistent=True) == "/\n"
+    # the helper shell is not affected by the previous command
+    assert py3.command_output("pwd", persistent=True) == py3.command_output("pwd")
+    with pytest.raises(py3.CommandError) as e:
+        py3.command_output("echo oops >&2; exit 3", shell=True, persistent=True)
+    assert e.value.error_code == 3
+    assert e.value.error == "oops\n"
+    with pytest.raises(py3.CommandTimeout):
+        py3.command_output("sleep 10", persistent=True, timeout=0.2)
+    assert py3.command_output("echo again", persistent=True) == "again\n"
+    # the helper shell dying is not reported as a timeout
+    with pytest.raises(py3.CommandError) as e:
+        py3.command_output("kill -KILL $$", shell=True, persistent=True)
+    assert not isinstance(e.value, py3.CommandTimeout)
+    assert e.value.error_code == -9
+    assert py3.command_output("echo again", persistent=True) == "again\n"
+    # the helper shells count towards the limit of the commands run at once
+    assert py3._coprocess_pool.semaphore is py3._command_semaphore
+
+
+def test_command_output_shared():
+    from threading import Thread
+
+    command = "date +%s%N; sleep 0.2"
+
+    def run_together(max_age=None, timeout=None):
+        outputs = []
+
+        def run():
+            outputs.append(
+                py3.command_output(
+                    command, shell=True, max_age=max_age, timeout=timeout
+                )
+            )
+
+        threads = [Thread(target=run) for x in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outputs
+
+    # commands are only shared when asked to
+    assert len(set(run_together())) == 5
+    outputs = run_together(max_age=0)
+    assert len(set(outputs)) == 1
+    # later calls run it again unless the output is fresh enough
+    assert py3.command_output(command, shell=True, max_age=0) != outputs[0]
+    output = py3.command_output(command, shell=True, max_age=10)
+    assert py3.command_output(command, shell=True, max_age=10) == output
+    # calls with another timeout are not shared
+    assert py3.command_output(command, shell=True, max_age=10, timeout=5) != output
+
+
+def test_command_output_shared_module(monkeypatch, tmpdir):
+    import os
+
+    from py3status.modules.net_iplist import Py3status as NetIplist
+
+    # an ip logging its calls
+    log = tmpdir.join("log")
+    script = tmpdir.join("ip")
+    script.write(
+        "#!/bin/sh\necho \"$@\" >> {}\n"
+        "echo '1: lo: <LOOPBACK,UP>'\n"
+        "echo '    inet 127.0.0.1/8 scope host lo'\n".format(log)
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", "{}:{}".format(tmpdir, os.environ["PATH"]))
+
+    modules = []
+    for x in range(3):
+        module = NetIplist()
+        module.py3 = Py3()
+        module.py3._py3status_module = module
+        module.post_config_hook()
+        modules.append(module)
+    # the setting of a module turns the sharing off
+    modules[2].command_max_age = False
+
+    for module in modules:
+        assert module._get_data() == {"lo": {"ip4": ["127.0.0.1"]}}
+    assert log.read().splitlines() == ["address show"] * 2
+
+
+def test_shared_calls():
+    from time import sleep
+
+    from py3status.util import SharedCalls
+
+    shared = SharedCalls()
+    assert shared.call("a", 0.1, lambda: 1) == 1
+    assert shared.call("a", 0.1, lambda: 2) == 1
+    sleep(0.1)
+    # expired results are forgotten
+    assert shared.call("b", 0, lambda: 3) == 3
+    assert shared._calls == {}
+
+    error = ValueError("oops")
+
+    def fail():
+        raise error
+
+    with pytest.raises(ValueError) as e:
+        shared.call("c", 10, fail)
+    assert e.value is error
+    # the other callers get a copy of the exception
+    with pytest.raises(ValueError) as e:
+        shared.call("c", 10, fail)
+    assert e.value is not error
+    assert str(e.value) == "oops"
@@ -0,0 +1,148 @@
+import errno
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from py3status import rtnetlink
+from py3status.rtnetlink import Rtnetlink
+
+# run in a network namespace of its own, where veth pairs can be made
+NAMESPACE_TEST = """
+import subprocess
+
+from conftest import MockModule, MockPy3statusWrapper, wait_for
+from py3status import rtnetlink
+from py3status.rtnetlink import Rtnetlink
+
+
+def ip(*args):
+    subprocess.check_call(["ip"] + list(args))
+
+
+def burst_done():
+    # the changes have all been seen and the refresh they trigger done
+    interfaces = monitor.get_interfaces()
+    return (
+        module.updates
+        and monitor.timer is None
+        and "v0" in interfaces
+        and interfaces["v0"]["ip6"]
+        and interfaces["v0"]["operstate"] == "lowerlayerdown"
+    )
+
+
+rtnetlink.RTNETLINK_DEBOUNCE = 0.3
+monitor = Rtnetlink(MockPy3statusWrapper())
+module = MockModule("net_iplist")
+assert monitor.subscribe(module)
+assert list(monitor.get_interfaces()) == ["lo"]
+
+# a burst of changes refreshes the module once
+ip("link", "add", "v0", "type", "veth", "peer", "name", "v1")
+ip("address", "add", "10.9.0.1/24", "dev", "v0")
+ip("address", "add", "fd00::1/64", "dev", "v0", "nodad")
+ip("link", "set", "v0", "up")
+wait_for(burst_done)
+assert module.updates == 1
+interfaces = monitor.get_interfaces()
+assert sorted(interfaces) == ["lo", "v0", "v1"]
+assert interfaces["v0"]["ip4"] == ["10.9.0.1"]
+assert interfaces["v0"]["ip6"][0] == "fd00::1"
+assert interfaces["v0"]["operstate"] == "lowerlayerdown"
+
+ip("link", "set", "v1", "up")
+wait_for(lambda: monitor.get_interfaces()["v0"]["operstate"] == "up")
+assert monitor.get_interfaces()["v0"]["operstate"] == "up"
+
+ip("address", "del", "10.9.0.1/24", "dev", "v0")
+wait_for(lambda: not monitor.get_interfaces()["v0"]["ip4"])
+assert monitor.get_interfaces()["v0"]["ip4"] == []
+
+ip("link", "del", "v0")
+wait_for(lambda: len(monitor.get_interfaces()) == 1)
+assert list(monitor.get_interfaces()) == ["lo"]
+"""
+
+
+class MockSocket:
+    closed = False
+
+    def __init__(self, errors):
+        self.errors = errors
+
+    def close(self):
+        self.closed = True
+
+    def recv(self, size):
+        raise self.errors.pop(0)
+
+    def send(self, data):
+        raise socket.error(errno.ENOBUFS, "No buffer space available")
+
+
+def test_message():
+    monitor = Rtnetlink(None)
+    monitor.available = True
+    name = b"eth0\0"
+    attribute = rtnetlink.RTATTR.pack(4 + len(name), rtnetlink.IFLA_IFNAME) + name
+    attribute += b"\0" * (rtnetlink.align(len(attribute)) - len(attribute))
+    operstate = rtnetlink.RTATTR.pack(5, rtnetlink.IFLA_OPERSTATE) + b"\x06\0\0\0"
+    link = rtnetlink.IFINFOMSG.pack(0, 1, 2, 0x1003, 0) + attribute + operstate
+    assert monitor.message(rtnetlink.RTM_NEWLINK, link)
+    assert not monitor.message(rtnetlink.RTM_NEWLINK, link)
+
+    address = socket.inet_pton(socket.AF_INET, "192.168.1.3")
+    message = rtnetlink.IFADDRMSG.pack(socket.AF_INET, 24, 0, 0, 2)
+    message += rtnetlink.RTATTR.pack(8, rtnetlink.IFA_LOCAL) + address
+    assert monitor.message(rtnetlink.RTM_NEWADDR, message)
+    interfaces = monitor.get_interfaces()
+    assert interfaces["eth0"]["operstate"] == "up"
+    assert interfaces["eth0"]["ip4"] == ["192.168.1.3"]
+
+    # the interfaces returned are copies
+    interfaces["eth0"]["ip4"].append("10.0.0.1")
+    assert monitor.get_interfaces()["eth0"]["ip4"] == ["192.168.1.3"]
+
+    assert monitor.message(rtnetlink.RTM_DELADDR, message)
+    assert not monitor.message(rtnetlink.RTM_DELADDR, message)
+    assert monitor.message(rtnetlink.RTM_DELLINK, link)
+    assert monitor.get_interfaces() == {}
+
+
+def test_stop(mock_module, py3_wrapper):
+    monitor = Rtnetlink(py3_wrapper)
+    monitor.available = True
+    monitor.sock = MockSocket([socket.error(errno.ENOBUFS, "No buffer space")])
+    module = mock_module("net_iplist")
+    monitor.consumers.append(module)
+
+    # reading everything again after lost notifications fails too, the
+    # module is refreshed to poll the interfaces
+    monitor.run()
+    assert module.updates == 1
+    assert monitor.sock.closed
+    assert monitor.get_interfaces() is None
+    assert not monitor.subscribe(module)
+
+
+def namespaces_available():
+    try:
+        with open(os.devnull, "w") as devnull:
+            command = ["unshare", "-rn", "ip", "link"]
+            return subprocess.call(command, stdout=devnull, stderr=devnull) == 0
+    except OSError:
+        return False
+
+
+@pytest.mark.skipif(not namespaces_available(), reason="no network namespaces")
+def test_rtnetlink_namespace():
+    env = dict(os.environ)
+    # the mocks are imported from conftest
+    tests = os.path.dirname(os.path.abspath(__file__))
+    env["PYTHONPATH"] = os.pathsep.join([os.path.dirname(tests), tests])
+    subprocess.check_call(
+        ["unshare", "-rn", sys.executable, "-c", NAMESPACE_TEST], env=env
+    )
@@ -0,0 +1,158 @@
+from py3status import sampler
+from py3status.sampler import (
+    ProcFile,
+    Sampler,
+    parse_diskstats,
+    parse_mountinfo,
+    parse_net_dev,
+    parse_stat,
+)
+
+STAT = b"""cpu  10 0 10 80 0 0 0 0 0 0
+cpu0 5 0 5 40 0 0 0 0 0 0
+cpu1 5 0 5 40 0 0 0 0 0 0
+intr 1234 0 0
+ctxt 5678
+"""
+
+NET_DEV = b"""Inter-|   Receive                            |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:    1000      10    0    0    0     0          0         0     1000      10    0    0    0     0       0          0
+wlan0:123456789 100 0 0 0 0 0 0 987654321 200 0 0 0 0 0 0
+"""
+
+MOUNTINFO = b"""22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw
+23 22 8:2 / /mnt/usb\\040disk rw shared:2 master:1 - vfat /dev/sdb1 rw
+24 22 0:5 / /proc rw - proc proc rw
+"""
+
+DISKSTATS = b"""   8       0 sda 100 0 2000 50 200 0 4000 60 0 100 110
+   8       1 sda1 90 0 1800 40 190 0 3800 50 0 90 90
+"""
+
+
+def test_parse():
+    stat = parse_stat(STAT)
+    assert list(stat) == ["cpu", "cpu0", "cpu1"]
+    assert stat["cpu0"][3] == 40
+    net_dev = parse_net_dev(NET_DEV)
+    assert list(net_dev) == ["lo", "wlan0"]
+    assert net_dev["wlan0"][0] == 123456789
+    assert net_dev["wlan0"][8] == 987654321
+    diskstats = parse_diskstats(DISKSTATS)
+    assert diskstats["sda"][:2] == (8, 0)
+    assert diskstats["sda1"][4] == 1800
+
+
+def test_parse_mountinfo():
+    assert parse_mountinfo(MOUNTINFO) == [
+        ("/dev/sda1", "/", "ext4"),
+        ("/dev/sdb1", "/mnt/usb disk", "vfat"),
+        ("proc", "/proc", "proc"),
+    ]
+
+
+def test_parse_lazily():
+    diskstats = parse_diskstats(DISKSTATS)
+    assert diskstats.parsed == {}
+    assert diskstats.get("sda1")[2] == 90
+    assert list(diskstats.parsed) == ["sda1"]
+    assert "sdb" not in diskstats
+
+
+def test_parse_lazily_threads(monkeypatch):
+    # the samples are shared by the modules threads
+    from threading import Thread
+
+    monkeypatch.setattr(sampler, "MAX_SEARCHES", 2)
+    disks = ["sd{}".format(x) for x in range(50)]
+    data = b"".join(
+        "   8 {} {} {} 0 0 0 0 0 0 0 0 0 0\n".format(x, name, x).encode("utf-8")
+        for x, name in enumerate(disks)
+    )
+    for attempt in range(20):
+        diskstats = parse_diskstats(data)
+        results = []
+
+        def lookup(names):
+            results.append([diskstats[name][2] for name in names])
+
+        threads = [
+            Thread(target=lookup, args=(disks[x:] + disks[:x],)) for x in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(map(sorted, results)) == [list(range(50))] * 8
+        assert list(diskstats) == disks
+
+
+def test_proc_file(monkeypatch, tmpdir):
+    monkeypatch.setattr(sampler, "BUFFER_SIZE", 16)
+    path = tmpdir.join("stat")
+    path.write_binary(STAT)
+    proc_file = ProcFile(str(path))
+    # the buffer grows to fit the file
+    assert proc_file.read() == STAT
+    buffer = proc_file.buffer
+    path.write_binary(STAT[:20])
+    assert proc_file.read() == STAT[:20]
+    assert proc_file.buffer is buffer
+
+
+def test_sample_shared(monkeypatch, tmpdir):
+    now = [1000.0]
+    reads = []
+    path = tmpdir.join("stat")
+    path.write_binary(STAT)
+
+    def parse(data):
+        reads.append(now[0])
+        return parse_stat(data)
+
+    monkeypatch.setattr(sampler, "time", lambda: now[0])
+    monkeypatch.setattr(sampler, "PROC_FILES", {"stat": (str(path), parse)})
+    proc = Sampler()
+
+    # modules asking within a tick share the sample
+    first = proc.sample("stat")
+    now[0] += 0.1
+    assert proc.sample("stat") is first
+    assert reads == [1000.0]
+    assert proc.previous("stat", 1) is None
+
+    # one sample per second
+    for x in range(10):
+        now[0] = 1001.0 + x
+        proc.sample("stat")
+    assert len(reads) == 11
+    assert proc.previous("stat", 1).time == 1009.0
+    assert proc.previous("stat", 5).time == 1005.0
+    # not enough history kept, use the oldest sample
+    assert proc.previous("stat", 60).time == 1000.0
+
+    # the history is bounded
+    for x in range(100):
+        now[0] += 1
+        proc.sample("stat")
+    assert len(proc.samples["stat"]) == sampler.HISTORY
+
+
+def test_sample_watched(monkeypatch, tmpdir):
+    now = [1000.0]
+    changed = [False]
+    path = tmpdir.join("mountinfo")
+    path.write_binary(MOUNTINFO)
+    monkeypatch.setattr(sampler, "time", lambda: now[0])
+    monkeypatch.setattr(
+        sampler, "PROC_FILES", {"mountinfo": (str(path), parse_mountinfo)}
+    )
+    monkeypatch.setattr(ProcFile, "changed", lambda self: changed[0])
+    proc = Sampler()
+
+    first = proc.sample("mountinfo")
+    now[0] += 10
+    assert proc.sample("mountinfo") is first
+    changed[0] = True
+    assert proc.sample("mountinfo") is not first
@@ -0,0 +1,38 @@
+from py3status import udev_monitor
+from py3status.udev_monitor import UdevMonitor
+
+
+class MockDevice:
+    def __init__(self, subsystem):
+        self.subsystem = subsystem
+
+
+def test_udev_events_coalesced(monkeypatch, mock_module, py3_wrapper, wait_for):
+    monkeypatch.setattr(udev_monitor, "UDEV_DEBOUNCE", 0.05)
+    monitor = UdevMonitor(py3_wrapper)
+    battery = mock_module("battery_level")
+    usb = mock_module("usb")
+    other = mock_module("other")
+    monitor.udev_consumers["power_supply"].append((battery, "refresh"))
+    monitor.udev_consumers["usb"].append((usb, "refresh"))
+    monitor.udev_consumers["usb"].append((battery, "refresh"))
+    monitor.udev_consumers["drm"].append((other, "refresh"))
+
+    # a dock being plugged in
+    for x in range(100):
+        monitor._udev_event("add", MockDevice("usb"))
+        monitor._udev_event("change", MockDevice("power_supply"))
+        monitor._udev_event("add", MockDevice("input"))
+    assert battery.updates == usb.updates == 0
+
+    # the modules are refreshed together once the burst is over
+    wait_for(lambda: battery.updates and usb.updates)
+    assert monitor.timer is None
+    assert battery.updates == 1
+    assert usb.updates == 1
+    assert other.updates == 0
+
+    monitor._udev_event("change", MockDevice("power_supply"))
+    wait_for(lambda: battery.updates == 2)
+    assert battery.updates == 2
+    assert usb.updates == 1
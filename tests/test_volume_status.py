@@ -0,0 +1,125 @@
+import os
+import subprocess
+import sys
+import time
+
+from py3status.modules.volume_status import Py3status
+
+# a sink whose volume is kept in a file, changes being written to a file of
+# events that `pactl subscribe` follows, and the commands run logged
+PACTL = """#!{python}
+import sys
+import time
+
+state = "{tmpdir}/volume"
+events = "{tmpdir}/events"
+args = [x for x in sys.argv[1:] if x != "--"]
+with open("{tmpdir}/log", "a") as f:
+    f.write(" ".join(args) + "\\n")
+
+if args == ["subscribe"]:
+    position = 0
+    while True:
+        with open(events) as f:
+            f.seek(position)
+            data = f.read()
+            position = f.tell()
+        sys.stdout.write(data)
+        sys.stdout.flush()
+        time.sleep(0.01)
+elif args == ["info"]:
+    print("Default Sink: alsa_output.pci")
+elif args == ["list", "short", "sinks"]:
+    print("0\\talsa_output.pci\\tmodule-alsa-card.c")
+elif args == ["list", "sinks"]:
+    print("Sink #0\\n\\tName: alsa_output.pci\\n\\tMute: no")
+    print("\\tVolume: front-left: 32768 / {{}}% / -18 dB".format(open(state).read()))
+elif args[0] == "set-sink-volume":
+    volume = int(open(state).read()) + int(args[2].strip("+%"))
+    open(state, "w").write(str(volume))
+    with open(events, "a") as f:
+        f.write("Event 'change' on sink-input #3\\n")
+        f.write("Event 'change' on sink #0\\n")
+"""
+
+
+class MockPy3:
+    CACHE_FOREVER = -1
+    COLOR_BAD = "#FF0000"
+    COLOR_MUTED = None
+
+    def __init__(self):
+        self.updates = 0
+
+    def check_commands(self, cmd_list):
+        return "pactl"
+
+    def command_output(self, command, persistent=False):
+        return subprocess.check_output(command).decode("utf-8")
+
+    def command_run(self, command):
+        return subprocess.call(command)
+
+    def log(self, *arg, **kw):
+        pass
+
+    def safe_format(self, format_string, param_dict=None):
+        return param_dict["percentage"]
+
+    def threshold_get_color(self, *arg, **kw):
+        pass
+
+    def time_in(self, seconds):
+        return time.time() + seconds
+
+    def update(self):
+        self.updates += 1
+
+
+def test_volume_status_pactl_subscribe(monkeypatch, tmpdir, wait_for):
+    script = tmpdir.join("pactl")
+    script.write(PACTL.format(python=sys.executable, tmpdir=tmpdir))
+    script.chmod(0o755)
+    tmpdir.join("volume").write("50")
+    tmpdir.join("events").write("")
+    log = tmpdir.join("log")
+    monkeypatch.setenv("PATH", "{}:{}".format(tmpdir, os.environ["PATH"]))
+
+    module = Py3status()
+    module.py3 = MockPy3()
+    module.command = "pactl"
+    module.cache_timeout = 0.5
+    module.post_config_hook()
+    try:
+        wait_for(lambda: module.backend.monitoring)
+        assert module.volume_status()["full_text"] == "50"
+        # the volume is only asked again after a change
+        response = module.volume_status()
+        assert response["full_text"] == "50"
+        assert response["cached_until"] == module.py3.CACHE_FOREVER
+        assert log.read().splitlines().count("list sinks") == 1
+
+        module.on_click({"button": module.button_up})
+        assert module.volume_status()["full_text"] == "55"
+        wait_for(lambda: module.py3.updates)
+        assert module.py3.updates == 1
+        assert module.volume_status()["full_text"] == "55"
+        # the default device is only looked up again when it changes
+        assert log.read().splitlines().count("info") == 1
+        tmpdir.join("events").write("Event 'change' on server #-1\n", mode="a")
+        wait_for(lambda: module.py3.updates == 2)
+        assert module.volume_status()["full_text"] == "55"
+        assert log.read().splitlines().count("info") == 2
+
+        # pactl subscribe is started again when it dies
+        process = module.backend.process
+        process.kill()
+        wait_for(lambda: not module.backend.monitoring)
+        assert module.volume_status()["cached_until"] != module.py3.CACHE_FOREVER
+        wait_for(lambda: module.backend.process is not process)
+        wait_for(lambda: module.backend.monitoring)
+        assert module.backend.monitoring
+    finally:
+        module.kill()
+    wait_for(lambda: module.backend.process.poll() is not None)
+    assert module.backend.process.poll() is not None
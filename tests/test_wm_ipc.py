@@ -0,0 +1,185 @@
+import json
+import socket
+import struct
+
+from threading import Thread
+
+import pytest
+
+from py3status.wm_ipc import WmEvents, WmIpc
+
+TREE = {
+    "id": 1,
+    "focused": False,
+    "nodes": [
+        {"id": 2, "focused": False, "nodes": [], "name": "output"},
+        {
+            "id": 3,
+            "focused": False,
+            "nodes": [
+                {"id": 4, "focused": True, "nodes": [], "name": "editor"},
+                {"id": 5, "focused": False, "nodes": [], "name": "shell"},
+            ],
+        },
+    ],
+}
+INPUTS = [
+    {"identifier": "1:1:keyboard", "xkb_active_layout_index": 0},
+    {"identifier": "2:2:mouse"},
+]
+
+
+def message(message_type, payload):
+    payload = json.dumps(payload).encode("utf-8")
+    return b"i3-ipc" + struct.pack("=II", len(payload), message_type) + payload
+
+
+class FakeWm(Thread):
+    """
+    Answers the messages it receives like i3 would, closing the connection
+    after a given number of commands.
+    """
+
+    def __init__(self, path, close_after=None):
+        Thread.__init__(self)
+        self.daemon = True
+        self.close_after = close_after
+        self.commands = []
+        self.connection = None
+        self.connections = 0
+        self.requests = []
+        self.inputs = INPUTS
+        self.tree = TREE
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen(1)
+        self.start()
+
+    def run(self):
+        while True:
+            connection, address = self.sock.accept()
+            self.connection = connection
+            self.connections += 1
+            reader = connection.makefile("rb")
+            while True:
+                header = reader.read(14)
+                if len(header) < 14:
+                    break
+                assert header[:6] == b"i3-ipc"
+                length, message_type = struct.unpack("=II", header[6:])
+                payload = reader.read(length).decode("utf-8")
+                self.requests.append(message_type)
+                if message_type == 0:
+                    self.commands.append(payload)
+                    reply = [{"success": True}]
+                elif message_type == 2:
+                    reply = {"success": True}
+                elif message_type == 4:
+                    reply = self.tree
+                elif message_type == 100:
+                    reply = self.inputs
+                connection.sendall(message(message_type, reply))
+                if len(self.commands) == self.close_after:
+                    break
+            reader.close()
+            connection.close()
+
+    def send_event(self, event_type, payload):
+        self.connection.sendall(message(1 << 31 | event_type, payload))
+
+
+class MockPy3statusWrapper:
+    def __init__(self, wm_name="i3"):
+        self.config = {"wm_name": wm_name}
+        self.logs = []
+        self.running = True
+
+    def log(self, msg, *arg, **kw):
+        self.logs.append(msg)
+
+
+@pytest.fixture
+def socket_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "ipc")
+    monkeypatch.setenv("I3SOCK", path)
+    return path
+
+
+def test_pipelined_commands(socket_path, wait_for):
+    wm = FakeWm(socket_path)
+    py3_wrapper = MockPy3statusWrapper()
+    wm_ipc = WmIpc(py3_wrapper)
+    for x in range(3):
+        assert wm_ipc.command("frame", "workspace {}".format(x))
+    wait_for(lambda: len(py3_wrapper.logs) == 3)
+    assert wm.commands == ["workspace 0", "workspace 1", "workspace 2"]
+    assert wm.connections == 1
+    assert py3_wrapper.logs[2] == (
+        'i3 module="frame" command="workspace 2" reply=[{"success": true}]'
+    )
+
+
+def test_reconnect(socket_path, wait_for):
+    wm = FakeWm(socket_path, close_after=1)
+    wm_ipc = WmIpc(MockPy3statusWrapper())
+    assert wm_ipc.command("frame", "workspace 1")
+    wait_for(lambda: wm_ipc.sock is None)
+    assert wm_ipc.command("frame", "workspace 2")
+    wait_for(lambda: len(wm.commands) == 2)
+    assert wm.commands == ["workspace 1", "workspace 2"]
+    assert wm.connections == 2
+
+
+def test_no_socket(socket_path):
+    assert not WmIpc(MockPy3statusWrapper()).command("frame", "workspace 1")
+
+
+def test_wm_events(socket_path, monkeypatch, mock_module, wait_for):
+    monkeypatch.setenv("SWAYSOCK", socket_path)
+    wm = FakeWm(socket_path)
+    wm_events = WmEvents(MockPy3statusWrapper("sway"))
+    window = mock_module("window_title")
+    xkb_input = mock_module("xkb_input")
+    assert wm_events.subscribe(window, ["window", "workspace"])
+    assert wm_events.subscribe(xkb_input, ["input"])
+    tree = wm_events.get_tree()
+    assert tree == TREE
+    assert wm_events.get_inputs() == INPUTS
+    assert wm.requests == [2, 4, 100]
+    wait_for(lambda: window.updates == 1)
+
+    # a title change is applied to the cached tree
+    shell = dict(TREE["nodes"][1]["nodes"][1], name="vim")
+    wm.send_event(3, {"change": "title", "container": shell})
+    wait_for(lambda: window.updates == 2)
+    new_tree = wm_events.get_tree()
+    assert new_tree["nodes"][1]["nodes"][1]["name"] == "vim"
+    assert new_tree["nodes"][0] is tree["nodes"][0]
+    assert tree["nodes"][1]["nodes"][1]["name"] == "shell"
+
+    # so is the focus
+    shell = dict(shell, focused=True)
+    wm.send_event(3, {"change": "focus", "container": shell})
+    wait_for(lambda: window.updates == 3)
+    nodes = wm_events.get_tree()["nodes"][1]["nodes"]
+    assert [node["focused"] for node in nodes] == [False, True]
+    assert wm.requests == [2, 4, 100]
+
+    # the tree is fetched again on other changes
+    wm.tree = dict(TREE, nodes=TREE["nodes"][:1])
+    wm.send_event(3, {"change": "close", "container": shell})
+    wait_for(lambda: window.updates == 4)
+    assert wm_events.get_tree() == wm.tree
+    assert wm.requests == [2, 4, 100, 4]
+
+    # inputs are updated in place
+    keyboard = dict(INPUTS[0], xkb_active_layout_index=1)
+    wm.send_event(21, {"change": "xkb_layout", "input": keyboard})
+    wait_for(lambda: xkb_input.updates == 2)
+    assert wm_events.get_inputs() == [keyboard, INPUTS[1]]
+    assert window.updates == 4
+
+
+def test_wm_events_no_socket(socket_path, mock_module):
+    module = mock_module("window_title")
+    assert not WmEvents(MockPy3statusWrapper()).subscribe(module, ["window"])